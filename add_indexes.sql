@@ -2,6 +2,7 @@
 CREATE INDEX IF NOT EXISTS ix_agendamentos_cliente_id ON agendamentos (cliente_id);
 CREATE INDEX IF NOT EXISTS ix_agendamentos_barbeiro_id ON agendamentos (barbeiro_id);
 CREATE INDEX IF NOT EXISTS ix_agendamentos_status ON agendamentos (status);
+CREATE INDEX IF NOT EXISTS ix_agendamentos_barbeiro_periodo ON agendamentos (barbeiro_id, data_hora_inicio, data_hora_fim);
 
 -- Adicionar índices para a tabela agendamento_servicos
 CREATE INDEX IF NOT EXISTS ix_agendamento_servicos_agendamento_id ON agendamento_servicos (agendamento_id);
@@ -11,4 +12,17 @@ CREATE INDEX IF NOT EXISTS ix_agendamento_servicos_servico_id ON agendamento_ser
 CREATE INDEX IF NOT EXISTS ix_barbeiros_usuario_id ON barbeiros (usuario_id);
 
 -- Adicionar índices para a tabela clientes
-CREATE INDEX IF NOT EXISTS ix_clientes_nome ON clientes (nome); 
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS ix_clientes_nome ON clientes (nome); 
+
+-- Adicionar índices para os relatórios de vendas
+CREATE INDEX IF NOT EXISTS ix_vendas_status_data_hora ON vendas (status, data_hora);
+CREATE INDEX IF NOT EXISTS ix_venda_itens_venda_id ON venda_itens (venda_id);
+CREATE INDEX IF NOT EXISTS ix_pagamentos_venda_id ON pagamentos (venda_id);
+
+-- Adicionar índices para a paginação por cursor
+CREATE INDEX IF NOT EXISTS ix_agendamentos_data_hora_inicio_id ON agendamentos (data_hora_inicio, id);
+CREATE INDEX IF NOT EXISTS ix_vendas_data_hora_id ON vendas (data_hora, id);
+CREATE INDEX IF NOT EXISTS ix_caixa_diario_data_abertura_id ON caixa_diario (data_abertura, id);
+
+-- Adicionar índices para o faturamento do dashboard
+CREATE INDEX IF NOT EXISTS ix_atendimentos_data_hora ON atendimentos (data_hora);
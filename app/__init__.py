@@ -35,12 +35,53 @@ def create_app(config_class=None):
         app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)  # Access tokens expiram em 1 hora
         app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)  # Refresh tokens expiram em 30 dias
     
+    # JSON com orjson (quando instalado) e datas em ISO 8601
+    from app.json_provider import ProvedorJSON
+    app.json = ProvedorJSON(app)
+    
     # Inicializar extensões
     db.init_app(app)
+    
+    # Pragmas de desempenho do SQLite (WAL, busy_timeout etc.) em cada conexão
+    from app.services import perfil_sqlite
+    perfil_sqlite.init_app(app)
+    
     migrate.init_app(app, db)
     jwt.init_app(app)
     bcrypt.init_app(app)
     
+    # Claims de barbeiro/cliente no JWT, revogadas quando a versão do usuário muda
+    from app.auth import autorizacao
+    autorizacao.init_app(app)
+    
+    # Cache local do processo
+    from app.services import cache
+    cache.init_app(app)
+    
+    # Configurações do sistema em memória, recarregadas quando a versão muda
+    from app.services import configuracoes
+    configuracoes.init_app(app)
+    
+    # Catálogo de serviços em memória, recarregado quando a versão muda
+    from app.services import catalogo_servicos
+    catalogo_servicos.init_app(app)
+    
+    # Índice de disponibilidade da agenda em memória (opcional)
+    from app.services import disponibilidade
+    disponibilidade.init_app(app)
+    
+    # Latência, SQL e tamanho de resposta por endpoint (/api/_metrics)
+    from app.services import metricas
+    metricas.init_app(app)
+    
+    # Consultas SQL acima do limite, com EXPLAIN (/api/_consultas_lentas)
+    from app.services import consultas_lentas
+    consultas_lentas.init_app(app)
+    
+    # Índice de busca textual de clientes e produtos
+    from app.services import busca
+    busca.init_app(app)
+    
     # Registrar blueprints para API
     register_api_blueprints(app)
     
@@ -80,4 +121,13 @@ def register_api_blueprints(app):
     app.register_blueprint(vendas_bp, url_prefix='/api/vendas')
     
     from app.api.caixa import caixa_bp
-    app.register_blueprint(caixa_bp, url_prefix='/api/caixa') 
\ No newline at end of file
+    app.register_blueprint(caixa_bp, url_prefix='/api/caixa')
+    
+    from app.api.dashboard import dashboard_bp
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    
+    from app.api.metricas import metricas_bp
+    app.register_blueprint(metricas_bp, url_prefix='/api/_metrics')
+    
+    from app.api.consultas_lentas import consultas_lentas_bp
+    app.register_blueprint(consultas_lentas_bp, url_prefix='/api/_consultas_lentas') 
\ No newline at end of file
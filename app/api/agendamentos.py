@@ -1,17 +1,61 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from marshmallow import Schema, fields, validate, ValidationError
-from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
-from sqlalchemy import and_, or_, func
+from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy import and_, or_, func, insert, select
 from app import db
+from app.auth import autorizacao
 from app.models.agendamento import Agendamento, AgendamentoServico
-from app.models.servico import Servico
 from app.models.cliente import Cliente
 from app.models.barbeiro import Barbeiro
+from app.models.servico import Servico
 from app.models.usuario import Usuario
+from app.services import agregacoes, catalogo_servicos, condicional, configuracoes, dashboard, disponibilidade, paginacao, recorrencia
+from app.services.serializacao import com_relacionamentos
 from datetime import datetime, timedelta
+import uuid
+
+NOMES_DIAS_SEMANA = ('segundas-feiras', 'terças-feiras', 'quartas-feiras', 'quintas-feiras',
+                     'sextas-feiras', 'sábados', 'domingos')
 
 agendamentos_bp = Blueprint('agendamentos', __name__)
 
+# Serviço alterado por último entre os serviços de cada agendamento (subconsulta correlacionada,
+# para não multiplicar as linhas da contagem)
+ATUALIZACAO_SERVICOS_AGENDAMENTO = select(func.max(Servico.updated_at))\
+    .join(AgendamentoServico, AgendamentoServico.servico_id == Servico.id)\
+    .where(AgendamentoServico.agendamento_id == Agendamento.id)\
+    .correlate(Agendamento).scalar_subquery()
+
+def _atualizacao_servicos(agendamento):
+    valores = [item.servico.updated_at for item in agendamento.servicos
+               if item.servico is not None and item.servico.updated_at is not None]
+    return max(valores) if valores else None
+
+# Colunas que versionam as listagens de agendamentos (ETag): os agendamentos, os clientes, os
+# usuários dos barbeiros (barbeiro_nome) e os serviços exibidos. Trocar os serviços de um
+# agendamento atualiza o updated_at do próprio agendamento.
+ATUALIZACOES_AGENDAMENTOS = (
+    (Agendamento.updated_at, lambda agendamento: agendamento.updated_at),
+    (Cliente.updated_at, lambda agendamento: agendamento.cliente.updated_at if agendamento.cliente else None),
+    (Usuario.updated_at, lambda agendamento: agendamento.barbeiro.usuario.updated_at
+        if agendamento.barbeiro and agendamento.barbeiro.usuario else None),
+    (ATUALIZACAO_SERVICOS_AGENDAMENTO, _atualizacao_servicos),
+)
+
+def consulta_versao_agendamentos(query):
+    return query.outerjoin(Cliente, Cliente.id == Agendamento.cliente_id)\
+        .outerjoin(Barbeiro, Barbeiro.id == Agendamento.barbeiro_id)\
+        .outerjoin(Usuario, Usuario.id == Barbeiro.usuario_id)
+
+def responder_agendamentos(query, ordem):
+    """Lista completa de agendamentos da consulta com resposta condicional (ETag)"""
+    return condicional.responder_listagem(
+        consulta_versao_agendamentos(query),
+        ATUALIZACOES_AGENDAMENTOS,
+        lambda: query.order_by(ordem).all(),
+        lambda agendamentos: (jsonify([agendamento.to_dict() for agendamento in agendamentos]), 200)
+    )
+
 class ServicoIdSchema(Schema):
     servico_id = fields.Integer(required=True)
 
@@ -22,37 +66,25 @@ class AgendamentoSchema(Schema):
     servicos = fields.List(fields.Nested(ServicoIdSchema), required=True, validate=validate.Length(min=1))
     observacoes = fields.Str(allow_none=True)
 
+class RecorrenciaSchema(Schema):
+    frequencia = fields.Str(required=True, validate=validate.OneOf(recorrencia.FREQUENCIAS))
+    intervalo = fields.Integer(load_default=1, validate=validate.Range(min=1, max=12))
+    ocorrencias = fields.Integer(validate=validate.Range(min=1, max=recorrencia.MAXIMO_OCORRENCIAS))
+    ate = fields.Date()
+
+class AgendamentoSerieSchema(AgendamentoSchema):
+    recorrencia = fields.Nested(RecorrenciaSchema, required=True)
+    # Sem ignorar_conflitos, qualquer conflito impede a criação de toda a série
+    ignorar_conflitos = fields.Boolean(load_default=False)
+
 # Verificações de permissão
 def verificar_permissao_admin():
     jwt_data = get_jwt()
     return jwt_data.get('perfil') == 'admin'
 
-def verificar_acesso_barbeiro(barbeiro_id):
-    jwt_data = get_jwt()
-    usuario_id = get_jwt_identity()
-    
-    if jwt_data.get('perfil') == 'admin':
-        return True
-    
-    if jwt_data.get('perfil') == 'barbeiro':
-        barbeiro = Barbeiro.query.filter_by(usuario_id=usuario_id).first()
-        return barbeiro and barbeiro.id == barbeiro_id
-    
-    return False
-
-def verificar_acesso_cliente(cliente_id):
-    jwt_data = get_jwt()
-    usuario_id = get_jwt_identity()
-    
-    if jwt_data.get('perfil') == 'admin':
-        return True
-    
-    if jwt_data.get('perfil') == 'cliente':
-        cliente = Cliente.query.filter_by(id=cliente_id).first()
-        usuario = Usuario.query.filter_by(id=usuario_id, email=cliente.email).first()
-        return usuario is not None
-    
-    return False
+# Barbeiro e cliente do usuário vêm das claims do token (sem consulta por requisição)
+verificar_acesso_barbeiro = autorizacao.pode_acessar_barbeiro
+verificar_acesso_cliente = autorizacao.pode_acessar_cliente
 
 @agendamentos_bp.route('/', methods=['GET'])
 def listar_agendamentos():
@@ -67,7 +99,7 @@ def listar_agendamentos():
     por_pagina = int(request.args.get('por_pagina', 10))
     
     # Construir consulta com filtros
-    query = Agendamento.query
+    query = com_relacionamentos(Agendamento.query, Agendamento)
     
     if status:
         query = query.filter(Agendamento.status == status)
@@ -92,17 +124,34 @@ def listar_agendamentos():
     if cliente_id:
         query = query.filter(Agendamento.cliente_id == cliente_id)
     
-    # Ordenar e paginar resultados
-    query = query.order_by(Agendamento.data_hora_inicio.desc())
-    resultados = query.paginate(page=pagina, per_page=por_pagina)
+    serie_id = request.args.get('serie_id')
+    if serie_id:
+        query = query.filter(Agendamento.serie_id == serie_id)
     
-    return jsonify({
-        'total': resultados.total,
-        'paginas': resultados.pages,
-        'pagina_atual': pagina,
-        'por_pagina': por_pagina,
-        'items': [agendamento.to_dict() for agendamento in resultados.items]
-    }), 200
+    # Paginação por cursor (opcional), sem COUNT e sem OFFSET
+    if paginacao.usar_cursor():
+        return paginacao.resposta_cursor(query, [(Agendamento.data_hora_inicio, True), (Agendamento.id, True)])
+    
+    # Versão do conjunto filtrado (ETag); a quantidade também serve de total da paginação
+    versao = condicional.versao_colecao(
+        consulta_versao_agendamentos(query), *[coluna for coluna, _ in ATUALIZACOES_AGENDAMENTOS]
+    )
+    total = versao[0]
+    
+    def gerar():
+        # Ordenar e paginar resultados
+        resultados = query.order_by(Agendamento.data_hora_inicio.desc())\
+            .paginate(page=pagina, per_page=por_pagina, count=False)
+        
+        return jsonify({
+            'total': total,
+            'paginas': -(-total // por_pagina) if por_pagina else 0,
+            'pagina_atual': pagina,
+            'por_pagina': por_pagina,
+            'items': [agendamento.to_dict() for agendamento in resultados.items]
+        }), 200
+    
+    return condicional.responder_colecao(versao, gerar)
 
 @agendamentos_bp.route('/<int:id>', methods=['GET'])
 def obter_agendamento(id):
@@ -172,28 +221,17 @@ def criar_agendamento():
         # Verificar permissão
         jwt_data = get_jwt()
         perfil = jwt_data.get('perfil')
-        usuario_id = get_jwt_identity()
         
-        if perfil == 'cliente':
-            # Cliente só pode criar agendamento para si mesmo
-            usuario = Usuario.query.get(usuario_id)
-            if not usuario or not usuario.email:
-                return jsonify({"erro": "Acesso negado"}), 403
-            
-            cliente_do_usuario = Cliente.query.filter_by(email=usuario.email).first()
-            if not cliente_do_usuario or cliente_do_usuario.id != cliente.id:
-                return jsonify({"erro": "Acesso negado"}), 403
+        # Cliente só pode criar agendamento para si mesmo
+        if perfil == 'cliente' and not verificar_acesso_cliente(cliente.id):
+            return jsonify({"erro": "Acesso negado"}), 403
         
-        # Calcular duração com base nos serviços
-        duracao_total = 0
-        servicos_validos = []
-        for servico_id in servicos_ids:
-            servico = Servico.query.get(servico_id)
-            if not servico:
-                return jsonify({"erro": f"Serviço ID {servico_id} não encontrado"}), 404
-            
-            duracao_total += servico.duracao_estimada_min
-            servicos_validos.append({"servico_id": servico_id})
+        # Calcular duração com base nos serviços (catálogo em memória)
+        try:
+            duracao_total = catalogo_servicos.obter_catalogo(verificar=True).duracao_total(servicos_ids)
+        except KeyError as e:
+            return jsonify({"erro": f"Serviço ID {e.args[0]} não encontrado"}), 404
+        servicos_validos = [{"servico_id": servico_id} for servico_id in servicos_ids]
         
         data_hora_fim = data_hora_inicio + timedelta(minutes=duracao_total)
         
@@ -228,6 +266,7 @@ def criar_agendamento():
             db.session.add(agendamento_servico)
         
         db.session.commit()
+        disponibilidade.sincronizar(agendamento)
         
         return jsonify({
             "mensagem": "Agendamento criado com sucesso",
@@ -235,9 +274,128 @@ def criar_agendamento():
         }), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Erro ao criar agendamento: {str(e)}")
+        current_app.logger.exception("Erro ao criar agendamento")
         return jsonify({"erro": f"Erro ao criar agendamento: {str(e)}"}), 500
 
+@agendamentos_bp.route('/serie', methods=['POST'])
+@jwt_required()
+def criar_serie_agendamentos():
+    """
+    Cria uma série recorrente (ex.: a cada 2 semanas, sexta 18h). Cliente, barbeiro e
+    serviços são validados uma vez, todas as ocorrências são conferidas contra a agenda
+    do barbeiro em uma única consulta e inseridas na mesma transação.
+    """
+    try:
+        data = AgendamentoSerieSchema().load(request.json or {})
+    except ValidationError as err:
+        return jsonify({"erro": "Dados inválidos", "detalhes": err.messages}), 400
+    
+    # Horários com fuso são convertidos para o horário local, sem fuso, como os demais da agenda
+    data_hora_inicio = data['data_hora_inicio']
+    if data_hora_inicio.tzinfo is not None:
+        data_hora_inicio = data_hora_inicio.astimezone().replace(tzinfo=None)
+    
+    regra = data['recorrencia']
+    try:
+        datas = recorrencia.expandir(
+            data_hora_inicio,
+            regra['frequencia'],
+            regra['intervalo'],
+            ocorrencias=regra.get('ocorrencias'),
+            ate=regra.get('ate')
+        )
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    # Verificações de existência (uma vez para toda a série)
+    cliente = Cliente.query.get(data['cliente_id'])
+    if not cliente:
+        return jsonify({"erro": "Cliente não encontrado"}), 404
+    
+    barbeiro = Barbeiro.query.get(data['barbeiro_id'])
+    if not barbeiro:
+        return jsonify({"erro": "Barbeiro não encontrado"}), 404
+    
+    if not barbeiro.disponivel:
+        return jsonify({"erro": "Barbeiro não está disponível"}), 400
+    
+    # Verificar permissão
+    jwt_data = get_jwt()
+    if jwt_data.get('perfil') == 'cliente' and not verificar_acesso_cliente(cliente.id):
+        return jsonify({"erro": "Acesso negado"}), 403
+    
+    # Serviços validados no catálogo em memória
+    servicos_ids = [item['servico_id'] for item in data['servicos']]
+    try:
+        duracao = timedelta(minutes=catalogo_servicos.obter_catalogo(verificar=True).duracao_total(servicos_ids))
+    except KeyError as e:
+        return jsonify({"erro": f"Serviço ID {e.args[0]} não encontrado"}), 404
+    intervalos = [(inicio, inicio + duracao) for inicio in datas]
+    
+    # Conflitos de todas as ocorrências com uma consulta por intervalo total
+    conflitos = disponibilidade.conflitos_em_lote(barbeiro.id, intervalos)
+    ocorrencias_conflito = [
+        {
+            "data_hora_inicio": inicio.isoformat(),
+            "data_hora_fim": fim.isoformat(),
+            "conflitos": [agendamento.id for agendamento in conflito]
+        }
+        for (inicio, fim), conflito in zip(intervalos, conflitos) if conflito
+    ]
+    
+    if ocorrencias_conflito and not data['ignorar_conflitos']:
+        return jsonify({
+            "erro": "Há ocorrências da série em horários indisponíveis para o barbeiro",
+            "ocorrencias_conflito": ocorrencias_conflito
+        }), 409
+    
+    livres = [intervalo for intervalo, conflito in zip(intervalos, conflitos) if not conflito]
+    if not livres:
+        return jsonify({
+            "erro": "Nenhuma ocorrência da série está disponível",
+            "ocorrencias_conflito": ocorrencias_conflito
+        }), 409
+    
+    # Inserção em lote (executemany) dos agendamentos; os ids são lidos de volta pela série
+    serie_id = uuid.uuid4().hex
+    db.session.execute(insert(Agendamento), [
+        {
+            'cliente_id': cliente.id,
+            'barbeiro_id': barbeiro.id,
+            'data_hora_inicio': inicio,
+            'data_hora_fim': fim,
+            'status': 'pendente',
+            'observacoes': data.get('observacoes'),
+            'serie_id': serie_id
+        }
+        for inicio, fim in livres
+    ])
+    ids = db.session.scalars(db.select(Agendamento.id).where(Agendamento.serie_id == serie_id)).all()
+    
+    db.session.execute(insert(AgendamentoServico), [
+        {'agendamento_id': agendamento_id, 'servico_id': servico_id}
+        for agendamento_id in ids for servico_id in servicos_ids
+    ])
+    db.session.commit()
+    
+    agendamentos = Agendamento.query.filter_by(serie_id=serie_id).order_by(Agendamento.data_hora_inicio).all()
+    for agendamento in agendamentos:
+        disponibilidade.sincronizar(agendamento)
+    
+    return jsonify({
+        "mensagem": f"{len(agendamentos)} agendamento(s) criado(s) na série",
+        "serie_id": serie_id,
+        "agendamentos": [
+            {
+                "id": agendamento.id,
+                "data_hora_inicio": agendamento.data_hora_inicio.isoformat(),
+                "data_hora_fim": agendamento.data_hora_fim.isoformat()
+            }
+            for agendamento in agendamentos
+        ],
+        "ocorrencias_conflito": ocorrencias_conflito
+    }), 201
+
 @agendamentos_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def atualizar_agendamento(id):
@@ -257,11 +415,8 @@ def atualizar_agendamento(id):
     if perfil not in ['admin', 'barbeiro']:
         return jsonify({"erro": "Acesso negado"}), 403
     
-    if perfil == 'barbeiro':
-        usuario_id = get_jwt_identity()
-        barbeiro = Barbeiro.query.filter_by(usuario_id=usuario_id).first()
-        if not barbeiro or barbeiro.id != agendamento.barbeiro_id:
-            return jsonify({"erro": "Acesso negado"}), 403
+    if perfil == 'barbeiro' and not verificar_acesso_barbeiro(agendamento.barbeiro_id):
+        return jsonify({"erro": "Acesso negado"}), 403
     
     # Carregar e validar os dados da requisição
     try:
@@ -294,11 +449,12 @@ def atualizar_agendamento(id):
         
         # Se temos novos serviços, calculamos com base neles
         if 'servicos' in data and data['servicos']:
-            for servico_item in data['servicos']:
-                servico = Servico.query.get(servico_item['servico_id'])
-                if not servico:
-                    return jsonify({"erro": f"Serviço ID {servico_item['servico_id']} não encontrado"}), 404
-                duracao_total += servico.duracao_estimada_min
+            try:
+                duracao_total = catalogo_servicos.obter_catalogo(verificar=True).duracao_total(
+                    [servico_item['servico_id'] for servico_item in data['servicos']]
+                )
+            except KeyError as e:
+                return jsonify({"erro": f"Serviço ID {e.args[0]} não encontrado"}), 404
         else:
             # Senão, mantemos a mesma duração que tinha antes
             duracao_total = (agendamento.data_hora_fim - agendamento.data_hora_inicio).total_seconds() / 60
@@ -321,16 +477,15 @@ def atualizar_agendamento(id):
     if 'observacoes' in data:
         agendamento.observacoes = data['observacoes']
     
-    # Atualizar status
-    if 'status' in data:
-        agendamento.status = data['status']
-    
     # Atualizar serviços associados (se fornecidos)
     if 'servicos' in data:
         # Remover serviços existentes
         for servico in agendamento.servicos:
             db.session.delete(servico)
         
+        # Os serviços fazem parte da versão (ETag) do agendamento nas listagens
+        agendamento.updated_at = datetime.utcnow()
+        
         # Adicionar novos serviços
         for servico_item in data['servicos']:
             agendamento_servico = AgendamentoServico(
@@ -341,14 +496,18 @@ def atualizar_agendamento(id):
         
         # Recalcular data_hora_fim se não atualizamos a data e hora de início
         if not nova_data_hora:
-            duracao_total = 0
-            for servico_item in data['servicos']:
-                servico = Servico.query.get(servico_item['servico_id'])
-                duracao_total += servico.duracao_estimada_min
+            try:
+                duracao_total = catalogo_servicos.obter_catalogo(verificar=True).duracao_total(
+                    [servico_item['servico_id'] for servico_item in data['servicos']]
+                )
+            except KeyError as e:
+                db.session.rollback()
+                return jsonify({"erro": f"Serviço ID {e.args[0]} não encontrado"}), 404
             
             agendamento.data_hora_fim = agendamento.data_hora_inicio + timedelta(minutes=duracao_total)
     
     db.session.commit()
+    disponibilidade.sincronizar(agendamento)
     
     return jsonify({
         "mensagem": "Agendamento atualizado com sucesso",
@@ -378,6 +537,7 @@ def excluir_agendamento(id):
     
     db.session.delete(agendamento)
     db.session.commit()
+    disponibilidade.descartar(id)
     
     return jsonify({"mensagem": "Agendamento removido com sucesso"}), 200
 
@@ -389,10 +549,9 @@ def agendamentos_cliente(cliente_id):
         return jsonify({"erro": "Acesso negado"}), 403
     
     # Listar agendamentos do cliente
-    agendamentos = Agendamento.query.filter_by(cliente_id=cliente_id)\
-        .order_by(Agendamento.data_hora_inicio.desc()).all()
+    query = com_relacionamentos(Agendamento.query, Agendamento).filter(Agendamento.cliente_id == cliente_id)
     
-    return jsonify([agendamento.to_dict() for agendamento in agendamentos]), 200
+    return responder_agendamentos(query, Agendamento.data_hora_inicio.desc())
 
 @agendamentos_bp.route('/barbeiro/<int:barbeiro_id>', methods=['GET'])
 @jwt_required()
@@ -405,7 +564,7 @@ def agendamentos_barbeiro(barbeiro_id):
     data = request.args.get('data')
     
     # Listar agendamentos do barbeiro
-    query = Agendamento.query.filter_by(barbeiro_id=barbeiro_id)
+    query = com_relacionamentos(Agendamento.query, Agendamento).filter_by(barbeiro_id=barbeiro_id)
     
     if data:
         # Converter data para datetime
@@ -421,9 +580,7 @@ def agendamentos_barbeiro(barbeiro_id):
         except ValueError:
             return jsonify({"erro": "Formato de data inválido. Use ISO 8601 (YYYY-MM-DD)"}), 400
     
-    agendamentos = query.order_by(Agendamento.data_hora_inicio).all()
-    
-    return jsonify([agendamento.to_dict() for agendamento in agendamentos]), 200
+    return responder_agendamentos(query, Agendamento.data_hora_inicio)
 
 @agendamentos_bp.route('/data/<string:data>', methods=['GET'])
 def listar_agendamentos_por_data(data):
@@ -438,18 +595,23 @@ def listar_agendamentos_por_data(data):
     fim_dia = datetime.combine(data_obj.date(), datetime.max.time())
     
     # Buscar agendamentos do dia
-    agendamentos = Agendamento.query.filter(
+    query = com_relacionamentos(Agendamento.query, Agendamento).filter(
         Agendamento.data_hora_inicio >= inicio_dia,
         Agendamento.data_hora_inicio <= fim_dia
-    ).order_by(Agendamento.data_hora_inicio).all()
+    )
     
-    # Converter para dicionários
-    agendamentos_dict = [agendamento.to_dict() for agendamento in agendamentos]
-    
-    # Logar para debug
-    print(f"Agendamentos encontrados para {data}: {len(agendamentos_dict)}")
+    return responder_agendamentos(query, Agendamento.data_hora_inicio)
+
+@agendamentos_bp.route('/dia/<string:data>', methods=['GET'])
+def agenda_do_dia(data):
+    # Agenda compacta do dashboard (nomes, horários, serviços e valor), servida do cache
+    try:
+        dia = datetime.strptime(data, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({"erro": "Formato de data inválido. Use YYYY-MM-DD"}), 400
     
-    return jsonify(agendamentos_dict), 200
+    agendamentos = dashboard.agendamentos_do_dia_em_cache(dia)
+    return jsonify({'data': data, 'total': len(agendamentos), 'agendamentos': agendamentos}), 200
 
 @agendamentos_bp.route('/disponibilidade', methods=['GET'])
 def verificar_disponibilidade():
@@ -508,28 +670,30 @@ def verificar_disponibilidade():
                 }
             }), 200
     
-    # Verificar horário de funcionamento (assumindo 9h às 18h)
+    # Verificar horário de funcionamento (definido nas configurações)
+    hora_abertura, hora_fechamento, dias_funcionamento = configuracoes.horario_funcionamento()
     hora = data_obj.hour
-    if hora < 9 or hora >= 18:
+    if hora < hora_abertura or hora >= hora_fechamento:
         return jsonify({
             "disponivel": False,
-            "mensagem": "Horário fora do expediente (9h às 18h)"
+            "mensagem": f"Horário fora do expediente ({hora_abertura}h às {hora_fechamento}h)"
         }), 200
     
-    # Verificar se é fim de semana (0 = Segunda, 6 = Domingo)
+    # Verificar dia de funcionamento (0 = Segunda, 6 = Domingo)
     dia_semana = data_obj.weekday()
-    if dia_semana >= 5:  # Sábado ou Domingo
+    if dia_semana not in dias_funcionamento:
         return jsonify({
             "disponivel": False,
-            "mensagem": f"Estabelecimento não funciona aos {'domingos' if dia_semana == 6 else 'sábados'}"
+            "mensagem": f"Estabelecimento não funciona aos {NOMES_DIAS_SEMANA[dia_semana]}"
         }), 200
     
     # Se chegou até aqui, o horário está disponível
     # Calcular próximos horários disponíveis
     horarios_disponiveis = []
-    horario_atual = inicio_dia.replace(hour=9, minute=0)  # Começa às 9h
+    horario_atual = inicio_dia.replace(hour=hora_abertura, minute=0)
+    agora = datetime.now()
     
-    while horario_atual.hour < 18:  # Até as 18h
+    while horario_atual.hour < hora_fechamento:
         # Verificar se o horário atual está disponível
         horario_fim = horario_atual + timedelta(minutes=duracao)
         disponivel = True
@@ -540,7 +704,7 @@ def verificar_disponibilidade():
                 break
         
         # Se o horário já passou, não é disponível
-        if horario_atual < datetime.now():
+        if horario_atual < agora:
             disponivel = False
         
         if disponivel:
@@ -555,13 +719,71 @@ def verificar_disponibilidade():
         "proximos_horarios": horarios_disponiveis[:5]  # Retornar apenas os próximos 5 horários disponíveis
     }), 200
 
+@agendamentos_bp.route('/disponibilidade/lote', methods=['GET'])
+def disponibilidade_lote():
+    """
+    Horários livres de todos os barbeiros disponíveis (ou dos informados em
+    barbeiro_ids) em uma janela de dias, calculados a partir de uma única consulta.
+    """
+    data = request.args.get('data')
+    dias = request.args.get('dias', type=int, default=7)
+    duracao = request.args.get('duracao', type=int, default=30)  # Duração em minutos
+    passo = request.args.get('passo', type=int, default=30)  # Intervalo entre horários
+    barbeiro_ids = request.args.get('barbeiro_ids')
+    
+    # Validar parâmetros
+    try:
+        data_inicial = datetime.strptime(data, '%Y-%m-%d').date() if data else datetime.now().date()
+    except ValueError:
+        return jsonify({"erro": "Formato de data inválido. Use YYYY-MM-DD"}), 400
+    
+    if dias < 1 or dias > 31:
+        return jsonify({"erro": "O parâmetro dias deve estar entre 1 e 31"}), 400
+    
+    if duracao < 5 or passo < 5:
+        return jsonify({"erro": "Duração e passo devem ser de pelo menos 5 minutos"}), 400
+    
+    # Barbeiros considerados (ativos e disponíveis)
+    query = db.session.query(Barbeiro.id, Usuario.nome).join(Usuario).filter(
+        Usuario.ativo == True,
+        Barbeiro.disponivel == True
+    )
+    
+    if barbeiro_ids:
+        try:
+            ids = [int(valor) for valor in barbeiro_ids.split(',') if valor.strip()]
+        except ValueError:
+            return jsonify({"erro": "Lista de barbeiro_ids inválida"}), 400
+        query = query.filter(Barbeiro.id.in_(ids))
+    
+    barbeiros = query.order_by(Usuario.nome).all()
+    
+    resultado = disponibilidade.calcular_disponibilidade_lote(
+        [barbeiro.id for barbeiro in barbeiros],
+        data_inicial,
+        dias,
+        duracao_min=duracao,
+        passo_min=passo,
+        agora=datetime.now()
+    )
+    
+    return jsonify({
+        "data_inicio": data_inicial.isoformat(),
+        "dias": dias,
+        "duracao": duracao,
+        "barbeiros": [{
+            "barbeiro_id": barbeiro.id,
+            "nome": barbeiro.nome,
+            "dias": resultado[barbeiro.id]
+        } for barbeiro in barbeiros]
+    }), 200
+
 @agendamentos_bp.route('/<int:id>/concluir', methods=['POST'])
 @jwt_required()
 def concluir_agendamento(id):
     # Verificar permissões (apenas barbeiro do agendamento ou admin)
     jwt_data = get_jwt()
     perfil = jwt_data.get('perfil')
-    usuario_id = get_jwt_identity()
     
     if perfil not in ['admin', 'barbeiro']:
         return jsonify({"erro": "Permissão negada. Apenas administradores ou barbeiros podem concluir agendamentos."}), 403
@@ -573,10 +795,8 @@ def concluir_agendamento(id):
         return jsonify({"erro": "Agendamento não encontrado"}), 404
     
     # Verificar se barbeiro tem permissão para este agendamento
-    if perfil == 'barbeiro':
-        barbeiro = Barbeiro.query.filter_by(usuario_id=usuario_id).first()
-        if not barbeiro or barbeiro.id != agendamento.barbeiro_id:
-            return jsonify({"erro": "Você não tem permissão para concluir este agendamento"}), 403
+    if perfil == 'barbeiro' and not verificar_acesso_barbeiro(agendamento.barbeiro_id):
+        return jsonify({"erro": "Você não tem permissão para concluir este agendamento"}), 403
     
     # Verificar se agendamento pode ser concluído
     if agendamento.status == 'cancelado':
@@ -585,9 +805,11 @@ def concluir_agendamento(id):
     if agendamento.status == 'concluido':
         return jsonify({"mensagem": "Agendamento já está concluído"}), 200
     
-    # Atualizar status do agendamento
+    # Atualizar status do agendamento e o histórico do cliente na mesma transação
     agendamento.status = 'concluido'
+    Cliente.registrar_atendimento(agendamento.cliente_id, agendamento.data_hora_inicio)
     db.session.commit()
+    agregacoes.invalidar_estatisticas_clientes()
     
     # Registrar atendimento se ainda não existir
     from app.models.atendimento import Atendimento
@@ -621,7 +843,6 @@ def cancelar_agendamento(id):
     # Verificar permissões (cliente do agendamento, barbeiro do agendamento ou admin)
     jwt_data = get_jwt()
     perfil = jwt_data.get('perfil')
-    usuario_id = get_jwt_identity()
     
     # Buscar agendamento
     agendamento = Agendamento.query.get(id)
@@ -630,18 +851,10 @@ def cancelar_agendamento(id):
         return jsonify({"erro": "Agendamento não encontrado"}), 404
     
     # Verificar permissões específicas
-    tem_permissao = False
-    
-    if perfil == 'admin':
-        tem_permissao = True
-    elif perfil == 'barbeiro':
-        barbeiro = Barbeiro.query.filter_by(usuario_id=usuario_id).first()
-        tem_permissao = barbeiro and barbeiro.id == agendamento.barbeiro_id
-    elif perfil == 'cliente':
-        # Verificar se o cliente pertence ao usuário
-        cliente = Cliente.query.filter_by(id=agendamento.cliente_id).first()
-        usuario = Usuario.query.get(usuario_id)
-        tem_permissao = cliente and usuario and cliente.email == usuario.email
+    if perfil == 'barbeiro':
+        tem_permissao = verificar_acesso_barbeiro(agendamento.barbeiro_id)
+    else:
+        tem_permissao = verificar_acesso_cliente(agendamento.cliente_id)
     
     if not tem_permissao:
         return jsonify({"erro": "Você não tem permissão para cancelar este agendamento"}), 403
@@ -669,6 +882,7 @@ def cancelar_agendamento(id):
     agendamento.status = 'cancelado'
     agendamento.observacoes = f"{agendamento.observacoes or ''}\nCancelamento: {motivo}".strip()
     db.session.commit()
+    disponibilidade.sincronizar(agendamento)
     
     return jsonify({
         "mensagem": "Agendamento cancelado com sucesso",
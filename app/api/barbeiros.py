@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from marshmallow import Schema, fields, validate, ValidationError
 from flask_jwt_extended import jwt_required, get_jwt
 from datetime import datetime, timedelta
@@ -6,6 +6,8 @@ from app import db
 from app.models.barbeiro import Barbeiro
 from app.models.usuario import Usuario
 from app.models.agendamento import Agendamento
+from app.services.cache import obter_cache
+from app.services.serializacao import com_relacionamentos
 
 barbeiros_bp = Blueprint('barbeiros', __name__)
 
@@ -33,6 +35,21 @@ def verificar_permissao_admin():
         # Em ambiente de desenvolvimento, permitir acesso
         return True
 
+def serializar_barbeiros(barbeiros):
+    """
+    Serializa uma lista de barbeiros calculando os agendamentos do dia de todos
+    com uma única consulta agrupada. Se BARBEIROS_CONTAGEM_TTL (segundos) for
+    maior que zero, a contagem do dia fica em cache por esse tempo.
+    """
+    ttl = current_app.config.get('BARBEIROS_CONTAGEM_TTL', 0)
+    if ttl:
+        chave = f"barbeiros:agendamentos_dia:{datetime.now().date().isoformat()}"
+        contagens = obter_cache().obter_ou_calcular(chave, ttl, Barbeiro.contar_agendamentos_dia)
+    else:
+        contagens = Barbeiro.contar_agendamentos_dia([barbeiro.id for barbeiro in barbeiros])
+    
+    return [barbeiro.to_dict(agendamentos_hoje=contagens.get(barbeiro.id, 0)) for barbeiro in barbeiros]
+
 @barbeiros_bp.route('/', methods=['GET'])
 # @jwt_required()  # Removido temporariamente para testes
 def listar_barbeiros():
@@ -106,11 +123,11 @@ def listar_barbeiros():
                 barbeiros = barbeiros.filter(Barbeiro.disponivel == True)
                 
             # Logar para debug
-            print(f"Filtrando barbeiros para data/hora: {data_hora_str}")
+            current_app.logger.debug("Filtrando barbeiros para data/hora: %s", data_hora_str)
             
         except Exception as e:
             # Logar o erro, mas continuar fornecendo todos os barbeiros
-            print(f"Erro ao filtrar barbeiros por disponibilidade: {str(e)}")
+            current_app.logger.warning("Erro ao filtrar barbeiros por disponibilidade: %s", e)
             # Em caso de erro, filtrar ao menos pelo flag de disponibilidade
             barbeiros = barbeiros.filter(Barbeiro.disponivel == True)
     else:
@@ -118,12 +135,17 @@ def listar_barbeiros():
         barbeiros = barbeiros.filter(Barbeiro.disponivel == True)
     
     # Obter a lista de barbeiros
-    resultado = barbeiros.all()
+    resultado = com_relacionamentos(barbeiros, Barbeiro).all()
     
     # Converter para dicionário com informações completas
-    barbeiros_json = [barbeiro.to_dict() for barbeiro in resultado]
-    
-    return jsonify(barbeiros_json), 200
+    barbeiros_json = serializar_barbeiros(resultado)
+    
+    # A lista depende também da agenda (filtro de horário e contagem do dia), então o
+    # ETag vem do próprio corpo: economiza a transferência, não a serialização
+    response = jsonify(barbeiros_json)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @barbeiros_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
@@ -481,13 +503,13 @@ def barbeiros_disponiveis():
                 
         except Exception as e:
             # Em caso de erro, somente logar e continuar
-            print(f"Erro ao filtrar barbeiros por disponibilidade: {str(e)}")
+            current_app.logger.warning("Erro ao filtrar barbeiros por disponibilidade: %s", e)
     
     # Obter a lista final de barbeiros
-    resultado = barbeiros.all()
+    resultado = com_relacionamentos(barbeiros, Barbeiro).all()
     
     # Converter para formato JSON
-    barbeiros_json = [barbeiro.to_dict() for barbeiro in resultado]
+    barbeiros_json = serializar_barbeiros(resultado)
     
     return jsonify(barbeiros_json), 200
 
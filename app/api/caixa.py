@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app import db
 from app.models.caixa_diario import CaixaDiario
 from app.models.pagamento import Pagamento
+from app.services import paginacao
 from datetime import datetime
 
 caixa_bp = Blueprint('caixa', __name__)
@@ -138,6 +139,7 @@ def registrar_movimento():
     )
     
     db.session.add(pagamento)
+    CaixaDiario.registrar_movimento(caixa_aberto.id, data['tipo'], data['valor'])
     db.session.commit()
     
     return jsonify({
@@ -169,6 +171,10 @@ def listar_historico():
         data_fim = datetime.fromisoformat(data_fim)
         query = query.filter(CaixaDiario.data_abertura <= data_fim)
     
+    # Paginação por cursor (opcional), sem COUNT e sem OFFSET
+    if paginacao.usar_cursor():
+        return paginacao.resposta_cursor(query, [(CaixaDiario.data_abertura, True), (CaixaDiario.id, True)])
+    
     # Ordenar e paginar resultados
     query = query.order_by(CaixaDiario.data_abertura.desc())
     resultados = query.paginate(page=pagina, per_page=por_pagina)
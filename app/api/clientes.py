@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app import db
 from app.models.cliente import Cliente
 from app.models.usuario import Usuario
+from app.services import agregacoes, busca as indice_busca, condicional, paginacao
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
@@ -46,11 +47,11 @@ def listar_clientes():
     
     # Aplicar filtro de busca se fornecido
     if busca:
-        query = query.filter(db.or_(
-            Cliente.nome.ilike(f'%{busca}%'),
-            Cliente.telefone.ilike(f'%{busca}%'),
-            Cliente.email.ilike(f'%{busca}%')
-        ))
+        query = query.filter(indice_busca.filtro_busca(Cliente, busca))
+    
+    # Paginação por cursor (opcional), sem COUNT e sem OFFSET
+    if paginacao.usar_cursor():
+        return paginacao.resposta_cursor(query, [(Cliente.nome, False), (Cliente.id, False)])
     
     # Ordenar e paginar resultados
     query = query.order_by(Cliente.nome.asc())
@@ -72,7 +73,7 @@ def obter_cliente(id):
     if not cliente:
         return jsonify({"erro": "Cliente não encontrado"}), 404
     
-    return jsonify(cliente.to_dict()), 200
+    return condicional.responder_registro(cliente)
 
 @clientes_bp.route('/', methods=['POST'])
 @jwt_opcional
@@ -191,30 +192,10 @@ def remover_cliente(id):
 @clientes_bp.route('/estatisticas', methods=['GET'])
 @jwt_opcional
 def obter_estatisticas():
-    # Total de clientes
-    total = Cliente.query.count()
-    
-    # Novos clientes este mês
-    data_inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    novos_mes = Cliente.query.filter(Cliente.created_at >= data_inicio_mes).count()
-    
-    # Clientes frequentes (com visita nos últimos 30 dias)
-    data_30_dias = datetime.now() - timedelta(days=30)
-    frequentes = 0
-    
-    # Clientes inativos (sem visita há mais de 90 dias)
-    data_90_dias = datetime.now() - timedelta(days=90)
-    inativos = 0
-    
-    # Implementação básica por enquanto - em um sistema real precisaria
-    # consultar a tabela de agendamentos para calcular frequência
-    
-    return jsonify({
-        "total": total,
-        "novos_mes": novos_mes,
-        "frequentes": frequentes,
-        "inativos": inativos
-    }), 200
+    # Ativos (30 dias), frequentes e inativos (90 dias) em uma única consulta agregada,
+    # reaproveitada por ESTATISTICAS_CLIENTES_TTL segundos; total e novos no mês contados
+    # a cada requisição
+    return jsonify(agregacoes.estatisticas_clientes_em_cache()), 200
 
 @clientes_bp.route('/recentes', methods=['GET'])
 @jwt_opcional
@@ -228,17 +209,12 @@ def listar_clientes_recentes():
 @jwt_opcional
 def buscar_clientes():
     termo = request.args.get('termo', '')
+    limite = request.args.get('limite', 10, type=int)
     
     if not termo or len(termo) < 2:
         return jsonify([]), 200
     
-    # Buscar clientes pelo termo (nome, telefone ou email)
-    clientes = Cliente.query.filter(
-        db.or_(
-            Cliente.nome.ilike(f'%{termo}%'),
-            Cliente.telefone.ilike(f'%{termo}%'),
-            Cliente.email.ilike(f'%{termo}%')
-        )
-    ).limit(10).all()
+    # Buscar clientes pelo termo (nome, telefone ou email), mais relevantes primeiro
+    clientes = indice_busca.buscar(Cliente, termo, limite)
     
     return jsonify([cliente.to_dict() for cliente in clientes]), 200 
\ No newline at end of file
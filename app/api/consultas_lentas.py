@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services.consultas_lentas import ORDENACOES, obter_registro
+
+consultas_lentas_bp = Blueprint('consultas_lentas', __name__)
+
+# Verificação de permissão (Admin)
+def verificar_permissao_admin():
+    return get_jwt().get('perfil') == 'admin'
+
+@consultas_lentas_bp.route('', methods=['GET'])
+@jwt_required()
+def listar_consultas_lentas():
+    """
+    Consultas lentas agrupadas por impressão digital, das que mais pesaram para as
+    que menos pesaram. Parâmetros: ordenar (total, maximo, ocorrencias) e limite.
+    """
+    if not verificar_permissao_admin():
+        return jsonify({"erro": "Permissão negada"}), 403
+
+    ordenar = request.args.get('ordenar', 'total')
+    if ordenar not in ORDENACOES:
+        return jsonify({"erro": f"ordenar deve ser um de: {', '.join(ORDENACOES)}"}), 400
+    limite = request.args.get('limite', 50, type=int)
+
+    registro = obter_registro()
+    return jsonify({
+        "limite_ms": registro.limite_ms,
+        "consultas": registro.listar(ordenar, max(limite, 1))
+    })
+
+@consultas_lentas_bp.route('', methods=['DELETE'])
+@jwt_required()
+def limpar_consultas_lentas():
+    """Zera os grupos em memória (o arquivo rotativo é mantido)"""
+    if not verificar_permissao_admin():
+        return jsonify({"erro": "Permissão negada"}), 403
+
+    obter_registro().limpar()
+    return jsonify({"mensagem": "Registro de consultas lentas zerado"})
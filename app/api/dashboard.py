@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services import dashboard
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Flag para desenvolvimento (desabilitar autenticação)
+DEV_MODE = True
+
+def jwt_opcional(route_function):
+    """Decorador que torna o JWT opcional em ambiente de desenvolvimento"""
+    if DEV_MODE:
+        return route_function
+    else:
+        return jwt_required()(route_function)
+
+def responder_em_cache(dados):
+    # O navegador também pode reaproveitar a resposta pelo tempo em que ela fica no cache do servidor
+    response = jsonify(dados)
+    response.cache_control.private = True
+    response.cache_control.max_age = dashboard.ttl()
+    return response, 200
+
+@dashboard_bp.route('/counters', methods=['GET'])
+@jwt_opcional
+def obter_contadores():
+    # Agendamentos do dia por status, faturamento, caixa aberto, estoque baixo e clientes novos
+    return responder_em_cache(dashboard.contadores_em_cache())
+
+@dashboard_bp.route('/faturamento', methods=['GET'])
+@jwt_opcional
+def obter_faturamento():
+    # Período em dias (7, 30, 90...), incluindo hoje
+    try:
+        dias = int(request.args.get('periodo', 30))
+    except ValueError:
+        return jsonify({"erro": "Período inválido: informe a quantidade de dias"}), 400
+    if dias < 1:
+        return jsonify({"erro": "Período inválido: informe a quantidade de dias"}), 400
+
+    dias = min(dias, dashboard.MAXIMO_DIAS_FATURAMENTO)
+    return responder_em_cache({'periodo': dias, 'faturamento': dashboard.faturamento_em_cache(dias)})
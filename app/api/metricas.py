@@ -0,0 +1,18 @@
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+from app.services.metricas import obter_metricas
+
+metricas_bp = Blueprint('metricas', __name__)
+
+@metricas_bp.route('', methods=['GET'])
+def exportar_metricas():
+    """Métricas por endpoint no formato texto do Prometheus"""
+    token = current_app.config.get('METRICAS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({"erro": "Token de métricas inválido"}), 401
+
+    return current_app.response_class(
+        obter_metricas().exportar(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+        headers={'Cache-Control': 'no-store'}
+    )
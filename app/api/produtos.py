@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt
 from app import db
 from app.models.produto import Produto
 from app.models.movimento_estoque import MovimentoEstoque
+from app.services import agregacoes, busca as indice_busca, condicional, paginacao
 from sqlalchemy import func
 from flask import current_app
 
@@ -46,12 +47,7 @@ def listar_produtos():
     
     # Aplicar filtros
     if busca:
-        query = query.filter(db.or_(
-            Produto.nome.ilike(f'%{busca}%'),
-            Produto.descricao.ilike(f'%{busca}%'),
-            Produto.codigo.ilike(f'%{busca}%'),
-            Produto.marca.ilike(f'%{busca}%')
-        ))
+        query = query.filter(indice_busca.filtro_busca(Produto, busca))
     
     if categoria:
         query = query.filter(Produto.categoria == categoria)
@@ -59,6 +55,10 @@ def listar_produtos():
     if estoque_baixo:
         query = query.filter(Produto.quantidade_estoque <= Produto.estoque_minimo)
     
+    # Paginação por cursor (opcional), sem COUNT e sem OFFSET; nome é único
+    if paginacao.usar_cursor():
+        return paginacao.resposta_cursor(query, [(Produto.nome, False)])
+    
     # Ordenar e paginar resultados
     query = query.order_by(Produto.nome.asc())
     resultados = query.paginate(page=pagina, per_page=por_pagina)
@@ -83,7 +83,7 @@ def obter_produto(id):
     if not produto:
         return jsonify({"erro": "Produto não encontrado"}), 404
     
-    return jsonify(produto.to_dict()), 200
+    return condicional.responder_registro(produto)
 
 @produtos_bp.route('/', methods=['POST'])
 def criar_produto():
@@ -340,37 +340,36 @@ def listar_produtos_estoque_baixo():
 
 @produtos_bp.route('/mais-vendidos', methods=['GET'])
 def produtos_mais_vendidos():
-    # Versão simplificada que não depende de VendaItem
-    # Retorna apenas os produtos atuais ordenados por estoque
+    # Período: dia, semana, mes, ano ou personalizado (data_inicio/data_fim)
     try:
         limite = int(request.args.get('limite', 5))
-        
-        # Ordenar produtos pelo estoque (presumindo que os mais vendidos têm menos estoque)
-        produtos = Produto.query.order_by(Produto.quantidade_estoque.asc()).limit(limite).all()
-        
-        return jsonify([{
-            'id': p.id,
-            'nome': p.nome,
-            'total_vendido': 0  # Valor fictício já que não temos dados reais de vendas
-        } for p in produtos]), 200
-    except Exception as e:
-        return jsonify({"erro": str(e)}), 500
+        inicio, fim = agregacoes.intervalo_periodo(
+            request.args.get('periodo', 'mes'),
+            request.args.get('data_inicio'),
+            request.args.get('data_fim')
+        )
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    # Ranking lido dos contadores diários por produto (apenas vendas finalizadas)
+    ranking = agregacoes.produtos_mais_vendidos(inicio, fim, limite=limite)
+    
+    return jsonify([{
+        'id': produto['produto_id'],
+        'nome': produto['produto_nome'],
+        'total_vendido': produto['quantidade_total'],
+        'valor_total': produto['valor_total']
+    } for produto in ranking]), 200
 
 @produtos_bp.route('/busca', methods=['GET'])
 def buscar_produtos():
     termo = request.args.get('termo', '')
+    limite = request.args.get('limite', 10, type=int)
     
     if not termo or len(termo) < 2:
         return jsonify([]), 200
     
-    # Buscar produtos pelo termo (nome, código, descrição ou marca)
-    produtos = Produto.query.filter(
-        db.or_(
-            Produto.nome.ilike(f'%{termo}%'),
-            Produto.codigo.ilike(f'%{termo}%'),
-            Produto.descricao.ilike(f'%{termo}%'),
-            Produto.marca.ilike(f'%{termo}%')
-        )
-    ).limit(10).all()
+    # Buscar produtos pelo termo (nome, código, descrição ou marca), mais relevantes primeiro
+    produtos = indice_busca.buscar(Produto, termo, limite)
     
     return jsonify([produto.to_dict() for produto in produtos]), 200 
\ No newline at end of file
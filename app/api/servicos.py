@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from marshmallow import Schema, fields, validate, ValidationError
 from flask_jwt_extended import jwt_required, get_jwt
 from app import db
 from app.models.servico import Servico
+from app.services import catalogo_servicos
 
 servicos_bp = Blueprint('servicos', __name__)
 
@@ -26,18 +27,21 @@ def verificar_permissao_admin():
 @servicos_bp.route('/', methods=['GET'])
 # Temporariamente removido para desenvolvimento: @jwt_required()
 def listar_servicos():
-    servicos = Servico.query.order_by(Servico.nome).all()
-    return jsonify([servico.to_dict() for servico in servicos]), 200
+    # Corpo já serializado no catálogo em memória; If-None-Match com o mesmo ETag recebe 304
+    catalogo = catalogo_servicos.obter_catalogo()
+    response = current_app.response_class(catalogo.corpo, mimetype='application/json')
+    response.set_etag(catalogo.etag)
+    return response.make_conditional(request)
 
 @servicos_bp.route('/<int:id>', methods=['GET'])
 # Temporariamente removido para desenvolvimento: @jwt_required()
 def obter_servico(id):
-    servico = Servico.query.get(id)
+    servico = catalogo_servicos.obter_catalogo().obter(id)
     
     if not servico:
         return jsonify({"erro": "Serviço não encontrado"}), 404
     
-    return jsonify(servico.to_dict()), 200
+    return jsonify(servico), 200
 
 @servicos_bp.route('/', methods=['POST'])
 # Temporariamente removido para desenvolvimento: @jwt_required()
@@ -102,6 +106,7 @@ def criar_servico():
     
     db.session.add(servico)
     db.session.commit()
+    catalogo_servicos.invalidar()
     
     return jsonify({
         "mensagem": "Serviço criado com sucesso",
@@ -180,6 +185,7 @@ def atualizar_servico(id):
         servico.duracao_estimada_min = dados_processados['duracao_estimada_min']
     
     db.session.commit()
+    catalogo_servicos.invalidar()
     
     return jsonify({
         "mensagem": "Serviço atualizado com sucesso",
@@ -209,5 +215,6 @@ def remover_servico(id):
     
     db.session.delete(servico)
     db.session.commit()
+    catalogo_servicos.invalidar()
     
     return jsonify({"mensagem": "Serviço removido com sucesso"}), 200 
\ No newline at end of file
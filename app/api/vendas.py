@@ -7,6 +7,10 @@ from app.models.produto import Produto
 from app.models.cliente import Cliente
 from app.models.barbeiro import Barbeiro
 from app.models.pagamento import Pagamento
+from app.models.movimento_estoque import MovimentoEstoque
+from sqlalchemy import insert
+from app.services import agregacoes, exportacao, paginacao, vendas_diarias
+from app.services.serializacao import com_relacionamentos
 from datetime import datetime, timedelta
 
 vendas_bp = Blueprint('vendas', __name__)
@@ -81,6 +85,10 @@ def listar_vendas():
     if cliente_id:
         query = query.filter(Venda.cliente_id == cliente_id)
     
+    # Paginação por cursor (opcional), sem COUNT e sem OFFSET
+    if paginacao.usar_cursor():
+        return paginacao.resposta_cursor(query, [(Venda.data_hora, True), (Venda.id, True)])
+    
     # Ordenar e paginar resultados
     query = query.order_by(Venda.data_hora.desc())
     resultados = query.paginate(page=pagina, per_page=por_pagina)
@@ -144,49 +152,72 @@ def criar_venda():
         status='finalizada'
     )
     
-    db.session.add(venda)
-    db.session.flush()  # Obter ID da venda sem commit
-    
-    # Adicionar itens à venda
+    # Quantidade total por produto (o mesmo produto pode aparecer em mais de um item)
+    quantidades = {}
     for item_data in data['itens']:
-        produto = Produto.query.get(item_data['produto_id'])
+        quantidades[item_data['produto_id']] = quantidades.get(item_data['produto_id'], 0) + item_data['quantidade']
+    
+    # Todos os produtos em uma consulta
+    produtos = {produto.id: produto for produto in Produto.query.filter(Produto.id.in_(list(quantidades)))}
+    
+    for produto_id, quantidade in quantidades.items():
+        produto = produtos.get(produto_id)
         if not produto:
-            db.session.rollback()
-            return jsonify({"erro": f"Produto ID {item_data['produto_id']} não encontrado"}), 404
+            return jsonify({"erro": f"Produto ID {produto_id} não encontrado"}), 404
         
-        # Verificar estoque disponível
-        if produto.quantidade_estoque < item_data['quantidade']:
-            db.session.rollback()
+        # Verificação antecipada; a garantia contra venda sem estoque é o UPDATE condicional abaixo
+        if produto.quantidade_estoque < quantidade:
             return jsonify({
                 "erro": f"Estoque insuficiente para o produto '{produto.nome}'",
                 "disponivel": produto.quantidade_estoque,
-                "solicitado": item_data['quantidade']
+                "solicitado": quantidade
             }), 400
+    
+    db.session.add(venda)
+    db.session.flush()  # Obter ID da venda sem commit
+    
+    # Adicionar itens à venda
+    for item_data in data['itens']:
+        produto = produtos[item_data['produto_id']]
         
         # Obter valor unitário (usar o informado ou o preço atual do produto)
         valor_unitario = item_data.get('valor_unitario', produto.preco)
         
-        # Criar item de venda
-        item = VendaItem(
+        db.session.add(VendaItem(
             venda_id=venda.id,
             produto_id=produto.id,
             quantidade=item_data['quantidade'],
             valor_unitario=valor_unitario,
             percentual_desconto=item_data.get('percentual_desconto', 0.0)
-        )
-        
-        db.session.add(item)
-        
-        # Atualizar estoque do produto
-        try:
-            produto.atualizar_estoque(item_data['quantidade'], 'saida')
-        except ValueError as e:
-            db.session.rollback()
-            return jsonify({"erro": str(e)}), 400
+        ))
+    
+    # Baixa de estoque atômica: falha se outra venda consumiu o estoque depois da leitura acima
+    if not Produto.baixar_estoque(quantidades):
+        db.session.rollback()
+        disponiveis = dict(db.session.query(Produto.id, Produto.quantidade_estoque).filter(Produto.id.in_(list(quantidades))))
+        produto_id = next((pid for pid, quantidade in quantidades.items() if disponiveis.get(pid, 0) < quantidade), None)
+        if produto_id is None:
+            # O estoque mudou entre a baixa recusada e a releitura (ex.: reposição concorrente)
+            return jsonify({"erro": "Estoque alterado, tente novamente"}), 409
+        return jsonify({
+            "erro": f"Estoque insuficiente para o produto '{produtos[produto_id].nome}'",
+            "disponivel": disponiveis.get(produto_id, 0),
+            "solicitado": quantidades[produto_id]
+        }), 400
+    
+    # Movimentos de estoque da venda gravados em lote
+    db.session.execute(insert(MovimentoEstoque), [
+        {'produto_id': produto_id, 'tipo': 'saida', 'quantidade': quantidade, 'motivo': f'Venda #{venda.id}'}
+        for produto_id, quantidade in quantidades.items()
+    ])
     
     # Calcular valor total da venda (aplicando desconto e imposto)
     venda.calcular_total()
     
+    # Consolidado diário atualizado na mesma transação da venda
+    db.session.flush()
+    vendas_diarias.registrar_venda(venda)
+    
     db.session.commit()
     
     return jsonify({
@@ -235,6 +266,7 @@ def registrar_pagamento(id):
     )
     
     db.session.add(pagamento)
+    vendas_diarias.registrar_pagamento(venda, pagamento)
     db.session.commit()
     
     # Verificar se a venda foi totalmente paga
@@ -268,13 +300,22 @@ def cancelar_venda(id):
             "pagamentos": len(venda.pagamentos)
         }), 400
     
-    # Restaurar estoque dos produtos
+    # Restaurar estoque dos produtos em um único UPDATE e registrar os movimentos de entrada
+    quantidades = {}
     for item in venda.itens:
-        produto = Produto.query.get(item.produto_id)
-        if produto:
-            produto.atualizar_estoque(item.quantidade, 'entrada')
-    
-    # Marcar venda como cancelada
+        quantidades[item.produto_id] = quantidades.get(item.produto_id, 0) + item.quantidade
+    
+    Produto.repor_estoque(quantidades)
+    if quantidades:
+        db.session.execute(insert(MovimentoEstoque), [
+            {'produto_id': produto_id, 'tipo': 'entrada', 'quantidade': quantidade,
+             'motivo': f'Cancelamento da venda #{venda.id}'}
+            for produto_id, quantidade in quantidades.items()
+        ])
+    
+    # Marcar venda como cancelada e retirá-la do consolidado diário
+    if venda.status == 'finalizada':
+        vendas_diarias.estornar_venda(venda)
     venda.status = 'cancelada'
     db.session.commit()
     
@@ -299,62 +340,27 @@ def relatorio_diario():
             data = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         
         data_inicio = data.replace(hour=0, minute=0, second=0, microsecond=0)
-        data_fim = data.replace(hour=23, minute=59, second=59, microsecond=999999)
     except ValueError:
         return jsonify({"erro": "Formato de data inválido. Use ISO 8601 (YYYY-MM-DD)"}), 400
     
-    # Buscar vendas do dia
-    vendas = Venda.query.filter(
-        Venda.data_hora >= data_inicio,
-        Venda.data_hora <= data_fim,
-        Venda.status == 'finalizada'
-    ).all()
+    proximo_dia = data_inicio + timedelta(days=1)
     
-    # Calcular totais
-    total_vendas = len(vendas)
-    valor_total = sum(venda.valor_total for venda in vendas)
+    # Totais, métodos de pagamento e produtos mais vendidos agregados no banco
+    totais = agregacoes.totais_vendas(data_inicio, proximo_dia)
+    metodos_pagamento = agregacoes.totais_por_metodo_pagamento(data_inicio, proximo_dia)
+    top_produtos = agregacoes.produtos_mais_vendidos(data_inicio, proximo_dia, limite=10)
     
-    # Agrupar por método de pagamento
-    pagamentos = Pagamento.query.join(Venda).filter(
+    # Vendas do dia para a listagem detalhada
+    vendas = com_relacionamentos(Venda.query, Venda).filter(
         Venda.data_hora >= data_inicio,
-        Venda.data_hora <= data_fim,
+        Venda.data_hora < proximo_dia,
         Venda.status == 'finalizada'
-    ).all()
-    
-    metodos_pagamento = {}
-    for pagamento in pagamentos:
-        metodo = pagamento.forma_pagamento
-        if metodo not in metodos_pagamento:
-            metodos_pagamento[metodo] = 0
-        metodos_pagamento[metodo] += pagamento.valor
-    
-    # Produtos mais vendidos
-    from sqlalchemy import func
-    produtos_vendidos = db.session.query(
-        Produto.id,
-        Produto.nome,
-        func.sum(VendaItem.quantidade).label('quantidade_total'),
-        func.sum(VendaItem.quantidade * VendaItem.valor_unitario).label('valor_total')
-    ).join(VendaItem).join(Venda).filter(
-        Venda.data_hora >= data_inicio,
-        Venda.data_hora <= data_fim,
-        Venda.status == 'finalizada'
-    ).group_by(Produto.id).order_by(func.sum(VendaItem.quantidade).desc()).limit(10).all()
-    
-    top_produtos = [
-        {
-            'produto_id': prod.id,
-            'produto_nome': prod.nome,
-            'quantidade_total': int(prod.quantidade_total),
-            'valor_total': float(prod.valor_total)
-        }
-        for prod in produtos_vendidos
-    ]
+    ).order_by(Venda.data_hora).all()
     
     return jsonify({
         'data': data.isoformat().split('T')[0],
-        'total_vendas': total_vendas,
-        'valor_total': valor_total,
+        'total_vendas': totais['total'],
+        'valor_total': totais['valor'],
         'metodos_pagamento': metodos_pagamento,
         'produtos_mais_vendidos': top_produtos,
         'vendas': [venda.to_dict() for venda in vendas]
@@ -372,40 +378,21 @@ def relatorio_resumo():
     inicio_semana = hoje - timedelta(days=hoje.weekday())
     inicio_mes = hoje.replace(day=1)
     
-    # Vendas de hoje
-    vendas_hoje = Venda.query.filter(
-        Venda.data_hora >= hoje,
-        Venda.status == 'finalizada'
-    ).all()
-    
-    # Vendas da semana
-    vendas_semana = Venda.query.filter(
-        Venda.data_hora >= inicio_semana,
-        Venda.status == 'finalizada'
-    ).all()
-    
-    # Vendas do mês
-    vendas_mes = Venda.query.filter(
-        Venda.data_hora >= inicio_mes,
-        Venda.status == 'finalizada'
-    ).all()
-    
-    # Cálculo do ticket médio atual (mês atual)
-    total_mes = sum(venda.valor_total for venda in vendas_mes)
-    ticket_medio_atual = total_mes / len(vendas_mes) if vendas_mes else 0
-    
-    # Cálculo do ticket médio do mês anterior para comparação
     mes_anterior_inicio = (inicio_mes - timedelta(days=1)).replace(day=1)
-    mes_anterior_fim = inicio_mes - timedelta(days=1)
     
-    vendas_mes_anterior = Venda.query.filter(
-        Venda.data_hora >= mes_anterior_inicio,
-        Venda.data_hora <= mes_anterior_fim,
-        Venda.status == 'finalizada'
-    ).all()
+    # Quantidade e valor de todos os períodos em uma única consulta agregada
+    periodos = agregacoes.totais_vendas_por_periodo({
+        'hoje': (hoje, None),
+        'semana': (inicio_semana, None),
+        'mes': (inicio_mes, None),
+        'mes_anterior': (mes_anterior_inicio, inicio_mes)
+    })
     
-    total_mes_anterior = sum(venda.valor_total for venda in vendas_mes_anterior)
-    ticket_medio_anterior = total_mes_anterior / len(vendas_mes_anterior) if vendas_mes_anterior else 0
+    # Cálculo do ticket médio atual (mês atual) e do mês anterior para comparação
+    mes = periodos['mes']
+    mes_anterior = periodos['mes_anterior']
+    ticket_medio_atual = mes['valor'] / mes['total'] if mes['total'] else 0
+    ticket_medio_anterior = mes_anterior['valor'] / mes_anterior['total'] if mes_anterior['total'] else 0
     
     # Cálculo da variação percentual
     variacao = 0
@@ -413,18 +400,9 @@ def relatorio_resumo():
         variacao = ((ticket_medio_atual - ticket_medio_anterior) / ticket_medio_anterior) * 100
     
     return jsonify({
-        "hoje": {
-            "total": len(vendas_hoje),
-            "valor": sum(venda.valor_total for venda in vendas_hoje)
-        },
-        "semana": {
-            "total": len(vendas_semana),
-            "valor": sum(venda.valor_total for venda in vendas_semana)
-        },
-        "mes": {
-            "total": len(vendas_mes),
-            "valor": sum(venda.valor_total for venda in vendas_mes)
-        },
+        "hoje": periodos['hoje'],
+        "semana": periodos['semana'],
+        "mes": mes,
         "ticket_medio": ticket_medio_atual,
         "ticket_variacao": variacao
     }), 200
@@ -449,11 +427,8 @@ def relatorio_grafico():
     # Calcular data de início
     data_inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=dias-1)
     
-    # Obter vendas no período
-    vendas = Venda.query.filter(
-        Venda.data_hora >= data_inicio,
-        Venda.status == 'finalizada'
-    ).order_by(Venda.data_hora).all()
+    # Valor por dia lido do consolidado diário (no máximo uma linha por dia)
+    serie = agregacoes.serie_diaria(data_inicio)
     
     # Criar dicionário para armazenar dados por dia
     dados_por_dia = {}
@@ -464,10 +439,10 @@ def relatorio_grafico():
         data_str = data.strftime('%Y-%m-%d')
         dados_por_dia[data_str] = 0
     
-    # Somar valores de vendas por dia
-    for venda in vendas:
-        data_str = venda.data_hora.strftime('%Y-%m-%d')
-        dados_por_dia[data_str] += venda.valor_total
+    for dia, valor in serie.items():
+        data_str = dia.strftime('%Y-%m-%d')
+        if data_str in dados_por_dia:
+            dados_por_dia[data_str] += valor
     
     # Formatar datas para exibição dependendo do período
     labels = []
@@ -501,23 +476,9 @@ def relatorio_pagamentos():
     # Definir período: último mês
     data_inicio = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    # Obter todos os pagamentos no período
-    pagamentos = Pagamento.query.join(Venda).filter(
-        Venda.data_hora >= data_inicio,
-        Venda.status == 'finalizada'
-    ).all()
-    
-    # Contagem por método de pagamento
-    metodos = {
-        'dinheiro': 0,
-        'cartao_credito': 0,
-        'cartao_debito': 0,
-        'pix': 0
-    }
-    
-    for pagamento in pagamentos:
-        if pagamento.forma_pagamento in metodos:
-            metodos[pagamento.forma_pagamento] += pagamento.valor
+    # Soma por método de pagamento agregada no banco
+    totais_metodos = agregacoes.totais_por_metodo_pagamento(data_inicio)
+    metodos = {metodo: totais_metodos.get(metodo, 0) for metodo in agregacoes.METODOS_PAGAMENTO}
     
     # Calcular percentuais
     total = sum(metodos.values())
@@ -542,9 +503,13 @@ def exportar_vendas():
     data_inicio = request.args.get('data_inicio')
     data_fim = request.args.get('data_fim')
     status = request.args.get('status')
+    formato = request.args.get('formato', 'json').lower()
     
-    # Construir consulta com filtros
-    query = Venda.query
+    if formato not in exportacao.FORMATOS:
+        return jsonify({"erro": f"Formato inválido. Use: {', '.join(exportacao.FORMATOS)}"}), 400
+    
+    # Construir consulta com filtros (itens, pagamentos, cliente e barbeiro carregados antecipadamente)
+    query = com_relacionamentos(Venda.query, Venda)
     
     if data_inicio:
         data_inicio = datetime.fromisoformat(data_inicio)
@@ -558,7 +523,15 @@ def exportar_vendas():
         query = query.filter(Venda.status == status)
     
     # Ordenar por data (mais recente primeiro)
-    query = query.order_by(Venda.data_hora.desc())
+    query = query.order_by(Venda.data_hora.desc(), Venda.id.desc())
+    
+    # CSV e NDJSON são enviados em streaming, em memória constante
+    if formato != 'json':
+        return exportacao.resposta_streaming(
+            query, formato, f"vendas_{datetime.utcnow().strftime('%Y%m%d')}",
+            colunas_csv=exportacao.COLUNAS_CSV_VENDA,
+            linha_csv=exportacao.linha_csv_venda
+        )
     
     # Obter todas as vendas (sem paginação)
     vendas = query.all()
@@ -0,0 +1,242 @@
+"""Autorização a partir das claims do JWT, sem consultas por requisição.
+
+login e refresh resolvem uma única vez o barbeiro (Barbeiro.usuario_id) e o
+cliente (Cliente.email igual ao do usuário) e gravam barbeiro_id, cliente_id e
+a versao_token do usuário nas claims. As verificações de acesso usam só as claims.
+
+Para as claims não ficarem velhas, a versao_token do usuário é incrementada
+quando algo que elas refletem muda (perfil, ativo, email, senha, vínculo com
+barbeiro ou cliente) e, na mesma transação, o contador de usuarios_versao. Cada
+processo guarda em memória a versão e o status de todos os usuários e compara o
+contador no máximo a cada AUTORIZACAO_INTERVALO_VERIFICACAO segundos, como o
+cache de configurações; um token com versão diferente da atual é recusado como
+revogado (callback token_in_blocklist_loader do flask_jwt_extended).
+
+Tokens sem a claim versao (emitidos antes dela existir) continuam valendo até
+expirar e resolvem barbeiro e cliente no banco.
+"""
+import time
+from flask import current_app, has_app_context, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, func, insert, inspect, select, update
+from app import db, jwt
+from app.models.barbeiro import Barbeiro
+from app.models.cliente import Cliente
+from app.models.usuario import Usuario, VersaoUsuarios
+
+# Atributos do usuário refletidos nas claims, ou cuja alteração deve encerrar as sessões
+ATRIBUTOS_TOKEN = ('perfil', 'ativo', 'email', '_senha_hash')
+
+
+def ler_versao(conexao=None):
+    consulta = select(func.coalesce(func.max(VersaoUsuarios.versao), 0))
+    return (conexao or db.session).execute(consulta).scalar()
+
+
+def incrementar_versao(conexao):
+    tabela = VersaoUsuarios.__table__
+    if conexao.execute(update(tabela).values(versao=tabela.c.versao + 1)).rowcount == 0:
+        conexao.execute(insert(tabela).values(id=1, versao=1))
+
+
+class CacheVersoesTokens:
+    """Versão do token e status de cada usuário, e a versão global a que correspondem"""
+
+    def __init__(self, intervalo_verificacao):
+        self.intervalo_verificacao = intervalo_verificacao
+        # (versao global, {usuario_id: (versao_token, ativo)}), trocado de uma vez a cada recarga
+        self._carregado = None
+        self._verificado_em = 0.0
+
+    def expirar(self):
+        """Força a comparação com a versão do banco na próxima leitura"""
+        self._verificado_em = 0.0
+
+    def _atual(self):
+        carregado = self._carregado
+        agora = time.monotonic()
+        if carregado is not None and agora - self._verificado_em < self.intervalo_verificacao:
+            return carregado
+
+        versao = ler_versao()
+        if carregado is None or carregado[0] != versao:
+            usuarios = {
+                usuario_id: (versao_token or 0, bool(ativo))
+                for usuario_id, versao_token, ativo in db.session.query(
+                    Usuario.id, Usuario.versao_token, Usuario.ativo)
+            }
+            carregado = (versao, usuarios)
+            self._carregado = carregado
+        self._verificado_em = agora
+        return carregado
+
+    def token_valido(self, usuario_id, versao):
+        estado = self._atual()[1].get(usuario_id)
+        if estado is None or estado[0] != versao:
+            # A memória pode estar atrás do banco (usuário criado ou alterado em outro processo)
+            self.expirar()
+            estado = self._atual()[1].get(usuario_id)
+        return estado is not None and estado[1] and estado[0] == versao
+
+
+def obter_cache_versoes():
+    return current_app.extensions['versoes_tokens']
+
+
+def claims_usuario(usuario):
+    """Claims adicionais do token de acesso (consulta barbeiro e cliente só aqui)"""
+    barbeiro_id = cliente_id = None
+    if usuario.perfil == 'barbeiro':
+        barbeiro_id = db.session.query(Barbeiro.id).filter_by(usuario_id=usuario.id).limit(1).scalar()
+    elif usuario.perfil == 'cliente' and usuario.email:
+        cliente_id = db.session.query(Cliente.id).filter_by(email=usuario.email).limit(1).scalar()
+
+    return {
+        'perfil': usuario.perfil,
+        'nome': usuario.nome,
+        'email': usuario.email,
+        'barbeiro_id': barbeiro_id,
+        'cliente_id': cliente_id,
+        'versao': usuario.versao_token or 0
+    }
+
+
+def barbeiro_do_token():
+    """Id do barbeiro vinculado ao usuário do token (None se não houver)"""
+    claims = get_jwt()
+    if 'barbeiro_id' in claims:
+        return claims['barbeiro_id']
+    return db.session.query(Barbeiro.id).filter_by(usuario_id=int(get_jwt_identity())).limit(1).scalar()
+
+
+def cliente_do_token():
+    """Id do cliente vinculado ao usuário do token (None se não houver)"""
+    claims = get_jwt()
+    if 'cliente_id' in claims:
+        return claims['cliente_id']
+    email = db.session.query(Usuario.email).filter_by(id=int(get_jwt_identity())).scalar()
+    if not email:
+        return None
+    return db.session.query(Cliente.id).filter_by(email=email).limit(1).scalar()
+
+
+def pode_acessar_barbeiro(barbeiro_id):
+    """Admin, ou o próprio barbeiro"""
+    perfil = get_jwt().get('perfil')
+    if perfil == 'admin':
+        return True
+    return perfil == 'barbeiro' and barbeiro_id is not None and barbeiro_do_token() == barbeiro_id
+
+
+def pode_acessar_cliente(cliente_id):
+    """Admin, ou o usuário do próprio cliente"""
+    perfil = get_jwt().get('perfil')
+    if perfil == 'admin':
+        return True
+    return perfil == 'cliente' and cliente_id is not None and cliente_do_token() == cliente_id
+
+
+def token_revogado(jwt_header, jwt_payload):
+    versao = jwt_payload.get('versao')
+    if versao is None:
+        return False
+    try:
+        usuario_id = int(jwt_payload['sub'])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return not obter_cache_versoes().token_valido(usuario_id, versao)
+
+
+def resposta_token_revogado(jwt_header, jwt_payload):
+    return jsonify({"erro": "Sessão expirada: dados de acesso alterados. Faça login novamente."}), 401
+
+
+# Eventos que incrementam versao_token (e o contador global) na transação da alteração
+def _versoes_alteradas(conexao):
+    incrementar_versao(conexao)
+    if has_app_context() and 'versoes_tokens' in current_app.extensions:
+        obter_cache_versoes().expirar()
+
+
+def _incrementar_usuarios(conexao, condicao):
+    tabela = Usuario.__table__
+    if conexao.execute(update(tabela).where(condicao).values(versao_token=tabela.c.versao_token + 1)).rowcount:
+        _versoes_alteradas(conexao)
+
+
+def _valores_alterados(mapper, conexao, registro, atributo):
+    """Valores gravado e novo de um atributo alterado (sem None)
+
+    O valor gravado é lido na conexão: depois de um commit o objeto expira e o
+    histórico do atributo não guarda mais o valor anterior.
+    """
+    coluna = mapper.columns[atributo]
+    anterior = conexao.execute(
+        select(coluna).where(mapper.primary_key[0] == inspect(registro).identity[0])
+    ).scalar()
+    return {valor for valor in (anterior, getattr(registro, atributo)) if valor is not None}
+
+
+def _usuario_antes_de_atualizar(mapper, conexao, usuario):
+    estado = inspect(usuario)
+    if any(estado.attrs[atributo].history.has_changes() for atributo in ATRIBUTOS_TOKEN):
+        usuario.versao_token = (usuario.versao_token or 0) + 1
+        _versoes_alteradas(conexao)
+
+
+def _usuario_criado_ou_removido(mapper, conexao, usuario):
+    _versoes_alteradas(conexao)
+
+
+def _incrementar_usuarios_barbeiro(conexao, usuarios):
+    _incrementar_usuarios(conexao, Usuario.__table__.c.id.in_(usuarios))
+
+
+def _incrementar_usuarios_cliente(conexao, emails):
+    tabela = Usuario.__table__
+    if emails:
+        _incrementar_usuarios(conexao, tabela.c.email.in_(emails) & (tabela.c.perfil == 'cliente'))
+
+
+def _barbeiro_criado_ou_removido(mapper, conexao, barbeiro):
+    _incrementar_usuarios_barbeiro(conexao, {barbeiro.usuario_id})
+
+
+def _barbeiro_antes_de_atualizar(mapper, conexao, barbeiro):
+    if inspect(barbeiro).attrs.usuario_id.history.has_changes():
+        _incrementar_usuarios_barbeiro(conexao, _valores_alterados(mapper, conexao, barbeiro, 'usuario_id'))
+
+
+def _cliente_criado_ou_removido(mapper, conexao, cliente):
+    _incrementar_usuarios_cliente(conexao, {cliente.email} - {None})
+
+
+def _cliente_antes_de_atualizar(mapper, conexao, cliente):
+    if inspect(cliente).attrs.email.history.has_changes():
+        _incrementar_usuarios_cliente(conexao, _valores_alterados(mapper, conexao, cliente, 'email'))
+
+
+EVENTOS = (
+    (Usuario, 'before_update', _usuario_antes_de_atualizar),
+    (Usuario, 'after_insert', _usuario_criado_ou_removido),
+    (Usuario, 'after_delete', _usuario_criado_ou_removido),
+    (Barbeiro, 'after_insert', _barbeiro_criado_ou_removido),
+    (Barbeiro, 'after_delete', _barbeiro_criado_ou_removido),
+    (Barbeiro, 'before_update', _barbeiro_antes_de_atualizar),
+    (Cliente, 'after_insert', _cliente_criado_ou_removido),
+    (Cliente, 'after_delete', _cliente_criado_ou_removido),
+    (Cliente, 'before_update', _cliente_antes_de_atualizar),
+)
+
+
+def init_app(app):
+    app.config.setdefault('AUTORIZACAO_INTERVALO_VERIFICACAO', 2)
+    app.extensions['versoes_tokens'] = CacheVersoesTokens(app.config['AUTORIZACAO_INTERVALO_VERIFICACAO'])
+
+    jwt.token_in_blocklist_loader(token_revogado)
+    jwt.revoked_token_loader(resposta_token_revogado)
+
+    # Eventos registrados uma única vez por processo
+    for modelo, nome, funcao in EVENTOS:
+        if not event.contains(modelo, nome, funcao):
+            event.listen(modelo, nome, funcao)
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt, create_refresh_token
 from marshmallow import Schema, fields, validate, ValidationError
 from app.models.usuario import Usuario
+from app.auth.autorizacao import claims_usuario
 from app import db, bcrypt
 from datetime import timedelta
 import secrets
@@ -45,18 +46,14 @@ def login():
     if not usuario.ativo:
         return jsonify({"erro": "Usuário inativo. Entre em contato com o administrador."}), 401
     
-    # Criar token JWT
+    # Criar token JWT (barbeiro_id/cliente_id resolvidos aqui, não a cada requisição)
     access_token = create_access_token(
-        identity=usuario.id,
-        additional_claims={
-            'perfil': usuario.perfil,
-            'nome': usuario.nome,
-            'email': usuario.email
-        }
+        identity=str(usuario.id),
+        additional_claims=claims_usuario(usuario)
     )
     
     # Criar refresh token
-    refresh_token = create_refresh_token(identity=usuario.id)
+    refresh_token = create_refresh_token(identity=str(usuario.id), additional_claims={'versao': usuario.versao_token})
     
     return jsonify({
         "mensagem": "Login realizado com sucesso",
@@ -96,8 +93,8 @@ def register():
     
     # Gerar token JWT
     access_token = create_access_token(
-        identity=usuario.id,
-        additional_claims={'perfil': usuario.perfil},
+        identity=str(usuario.id),
+        additional_claims=claims_usuario(usuario),
         expires_delta=timedelta(days=1)
     )
     
@@ -196,7 +193,12 @@ def alterar_senha():
     usuario.senha = data['nova_senha']
     db.session.commit()
     
-    return jsonify({"mensagem": "Senha alterada com sucesso"}), 200
+    # A troca de senha revoga os tokens anteriores: devolve novos para esta sessão
+    return jsonify({
+        "mensagem": "Senha alterada com sucesso",
+        "access_token": create_access_token(identity=str(usuario.id), additional_claims=claims_usuario(usuario)),
+        "refresh_token": create_refresh_token(identity=str(usuario.id), additional_claims={'versao': usuario.versao_token})
+    }), 200
 
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
@@ -217,12 +219,8 @@ def refresh():
     
     # Criar novo access token com informações do usuário
     access_token = create_access_token(
-        identity=current_user,
-        additional_claims={
-            'perfil': usuario.perfil,
-            'nome': usuario.nome,
-            'email': usuario.email
-        }
+        identity=str(usuario.id),
+        additional_claims=claims_usuario(usuario)
     )
     
     return jsonify({
@@ -0,0 +1,75 @@
+"""Provedor JSON da aplicação.
+
+Usa o orjson quando instalado e o json da biblioteca padrão caso contrário. Nos
+dois casos datas e horas (datetime, date, time) saem em ISO 8601 — o mesmo
+formato dos campos já convertidos com isoformat() nos to_dict — em vez do
+formato RFC 822 do provedor padrão do Flask; Decimal e UUID saem como string.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Argumentos de json.dumps que têm equivalente no orjson; qualquer outro usa a biblioteca padrão
+ARGUMENTOS_ORJSON = {'default', 'indent', 'separators', 'sort_keys'}
+
+
+def converter_padrao(o):
+    """Tipos que nenhum dos dois serializadores converte sozinho"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    default = staticmethod(converter_padrao)
+    # UTF-8 sem escapes, como o orjson produz
+    ensure_ascii = False
+    usar_orjson = orjson is not None
+
+    def _opcoes_orjson(self, sort_keys, indentar):
+        # Chaves não-string (int, date) são convertidas como no json padrão
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def _dumps_orjson(self, obj, sort_keys=None, indentar=False, default=None):
+        sort_keys = self.sort_keys if sort_keys is None else sort_keys
+        return orjson.dumps(obj, default=default or self.default, option=self._opcoes_orjson(sort_keys, indentar))
+
+    def dumps(self, obj, **kwargs):
+        if not self.usar_orjson or not ARGUMENTOS_ORJSON.issuperset(kwargs) or kwargs.get('indent') not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return self._dumps_orjson(
+            obj, kwargs.get('sort_keys'), kwargs.get('indent') is not None, kwargs.get('default')
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.usar_orjson or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.usar_orjson:
+            return super().response(*args, **kwargs)
+
+        # Corpo gerado direto em bytes, sem passar por str
+        obj = self._prepare_response_obj(args, kwargs)
+        indentar = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_orjson(obj, indentar=indentar) + b'\n', mimetype=self.mimetype)
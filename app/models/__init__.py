@@ -1,5 +1,5 @@
 from app.models.base import Base
-from app.models.usuario import Usuario
+from app.models.usuario import Usuario, VersaoUsuarios
 from app.models.cliente import Cliente
 from app.models.barbeiro import Barbeiro
 from app.models.servico import Servico
@@ -7,16 +7,18 @@ from app.models.agendamento import Agendamento, AgendamentoServico
 from app.models.atendimento import Atendimento
 from app.models.produto import Produto
 from app.models.venda import Venda, VendaItem
+from app.models.venda_diaria import VendaDiaria, ProdutoVendaDiaria
 from app.models.pagamento import Pagamento
 from app.models.caixa_diario import CaixaDiario
 from app.models.plano_mensal import PlanoMensal, PlanoMensalServico
 from app.models.movimento_estoque import MovimentoEstoque
-from app.models.configuracao import Configuracao
+from app.models.configuracao import Configuracao, VersaoConfiguracao
 
 # Expor todos os modelos em um dicionário para facilitar o acesso
 models = {
     'Base': Base,
     'Usuario': Usuario,
+    'VersaoUsuarios': VersaoUsuarios,
     'Cliente': Cliente,
     'Barbeiro': Barbeiro,
     'Servico': Servico,
@@ -26,10 +28,13 @@ models = {
     'Produto': Produto,
     'Venda': Venda,
     'VendaItem': VendaItem,
+    'VendaDiaria': VendaDiaria,
+    'ProdutoVendaDiaria': ProdutoVendaDiaria,
     'Pagamento': Pagamento,
     'CaixaDiario': CaixaDiario,
     'PlanoMensal': PlanoMensal,
     'PlanoMensalServico': PlanoMensalServico,
     'MovimentoEstoque': MovimentoEstoque,
-    'Configuracao': Configuracao
+    'Configuracao': Configuracao,
+    'VersaoConfiguracao': VersaoConfiguracao
 } 
\ No newline at end of file
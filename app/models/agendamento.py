@@ -11,11 +11,21 @@ class Agendamento(Base):
     data_hora_fim = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default='pendente', nullable=False, index=True)
     observacoes = db.Column(db.Text, nullable=True)
+    serie_id = db.Column(db.String(32), nullable=True, index=True)  # Ocorrências de uma mesma recorrência
+    
+    # Índice composto usado pela verificação de sobreposição de horários
+    __table_args__ = (
+        db.Index('ix_agendamentos_barbeiro_periodo', 'barbeiro_id', 'data_hora_inicio', 'data_hora_fim'),
+        db.Index('ix_agendamentos_data_hora_inicio_id', 'data_hora_inicio', 'id'),  # Paginação por cursor
+    )
     
     # Relacionamentos
     servicos = db.relationship('AgendamentoServico', backref='agendamento', lazy=True, cascade='all, delete-orphan')
     atendimento = db.relationship('Atendimento', backref='agendamento', uselist=False, lazy=True)
     
+    # Relacionamentos percorridos por to_dict (carregados antecipadamente nas listagens)
+    RELACIONAMENTOS_SERIALIZACAO = ('cliente', 'barbeiro.usuario', 'servicos.servico')
+    
     # Validador para o status
     @db.validates('status')
     def validate_status(self, key, value):
@@ -35,6 +45,7 @@ class Agendamento(Base):
             'data_hora_fim': self.data_hora_fim.isoformat() if self.data_hora_fim else None,
             'status': self.status,
             'observacoes': self.observacoes,
+            'serie_id': self.serie_id,
             'servicos': [s.servico.to_dict() for s in self.servicos] if self.servicos else [],
             'created_at': self.created_at,
             'updated_at': self.updated_at
@@ -43,33 +54,8 @@ class Agendamento(Base):
     @staticmethod
     def verificar_disponibilidade(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id=None):
         # Verifica se o horário está disponível para o barbeiro
-        query = Agendamento.query.filter(
-            Agendamento.barbeiro_id == barbeiro_id,
-            Agendamento.status != 'cancelado',
-            db.or_(
-                # Verifica se o início do novo agendamento está dentro de outro agendamento
-                db.and_(
-                    Agendamento.data_hora_inicio <= data_hora_inicio,
-                    Agendamento.data_hora_fim > data_hora_inicio
-                ),
-                # Verifica se o fim do novo agendamento está dentro de outro agendamento
-                db.and_(
-                    Agendamento.data_hora_inicio < data_hora_fim,
-                    Agendamento.data_hora_fim >= data_hora_fim
-                ),
-                # Verifica se o novo agendamento engloba completamente outro agendamento
-                db.and_(
-                    Agendamento.data_hora_inicio >= data_hora_inicio,
-                    Agendamento.data_hora_fim <= data_hora_fim
-                )
-            )
-        )
-        
-        # Se estiver atualizando um agendamento existente, exclua-o da verificação
-        if agendamento_id:
-            query = query.filter(Agendamento.id != agendamento_id)
-            
-        return query.count() == 0
+        from app.services.disponibilidade import horario_disponivel
+        return horario_disponivel(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id)
 
 
 class AgendamentoServico(Base):
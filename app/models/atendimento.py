@@ -9,7 +9,7 @@ class Atendimento(Base):
     cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False)
     barbeiro_id = db.Column(db.Integer, db.ForeignKey('barbeiros.id'), nullable=False)
     valor_total = db.Column(db.Float, nullable=False)
-    data_hora = db.Column(db.DateTime, nullable=False)
+    data_hora = db.Column(db.DateTime, nullable=False, index=True)  # Faturamento por período (dashboard)
     status = db.Column(db.String(20), default='pendente', nullable=False)
     observacoes = db.Column(db.Text, nullable=True)
     
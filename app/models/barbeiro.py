@@ -1,5 +1,6 @@
 from app import db
 from app.models.base import Base
+from datetime import datetime, timedelta
 
 class Barbeiro(Base):
     __tablename__ = 'barbeiros'
@@ -20,7 +21,38 @@ class Barbeiro(Base):
     agendamentos = db.relationship('Agendamento', backref='barbeiro', lazy=True)
     # Relacionamento com Atendimento é criado pelo backref em Atendimento
     
-    def to_dict(self):
+    # Relacionamentos percorridos por to_dict (carregados antecipadamente nas listagens)
+    RELACIONAMENTOS_SERIALIZACAO = ('usuario',)
+    
+    @staticmethod
+    def contar_agendamentos_dia(barbeiro_ids=None, dia=None):
+        """
+        Conta, em uma única consulta agrupada, os agendamentos não cancelados
+        de cada barbeiro no dia informado (hoje por padrão).
+        Retorna {barbeiro_id: quantidade}; barbeiros sem agendamentos ficam de fora.
+        """
+        from app.models.agendamento import Agendamento
+        
+        inicio = (dia or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        fim = inicio + timedelta(days=1)
+        
+        query = db.session.query(
+            Agendamento.barbeiro_id,
+            db.func.count(Agendamento.id)
+        ).filter(
+            Agendamento.data_hora_inicio >= inicio,
+            Agendamento.data_hora_inicio < fim,
+            Agendamento.status != 'cancelado'
+        )
+        
+        if barbeiro_ids is not None:
+            if not barbeiro_ids:
+                return {}
+            query = query.filter(Agendamento.barbeiro_id.in_(barbeiro_ids))
+        
+        return dict(query.group_by(Agendamento.barbeiro_id).all())
+    
+    def to_dict(self, agendamentos_hoje=None):
         try:
             especialidades_lista = self.especialidades.split(',') if self.especialidades else []
             
@@ -38,17 +70,10 @@ class Barbeiro(Base):
                     'telefone': self.usuario.telefone if hasattr(self.usuario, 'telefone') else None
                 }
             
-            # Calcular quantos agendamentos o barbeiro tem hoje
-            from datetime import datetime, timedelta
-            hoje_inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            hoje_fim = hoje_inicio + timedelta(days=1)
-            
-            agendamentos_hoje = 0
-            if hasattr(self, 'agendamentos'):
-                agendamentos_hoje = len([a for a in self.agendamentos 
-                                    if a.data_hora_inicio >= hoje_inicio and 
-                                    a.data_hora_inicio < hoje_fim and
-                                    a.status != 'cancelado'])
+            # Quantos agendamentos o barbeiro tem hoje (as listagens calculam
+            # para todos de uma vez e repassam o valor)
+            if agendamentos_hoje is None:
+                agendamentos_hoje = Barbeiro.contar_agendamentos_dia([self.id]).get(self.id, 0)
             
             return {
                 'id': self.id,
@@ -14,23 +14,71 @@ class CaixaDiario(Base):
     usuario_fechamento_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True)
     observacoes = db.Column(db.Text, nullable=True)
     
+    # Índice usado pela paginação por cursor do histórico
+    __table_args__ = (
+        db.Index('ix_caixa_diario_data_abertura_id', 'data_abertura', 'id'),
+    )
+    
     # Relacionamentos
     pagamentos = db.relationship('Pagamento', backref='caixa', lazy=True)
     usuario_abertura = db.relationship('Usuario', foreign_keys=[usuario_abertura_id])
     usuario_fechamento = db.relationship('Usuario', foreign_keys=[usuario_fechamento_id])
     
+    # Totais correntes dos movimentos, atualizados atomicamente a cada movimento (recalculáveis com recalcular_totais)
+    entradas = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    saidas = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    
+    TIPOS_ENTRADA = ('pagamento', 'entrada')
+    
     @hybrid_property
     def total_entradas(self):
-        return sum(p.valor for p in self.pagamentos if p.tipo in ['pagamento', 'entrada'])
+        return self.entradas or 0
+    
+    @total_entradas.expression
+    def total_entradas(cls):
+        return cls.entradas
     
     @hybrid_property
     def total_saidas(self):
-        return sum(p.valor for p in self.pagamentos if p.tipo == 'saida')
+        return self.saidas or 0
+    
+    @total_saidas.expression
+    def total_saidas(cls):
+        return cls.saidas
     
     @hybrid_property
     def saldo(self):
         return self.valor_inicial + self.total_entradas - self.total_saidas
     
+    @saldo.expression
+    def saldo(cls):
+        return cls.valor_inicial + cls.entradas - cls.saidas
+    
+    @staticmethod
+    def registrar_movimento(caixa_id, tipo, valor):
+        """Soma o valor do pagamento ao total correspondente do caixa em um único UPDATE atômico"""
+        coluna = CaixaDiario.entradas if tipo in CaixaDiario.TIPOS_ENTRADA else CaixaDiario.saidas
+        CaixaDiario.query.filter(CaixaDiario.id == caixa_id).update(
+            {coluna: coluna + valor}, synchronize_session=False
+        )
+    
+    @staticmethod
+    def recalcular_totais():
+        """Recalcula entradas e saidas de todos os caixas a partir dos pagamentos"""
+        from app.models.pagamento import Pagamento
+        
+        def soma(condicao):
+            return db.select(db.func.coalesce(db.func.sum(Pagamento.valor), 0.0)).where(
+                Pagamento.caixa_diario_id == CaixaDiario.id, condicao
+            ).scalar_subquery()
+        
+        atualizados = CaixaDiario.query.update({
+            CaixaDiario.entradas: soma(Pagamento.tipo.in_(CaixaDiario.TIPOS_ENTRADA)),
+            CaixaDiario.saidas: soma(Pagamento.tipo == 'saida')
+        }, synchronize_session=False)
+        db.session.commit()
+        return atualizados
+    
     def to_dict(self, include_pagamentos=False):
         result = {
             'id': self.id,
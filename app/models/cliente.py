@@ -10,6 +10,10 @@ class Cliente(Base):
     telefone = db.Column(db.String(20), nullable=False, unique=True)
     email = db.Column(db.String(100), unique=True)
     
+    # Mantidos ao concluir agendamentos (recalculáveis com recalcular_atendimentos)
+    ultimo_atendimento = db.Column(db.DateTime, nullable=True)
+    total_atendimentos = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     # Validadores
     @db.validates('telefone')
     def validate_telefone(self, key, value):
@@ -33,15 +37,40 @@ class Cliente(Base):
     def __repr__(self):
         return f'<Cliente {self.nome}>'
     
+    @staticmethod
+    def registrar_atendimento(cliente_id, data_hora):
+        """
+        Conta um agendamento concluído do cliente e avança ultimo_atendimento se a data
+        for mais recente, com um único UPDATE atômico (sem ler o cliente antes).
+        """
+        Cliente.query.filter_by(id=cliente_id).update({
+            Cliente.total_atendimentos: Cliente.total_atendimentos + 1,
+            Cliente.ultimo_atendimento: db.case(
+                (db.or_(Cliente.ultimo_atendimento.is_(None), Cliente.ultimo_atendimento < data_hora), data_hora),
+                else_=Cliente.ultimo_atendimento
+            )
+        }, synchronize_session='fetch')
+    
+    @staticmethod
+    def recalcular_atendimentos():
+        """Recalcula ultimo_atendimento e total_atendimentos de todos os clientes a partir dos agendamentos"""
+        from app.models.agendamento import Agendamento
+        
+        concluidos = db.select(Agendamento.data_hora_inicio).where(
+            Agendamento.cliente_id == Cliente.id,
+            Agendamento.status == 'concluido'
+        )
+        atualizados = Cliente.query.update({
+            Cliente.ultimo_atendimento: concluidos.with_only_columns(
+                db.func.max(Agendamento.data_hora_inicio)).scalar_subquery(),
+            Cliente.total_atendimentos: concluidos.with_only_columns(
+                db.func.count(Agendamento.id)).scalar_subquery()
+        }, synchronize_session=False)
+        db.session.commit()
+        return atualizados
+    
     def to_dict(self):
         """Converte o objeto cliente para um dicionário"""
-        # Obter a data do último agendamento, se existir
-        ultimo_atendimento = None
-        if hasattr(self, 'agendamentos') and self.agendamentos.count() > 0:
-            agendamento = self.agendamentos.filter_by(status='concluido').order_by(db.desc('data_hora_inicio')).first()
-            if agendamento:
-                ultimo_atendimento = agendamento.data_hora_inicio
-
         return {
             'id': self.id,
             'nome': self.nome,
@@ -49,5 +78,6 @@ class Cliente(Base):
             'email': self.email,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'ultimo_atendimento': ultimo_atendimento.isoformat() if ultimo_atendimento else None
+            'ultimo_atendimento': self.ultimo_atendimento.isoformat() if self.ultimo_atendimento else None,
+            'total_atendimentos': self.total_atendimentos or 0
         } 
\ No newline at end of file
@@ -20,7 +20,30 @@ class Configuracao(Base):
     
     @staticmethod
     def obter_valor(chave, valor_padrao=None):
+        """Valor da configuração lido do cache em memória (ver app.services.configuracoes)"""
+        from app.services import configuracoes
+        return configuracoes.obter(chave, valor_padrao)
+    
+    @staticmethod
+    def definir_valor(chave, valor, descricao=None):
+        """Cria ou altera uma configuração; a versão é incrementada pelos eventos do modelo"""
         config = Configuracao.query.filter_by(chave=chave).first()
-        if config:
-            return config.valor
-        return valor_padrao 
\ No newline at end of file
+        if not config:
+            config = Configuracao(chave=chave)
+            db.session.add(config)
+        config.valor = None if valor is None else str(valor)
+        if descricao is not None:
+            config.descricao = descricao
+        return config
+
+
+class VersaoConfiguracao(db.Model):
+    """
+    Linha única com um contador incrementado a cada alteração em configuracoes.
+    Cada processo compara a versão que tem em memória com esta para saber se
+    precisa recarregar as configurações.
+    """
+    __tablename__ = 'configuracoes_versao'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
@@ -11,7 +11,7 @@ class Pagamento(Base):
     descricao = db.Column(db.String(200), nullable=True)
     
     # Relacionamentos
-    venda_id = db.Column(db.Integer, db.ForeignKey('vendas.id'), nullable=True)
+    venda_id = db.Column(db.Integer, db.ForeignKey('vendas.id'), nullable=True, index=True)
     atendimento_id = db.Column(db.Integer, db.ForeignKey('atendimentos.id'), nullable=True)
     plano_mensal_id = db.Column(db.Integer, db.ForeignKey('planos_mensais.id'), nullable=True)
     caixa_diario_id = db.Column(db.Integer, db.ForeignKey('caixa_diario.id'), nullable=True)
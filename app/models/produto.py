@@ -55,6 +55,38 @@ class Produto(Base):
         
         return self
     
+    @staticmethod
+    def baixar_estoque(quantidades):
+        """
+        Baixa o estoque de vários produtos ({produto_id: quantidade}) em um único
+        UPDATE condicional: cada linha só é alterada se ainda tiver estoque suficiente
+        no momento da escrita. Retorna False se algum produto não pôde ser baixado;
+        nesse caso a transação deve ser desfeita.
+        """
+        if not quantidades:
+            return True
+        
+        quantidade = db.case(quantidades, value=Produto.id)
+        atualizados = Produto.query.filter(
+            Produto.id.in_(list(quantidades)),
+            Produto.quantidade_estoque >= quantidade
+        ).update(
+            {Produto.quantidade_estoque: Produto.quantidade_estoque - quantidade},
+            synchronize_session=False
+        )
+        return atualizados == len(quantidades)
+    
+    @staticmethod
+    def repor_estoque(quantidades):
+        """Devolve ao estoque as quantidades informadas ({produto_id: quantidade}) em um único UPDATE"""
+        if not quantidades:
+            return
+        
+        Produto.query.filter(Produto.id.in_(list(quantidades))).update(
+            {Produto.quantidade_estoque: Produto.quantidade_estoque + db.case(quantidades, value=Produto.id)},
+            synchronize_session=False
+        )
+    
     def verificar_estoque_baixo(self):
         """
         Verifica se o produto está com estoque abaixo do mínimo
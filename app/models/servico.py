@@ -21,4 +21,16 @@ class Servico(Base):
             'duracao_estimada_min': self.duracao_estimada_min,
             'created_at': self.created_at,
             'updated_at': self.updated_at
-        } 
\ No newline at end of file
+        } 
+
+
+class VersaoServicos(db.Model):
+    """
+    Linha única com um contador incrementado a cada alteração em servicos.
+    Cada processo compara a versão do catálogo que tem em memória com esta
+    para saber se precisa recarregá-lo.
+    """
+    __tablename__ = 'servicos_versao'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
@@ -12,6 +12,9 @@ class Usuario(Base):
     telefone = db.Column(db.String(20), nullable=True)
     ativo = db.Column(db.Boolean, default=True)
     token_reset_senha = db.Column(db.String(100), nullable=True)
+    # Incrementada quando perfil, status, email, senha ou vínculo com barbeiro/cliente mudam:
+    # tokens emitidos com uma versão anterior deixam de valer (app.auth.autorizacao)
+    versao_token = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # Relacionamentos
     barbeiro = db.relationship('Barbeiro', backref='usuario', uselist=False, lazy=True)
@@ -44,4 +47,16 @@ class Usuario(Base):
             return {
                 'id': self.id if hasattr(self, 'id') else None,
                 'erro': f"Erro ao processar dados completos: {str(e)}"
-            } 
\ No newline at end of file
+            }
+
+
+class VersaoUsuarios(db.Model):
+    """
+    Linha única com um contador incrementado sempre que a versao_token de algum
+    usuário muda. Cada processo compara a versão que tem em memória com esta
+    para saber se precisa recarregar as versões dos tokens.
+    """
+    __tablename__ = 'usuarios_versao'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
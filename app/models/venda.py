@@ -15,11 +15,20 @@ class Venda(Base):
     observacao = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(20), default='finalizada', nullable=False)
     
+    # Índice composto usado pelos relatórios (filtro por status e período)
+    __table_args__ = (
+        db.Index('ix_vendas_status_data_hora', 'status', 'data_hora'),
+        db.Index('ix_vendas_data_hora_id', 'data_hora', 'id'),  # Paginação por cursor
+    )
+    
     # Relacionamentos
     itens = db.relationship('VendaItem', backref='venda', lazy=True, cascade='all, delete-orphan')
     pagamentos = db.relationship('Pagamento', backref='venda', lazy=True)
     barbeiro = db.relationship('Barbeiro', backref='vendas', lazy=True)
     
+    # Relacionamentos percorridos por to_dict (carregados antecipadamente nas listagens)
+    RELACIONAMENTOS_SERIALIZACAO = ('cliente', 'barbeiro.usuario', 'itens.produto', 'pagamentos')
+    
     def calcular_total(self):
         subtotal = sum(item.valor_unitario * item.quantidade for item in self.itens)
         total_com_desconto = subtotal - self.valor_desconto
@@ -63,7 +72,7 @@ class Venda(Base):
 class VendaItem(Base):
     __tablename__ = 'venda_itens'
     
-    venda_id = db.Column(db.Integer, db.ForeignKey('vendas.id'), nullable=False)
+    venda_id = db.Column(db.Integer, db.ForeignKey('vendas.id'), nullable=False, index=True)
     produto_id = db.Column(db.Integer, db.ForeignKey('produtos.id'), nullable=False)
     quantidade = db.Column(db.Integer, nullable=False)
     valor_unitario = db.Column(db.Float, nullable=False)
@@ -0,0 +1,61 @@
+from app import db
+from app.models.base import Base
+
+class VendaDiaria(Base):
+    """Consolidado diário das vendas finalizadas, mantido de forma incremental"""
+    __tablename__ = 'vendas_diarias'
+
+    data = db.Column(db.Date, unique=True, nullable=False)
+    quantidade = db.Column(db.Integer, default=0, nullable=False)
+    valor_bruto = db.Column(db.Float, default=0.0, nullable=False)  # Soma dos itens antes de desconto e imposto
+    valor_desconto = db.Column(db.Float, default=0.0, nullable=False)
+    valor_imposto = db.Column(db.Float, default=0.0, nullable=False)
+    valor_total = db.Column(db.Float, default=0.0, nullable=False)
+
+    # Pagamentos recebidos pelas vendas do dia, por forma de pagamento
+    valor_dinheiro = db.Column(db.Float, default=0.0, nullable=False)
+    valor_cartao_credito = db.Column(db.Float, default=0.0, nullable=False)
+    valor_cartao_debito = db.Column(db.Float, default=0.0, nullable=False)
+    valor_pix = db.Column(db.Float, default=0.0, nullable=False)
+    valor_transferencia = db.Column(db.Float, default=0.0, nullable=False)
+
+    FORMAS_PAGAMENTO = ('dinheiro', 'cartao_credito', 'cartao_debito', 'pix', 'transferencia')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'data': self.data.isoformat() if self.data else None,
+            'quantidade': self.quantidade,
+            'valor_bruto': self.valor_bruto,
+            'valor_desconto': self.valor_desconto,
+            'valor_imposto': self.valor_imposto,
+            'valor_total': self.valor_total,
+            'pagamentos': {forma: getattr(self, f'valor_{forma}') for forma in self.FORMAS_PAGAMENTO},
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+class ProdutoVendaDiaria(Base):
+    """Quantidade e valor vendidos de cada produto por dia (só vendas finalizadas)"""
+    __tablename__ = 'produtos_vendas_diarias'
+
+    data = db.Column(db.Date, nullable=False)
+    produto_id = db.Column(db.Integer, db.ForeignKey('produtos.id'), nullable=False)
+    quantidade = db.Column(db.Integer, default=0, nullable=False)
+    valor_total = db.Column(db.Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('data', 'produto_id', name='uq_produtos_vendas_diarias_data_produto'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'data': self.data.isoformat() if self.data else None,
+            'produto_id': self.produto_id,
+            'quantidade': self.quantidade,
+            'valor_total': self.valor_total,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
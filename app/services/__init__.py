@@ -0,0 +1 @@
+# Inicialização do módulo de serviços
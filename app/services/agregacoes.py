@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, case, func
+from app import db
+from app.models.venda_diaria import VendaDiaria, ProdutoVendaDiaria
+from app.models.produto import Produto
+from app.models.cliente import Cliente
+from app.models.agendamento import Agendamento
+from app.services.cache import obter_cache
+
+METODOS_PAGAMENTO = ('dinheiro', 'cartao_credito', 'cartao_debito', 'pix')
+
+# Estatísticas de clientes
+CHAVE_ESTATISTICAS_CLIENTES = 'clientes:estatisticas'
+# Atraso máximo das estatísticas de atividade nos workers que não concluíram o agendamento
+ESTATISTICAS_CLIENTES_TTL = 5 * 60
+DIAS_CLIENTE_ATIVO = 30
+DIAS_CLIENTE_INATIVO = 90
+VISITAS_CLIENTE_FREQUENTE = 3  # Atendimentos concluídos nos últimos DIAS_CLIENTE_INATIVO dias
+
+MAIS_VENDIDOS_LIMITE_MAXIMO = 50
+
+
+def _condicao_periodo(coluna, inicio, fim):
+    """Intervalo semiaberto [inicio, fim); fim None significa sem limite superior"""
+    if fim is None:
+        return coluna >= inicio
+    return and_(coluna >= inicio, coluna < fim)
+
+
+def intervalo_periodo(periodo, data_inicio=None, data_fim=None, agora=None):
+    """
+    Converte o período de um relatório em [inicio, fim): 'dia', 'semana' (desde
+    segunda-feira), 'mes', 'ano' ou 'personalizado' (data_inicio e data_fim em
+    ISO 8601, fim inclusivo). Levanta ValueError para período ou datas inválidos.
+    """
+    hoje = (agora or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    if periodo == 'dia':
+        return hoje, hoje + timedelta(days=1)
+    if periodo == 'semana':
+        return hoje - timedelta(days=hoje.weekday()), None
+    if periodo == 'mes':
+        return hoje.replace(day=1), None
+    if periodo == 'ano':
+        return hoje.replace(month=1, day=1), None
+    if periodo == 'personalizado':
+        if not data_inicio:
+            raise ValueError('data_inicio é obrigatória para o período personalizado')
+        inicio = datetime.fromisoformat(data_inicio.split('T')[0])
+        fim = datetime.fromisoformat(data_fim.split('T')[0]) + timedelta(days=1) if data_fim else None
+        return inicio, fim
+    raise ValueError(f"Período inválido: {periodo}")
+
+
+def _condicao_dias(inicio, fim):
+    """Converte o período [inicio, fim) em datas do consolidado diário"""
+    return _condicao_periodo(VendaDiaria.data, _dia(inicio), _dia(fim) if fim is not None else None)
+
+
+def _dia(valor):
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+def totais_vendas(inicio, fim=None):
+    """Quantidade e valor somado das vendas finalizadas no período (consolidado diário)"""
+    total, valor = db.session.query(
+        func.coalesce(func.sum(VendaDiaria.quantidade), 0),
+        func.coalesce(func.sum(VendaDiaria.valor_total), 0.0)
+    ).filter(_condicao_dias(inicio, fim)).one()
+
+    return {'total': total, 'valor': round(valor, 2)}
+
+
+def totais_vendas_por_periodo(periodos):
+    """
+    Calcula quantidade e valor de vários períodos ({nome: (inicio, fim)}) em uma
+    única consulta com agregação condicional sobre o consolidado diário.
+    """
+    colunas = []
+    for nome, (inicio, fim) in periodos.items():
+        condicao = _condicao_dias(inicio, fim)
+        colunas.append(func.coalesce(func.sum(case((condicao, VendaDiaria.quantidade), else_=0)), 0).label(f'{nome}_total'))
+        colunas.append(func.coalesce(func.sum(case((condicao, VendaDiaria.valor_total), else_=0.0)), 0.0).label(f'{nome}_valor'))
+
+    inicio_minimo = min(_dia(inicio) for inicio, _ in periodos.values())
+    linha = db.session.query(*colunas).filter(VendaDiaria.data >= inicio_minimo).one()._mapping
+
+    return {
+        nome: {'total': linha[f'{nome}_total'], 'valor': round(linha[f'{nome}_valor'], 2)}
+        for nome in periodos
+    }
+
+
+def totais_por_metodo_pagamento(inicio, fim=None):
+    """Soma dos pagamentos das vendas do período por forma de pagamento (consolidado diário)"""
+    linha = db.session.query(*[
+        func.coalesce(func.sum(getattr(VendaDiaria, f'valor_{forma}')), 0.0)
+        for forma in VendaDiaria.FORMAS_PAGAMENTO
+    ]).filter(_condicao_dias(inicio, fim)).one()
+
+    return {forma: round(valor, 2) for forma, valor in zip(VendaDiaria.FORMAS_PAGAMENTO, linha) if valor}
+
+
+def serie_diaria(inicio, fim=None):
+    """Valor total por dia ({date: valor}) lido do consolidado, no máximo uma linha por dia"""
+    linhas = db.session.query(VendaDiaria.data, VendaDiaria.valor_total)\
+        .filter(_condicao_dias(inicio, fim)).order_by(VendaDiaria.data).all()
+    return {dia: valor for dia, valor in linhas}
+
+
+def produtos_mais_vendidos(inicio, fim=None, limite=10):
+    """
+    Produtos ordenados pela quantidade vendida (vendas finalizadas) no período,
+    lidos dos contadores diários por produto: o custo depende de produtos × dias,
+    não do volume de vendas.
+    """
+    # Limite negativo no SQLite removeria o LIMIT; zero não retornaria nada
+    limite = min(max(int(limite), 1), MAIS_VENDIDOS_LIMITE_MAXIMO)
+    quantidade_total = func.sum(ProdutoVendaDiaria.quantidade)
+    linhas = db.session.query(
+        Produto.id,
+        Produto.nome,
+        quantidade_total.label('quantidade_total'),
+        func.sum(ProdutoVendaDiaria.valor_total).label('valor_total')
+    ).join(ProdutoVendaDiaria, ProdutoVendaDiaria.produto_id == Produto.id).filter(
+        _condicao_periodo(ProdutoVendaDiaria.data, _dia(inicio), _dia(fim) if fim is not None else None)
+    ).group_by(Produto.id, Produto.nome).having(quantidade_total > 0)\
+        .order_by(quantidade_total.desc(), Produto.nome).limit(limite).all()
+
+    return [
+        {
+            'produto_id': linha.id,
+            'produto_nome': linha.nome,
+            'quantidade_total': int(linha.quantidade_total),
+            'valor_total': round(float(linha.valor_total), 2)
+        }
+        for linha in linhas
+    ]
+
+
+def estatisticas_clientes(agora=None):
+    """
+    Totais de clientes em uma única consulta: um agrupamento dos agendamentos
+    concluídos por cliente (último atendimento e visitas recentes) unido aos clientes.
+
+    - ativos: atendidos nos últimos DIAS_CLIENTE_ATIVO dias
+    - frequentes: ao menos VISITAS_CLIENTE_FREQUENTE atendimentos nos últimos DIAS_CLIENTE_INATIVO dias
+    - inativos: cadastrados há mais de DIAS_CLIENTE_INATIVO dias e sem atendimento nesse período
+    """
+    agora = agora or datetime.now()
+    inicio_mes = agora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    limite_ativo = agora - timedelta(days=DIAS_CLIENTE_ATIVO)
+    limite_inativo = agora - timedelta(days=DIAS_CLIENTE_INATIVO)
+
+    visitas = db.session.query(
+        Agendamento.cliente_id.label('cliente_id'),
+        func.max(Agendamento.data_hora_inicio).label('ultimo'),
+        func.sum(case((Agendamento.data_hora_inicio >= limite_inativo, 1), else_=0)).label('recentes')
+    ).filter(Agendamento.status == 'concluido').group_by(Agendamento.cliente_id).subquery()
+
+    sem_visita_recente = db.or_(visitas.c.ultimo.is_(None), visitas.c.ultimo < limite_inativo)
+
+    linha = db.session.query(
+        func.count(Cliente.id),
+        func.coalesce(func.sum(case((Cliente.created_at >= inicio_mes, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((visitas.c.ultimo >= limite_ativo, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((visitas.c.recentes >= VISITAS_CLIENTE_FREQUENTE, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((and_(Cliente.created_at < limite_inativo, sem_visita_recente), 1), else_=0)), 0)
+    ).outerjoin(visitas, visitas.c.cliente_id == Cliente.id).one()
+
+    total, novos_mes, ativos, frequentes, inativos = (int(valor) for valor in linha)
+    return {
+        'total': total,
+        'novos_mes': novos_mes,
+        'ativos': ativos,
+        'frequentes': frequentes,
+        'inativos': inativos
+    }
+
+
+def totais_clientes(agora=None):
+    """Total de clientes e novos no mês, em uma contagem simples (sem o agrupamento dos agendamentos)"""
+    inicio_mes = (agora or datetime.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    total, novos_mes = db.session.query(
+        func.count(Cliente.id),
+        func.coalesce(func.sum(case((Cliente.created_at >= inicio_mes, 1), else_=0)), 0)
+    ).one()
+    return {'total': int(total), 'novos_mes': int(novos_mes)}
+
+
+def estatisticas_clientes_em_cache():
+    """
+    Estatísticas de clientes: ativos, frequentes e inativos reaproveitados por
+    ESTATISTICAS_CLIENTES_TTL segundos (configurável no app) ou até a invalidação,
+    que só alcança o processo que concluiu o agendamento; total e novos_mes
+    contados a cada chamada, já que cadastros e remoções não invalidam o cache.
+    """
+    chave = f"{CHAVE_ESTATISTICAS_CLIENTES}:{datetime.now().date().isoformat()}"
+    ttl = current_app.config.get('ESTATISTICAS_CLIENTES_TTL', ESTATISTICAS_CLIENTES_TTL)
+    estatisticas = dict(obter_cache().obter_ou_calcular(chave, ttl, estatisticas_clientes))
+    estatisticas.update(totais_clientes())
+    return estatisticas
+
+
+def invalidar_estatisticas_clientes():
+    obter_cache().invalidar(CHAVE_ESTATISTICAS_CLIENTES)
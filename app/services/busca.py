@@ -0,0 +1,285 @@
+"""Índice de busca textual para clientes e produtos.
+
+Cada entidade tem uma tabela auxiliar (busca_clientes, busca_produtos) com um
+documento normalizado por registro: minúsculo, sem acentos e, para telefones,
+só com dígitos. No SQLite a tabela é FTS5 (consultas por prefixo ordenadas por
+bm25); no PostgreSQL é uma tabela comum com coluna tsvector e índice GIN. Em
+outros bancos, ou enquanto a tabela não existir, a busca volta ao ILIKE.
+
+O índice é mantido pelos eventos after_insert/after_update/after_delete dos
+modelos, na mesma transação da alteração.
+"""
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import event, inspect, text
+from app import db
+from app.models.cliente import Cliente
+from app.models.produto import Produto
+
+BUSCA_LIMITE_MAXIMO = 50
+
+
+def normalizar_texto(valor):
+    """Minúsculo e sem acentos ('Ação' -> 'acao')"""
+    if not valor:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(valor))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def somente_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def termos_busca(texto, juntar_digitos=False):
+    """
+    Divide o texto digitado nos mesmos termos usados na indexação. Com
+    juntar_digitos, números seguidos separados só por pontuação ou espaço viram
+    um termo ('(11) 98765-4321' -> '11987654321'), como o telefone no documento.
+    """
+    termos = []
+    for termo in re.findall(r'[a-z0-9]+', normalizar_texto(texto)):
+        if juntar_digitos and termo.isdigit() and termos and termos[-1].isdigit():
+            termos[-1] += termo
+        else:
+            termos.append(termo)
+    return termos
+
+
+def termos_telefone(telefone):
+    """
+    Telefone só com dígitos e seus finais: completo, sem DDD, últimos 8 e
+    últimos 4 dígitos, para achar pelo começo de qualquer um deles
+    """
+    digitos = somente_digitos(telefone)
+    termos = [digitos] if digitos else []
+    for tamanho in (len(digitos) - 2, 8, 4):
+        if 4 <= tamanho < len(digitos) and digitos[-tamanho:] not in termos:
+            termos.append(digitos[-tamanho:])
+    return termos
+
+
+def _documento_cliente(cliente):
+    partes = [cliente.nome, *termos_telefone(cliente.telefone), cliente.email]
+    return normalizar_texto(' '.join(p for p in partes if p))
+
+
+def _documento_produto(produto):
+    partes = [produto.nome, produto.codigo, produto.marca, produto.categoria, produto.descricao]
+    return normalizar_texto(' '.join(p for p in partes if p))
+
+
+class IndiceBusca:
+    """Tabela auxiliar de busca de um modelo e os comandos SQL de cada banco"""
+
+    def __init__(self, modelo, tabela, documento, campos, colunas_fallback, juntar_digitos=False):
+        self.modelo = modelo
+        self.tabela = tabela
+        self.documento = documento
+        self.campos = campos  # Atributos que compõem o documento
+        self.colunas_fallback = colunas_fallback
+        self.juntar_digitos = juntar_digitos  # Números da busca como um só termo (telefones)
+
+    # DDL
+
+    def criar(self, conexao):
+        dialeto = conexao.dialect.name
+        if dialeto == 'sqlite':
+            conexao.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.tabela} USING fts5("
+                "documento, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+        elif dialeto == 'postgresql':
+            conexao.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.tabela} ("
+                "id INTEGER PRIMARY KEY, documento TEXT NOT NULL, "
+                "vetor TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', documento)) STORED)"
+            ))
+            conexao.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.tabela}_vetor ON {self.tabela} USING GIN (vetor)"
+            ))
+
+    def remover_tabela(self, conexao):
+        if conexao.dialect.name in ('sqlite', 'postgresql'):
+            conexao.execute(text(f"DROP TABLE IF EXISTS {self.tabela}"))
+
+    def existe(self, conexao):
+        dialeto = conexao.dialect.name
+        if dialeto == 'sqlite':
+            sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"
+        elif dialeto == 'postgresql':
+            sql = "SELECT 1 WHERE to_regclass(:nome) IS NOT NULL"
+        else:
+            return False
+        return conexao.execute(text(sql), {'nome': self.tabela}).first() is not None
+
+    # Manutenção
+
+    def gravar(self, conexao, registro):
+        parametros = {'id': registro.id, 'documento': self.documento(registro)}
+        if conexao.dialect.name == 'sqlite':
+            conexao.execute(text(f"DELETE FROM {self.tabela} WHERE rowid = :id"), parametros)
+            conexao.execute(text(f"INSERT INTO {self.tabela} (rowid, documento) VALUES (:id, :documento)"), parametros)
+        else:
+            conexao.execute(text(
+                f"INSERT INTO {self.tabela} (id, documento) VALUES (:id, :documento) "
+                "ON CONFLICT (id) DO UPDATE SET documento = EXCLUDED.documento"
+            ), parametros)
+
+    def apagar(self, conexao, registro_id):
+        chave = 'rowid' if conexao.dialect.name == 'sqlite' else 'id'
+        conexao.execute(text(f"DELETE FROM {self.tabela} WHERE {chave} = :id"), {'id': registro_id})
+
+    # Consulta
+
+    def consulta_ids(self, dialeto, termos, limite=None):
+        """
+        SELECT dos ids que contêm todos os termos como prefixo. Com limite, os mais
+        relevantes entre todos os que casam (ordenação no mesmo SELECT do MATCH).
+        """
+        if dialeto == 'sqlite':
+            consulta = ' '.join(f'"{termo}"*' for termo in termos)
+            sql = f"SELECT rowid AS id FROM {self.tabela} WHERE {self.tabela} MATCH :consulta"
+            if limite:
+                # rank (bm25) é calculado pelo próprio FTS5 durante o MATCH
+                sql += f" ORDER BY rank LIMIT {int(limite)}"
+        else:
+            consulta = ' & '.join(f'{termo}:*' for termo in termos)
+            sql = f"SELECT id FROM {self.tabela} WHERE vetor @@ to_tsquery('simple', :consulta)"
+            if limite:
+                sql += f" ORDER BY ts_rank(vetor, to_tsquery('simple', :consulta)) DESC LIMIT {int(limite)}"
+        return text(sql).bindparams(consulta=consulta)
+
+
+INDICES = {
+    Cliente: IndiceBusca(Cliente, 'busca_clientes', _documento_cliente,
+                         campos=('nome', 'telefone', 'email'),
+                         colunas_fallback=('nome', 'telefone', 'email'), juntar_digitos=True),
+    Produto: IndiceBusca(Produto, 'busca_produtos', _documento_produto,
+                         campos=('nome', 'codigo', 'marca', 'categoria', 'descricao'),
+                         colunas_fallback=('nome', 'codigo', 'descricao', 'marca')),
+}
+
+
+def _tabelas_disponiveis():
+    return current_app.extensions['busca']['tabelas']
+
+
+def indice_disponivel(indice, conexao=None):
+    """Verifica (e memoriza quando positivo) se a tabela de busca existe no banco atual"""
+    disponiveis = _tabelas_disponiveis()
+    if indice.tabela in disponiveis:
+        return True
+    if conexao is None:
+        conexao = db.session.connection()
+    if indice.existe(conexao):
+        disponiveis.add(indice.tabela)
+        return True
+    return False
+
+
+def _filtro_ilike(indice, texto):
+    return db.or_(*[getattr(indice.modelo, coluna).ilike(f'%{texto}%') for coluna in indice.colunas_fallback])
+
+
+def filtro_busca(modelo, texto):
+    """
+    Condição para usar em consultas do modelo (listagens com filtro de busca):
+    id IN (ids do índice) quando o índice existe, ILIKE nas colunas caso contrário.
+    """
+    indice = INDICES[modelo]
+    termos = termos_busca(texto, indice.juntar_digitos)
+    if not termos or not indice_disponivel(indice):
+        return _filtro_ilike(indice, texto)
+
+    dialeto = db.session.get_bind().dialect.name
+    subconsulta = indice.consulta_ids(dialeto, termos).columns(id=db.Integer).subquery()
+    return modelo.id.in_(db.select(subconsulta.c.id))
+
+
+def buscar(modelo, texto, limite=10):
+    """Registros do modelo que correspondem ao texto, ordenados por relevância"""
+    indice = INDICES[modelo]
+    limite = min(max(int(limite), 1), BUSCA_LIMITE_MAXIMO)
+    termos = termos_busca(texto, indice.juntar_digitos)
+
+    if not termos or not indice_disponivel(indice):
+        return modelo.query.filter(_filtro_ilike(indice, texto)).limit(limite).all()
+
+    dialeto = db.session.get_bind().dialect.name
+    ids = [linha.id for linha in db.session.execute(indice.consulta_ids(dialeto, termos, limite))]
+    if not ids:
+        return []
+
+    registros = {registro.id: registro for registro in modelo.query.filter(modelo.id.in_(ids))}
+    return [registros[registro_id] for registro_id in ids if registro_id in registros]
+
+
+def reconstruir(modelo=None):
+    """Recria o conteúdo do índice a partir das tabelas de origem; retorna {tabela: registros}"""
+    resultado = {}
+    conexao = db.session.connection()
+    for indice in ([INDICES[modelo]] if modelo else INDICES.values()):
+        indice.criar(conexao)
+        conexao.execute(text(f"DELETE FROM {indice.tabela}"))
+        total = 0
+        for registro in indice.modelo.query.yield_per(1000):
+            indice.gravar(conexao, registro)
+            total += 1
+        resultado[indice.tabela] = total
+    db.session.commit()
+    _tabelas_disponiveis().update(resultado)
+    return resultado
+
+
+# Sincronização pelos eventos dos modelos
+
+def _ao_inserir(mapper, conexao, registro):
+    indice = INDICES[mapper.class_]
+    if indice_disponivel(indice, conexao):
+        indice.gravar(conexao, registro)
+
+
+def _ao_atualizar(mapper, conexao, registro):
+    # Alterações em outros campos (ex.: estoque a cada venda) não tocam no índice
+    indice = INDICES[mapper.class_]
+    estado = inspect(registro)
+    if not any(estado.attrs[campo].history.has_changes() for campo in indice.campos):
+        return
+    if indice_disponivel(indice, conexao):
+        indice.gravar(conexao, registro)
+
+
+def _ao_apagar(mapper, conexao, registro):
+    indice = INDICES[mapper.class_]
+    if indice_disponivel(indice, conexao):
+        indice.apagar(conexao, registro.id)
+
+
+def _criar_tabelas(metadata, conexao, **kwargs):
+    for indice in INDICES.values():
+        indice.criar(conexao)
+
+
+def _remover_tabelas(metadata, conexao, **kwargs):
+    for indice in INDICES.values():
+        indice.remover_tabela(conexao)
+    if current_app:
+        _tabelas_disponiveis().clear()
+
+
+def init_app(app):
+    app.extensions['busca'] = {'tabelas': set()}
+
+    # Eventos registrados uma única vez por processo
+    if event.contains(Cliente, 'after_insert', _ao_inserir):
+        return
+    for modelo in INDICES:
+        event.listen(modelo, 'after_insert', _ao_inserir)
+        event.listen(modelo, 'after_update', _ao_atualizar)
+        event.listen(modelo, 'after_delete', _ao_apagar)
+
+    # db.create_all/drop_all também criam e removem as tabelas de busca
+    event.listen(db.metadata, 'after_create', _criar_tabelas)
+    event.listen(db.metadata, 'before_drop', _remover_tabelas)
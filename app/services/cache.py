@@ -0,0 +1,57 @@
+import time
+from threading import Lock
+from flask import current_app
+
+
+class CacheLocal:
+    """
+    Cache em memória do processo com expiração por chave (TTL em segundos).
+    Cada worker tem o seu; use apenas para dados que toleram alguns segundos de atraso
+    ou que sejam invalidados explicitamente.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._dados = {}
+
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return padrao
+            valor, expira_em = item
+            if expira_em is not None and expira_em <= time.monotonic():
+                del self._dados[chave]
+                return padrao
+            return valor
+
+    def definir(self, chave, valor, ttl=None):
+        expira_em = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+
+    def obter_ou_calcular(self, chave, ttl, calcular):
+        """Retorna o valor em cache ou calcula, armazena e retorna"""
+        ausente = object()
+        valor = self.obter(chave, ausente)
+        if valor is ausente:
+            valor = calcular()
+            self.definir(chave, valor, ttl)
+        return valor
+
+    def invalidar(self, prefixo=None):
+        """Remove uma chave, todas as chaves com um prefixo, ou tudo (sem argumento)"""
+        with self._lock:
+            if prefixo is None:
+                self._dados.clear()
+                return
+            for chave in [c for c in self._dados if c == prefixo or str(c).startswith(f'{prefixo}:')]:
+                del self._dados[chave]
+
+
+def obter_cache():
+    return current_app.extensions['cache_local']
+
+
+def init_app(app):
+    app.extensions['cache_local'] = CacheLocal()
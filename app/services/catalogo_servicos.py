@@ -0,0 +1,113 @@
+"""Catálogo de serviços em memória.
+
+O catálogo muda poucas vezes por mês e é lido em todo agendamento (duração e
+preço) e em toda abertura de tela (listagem). Ele é carregado inteiro uma vez,
+indexado por id, junto com o corpo JSON da listagem já serializado e seu ETag.
+
+Cada alteração em servicos incrementa, na mesma transação, o contador da tabela
+servicos_versao, como o cache de configurações. As leituras comparam esse
+contador com a versão do catálogo carregado no máximo a cada
+CATALOGO_INTERVALO_VERIFICACAO segundos; os agendamentos, que dependem do
+catálogo para validar os serviços, comparam sempre (obter_catalogo(verificar=True)),
+então um serviço criado ou removido em outro worker vale já no próximo agendamento.
+"""
+import hashlib
+import time
+from flask import current_app
+from sqlalchemy import event, func, insert, select, update
+from app import db
+from app.models.servico import Servico, VersaoServicos
+from app.services.cache import obter_cache
+
+CHAVE_CATALOGO = 'servicos:catalogo'
+
+
+class CatalogoServicos:
+    def __init__(self, servicos, versao):
+        # Dicionários de to_dict(), na ordem da listagem (por nome)
+        self.servicos = servicos
+        self.versao = versao
+        self.por_id = {servico['id']: servico for servico in servicos}
+        self.corpo = current_app.json.dumps(servicos)
+        self.etag = hashlib.sha1(self.corpo.encode()).hexdigest()
+
+    def obter(self, servico_id):
+        return self.por_id.get(servico_id)
+
+    def duracao_total(self, servicos_ids):
+        """Soma das durações em minutos; levanta KeyError com o primeiro id inexistente"""
+        total = 0
+        for servico_id in servicos_ids:
+            servico = self.por_id.get(servico_id)
+            if servico is None:
+                raise KeyError(servico_id)
+            total += servico['duracao_estimada_min']
+        return total
+
+
+def _consulta_versao():
+    return select(func.coalesce(func.max(VersaoServicos.versao), 0))
+
+
+def ler_versao(conexao=None):
+    return (conexao or db.session).execute(_consulta_versao()).scalar()
+
+
+def incrementar_versao(conexao):
+    tabela = VersaoServicos.__table__
+    if conexao.execute(update(tabela).values(versao=tabela.c.versao + 1)).rowcount == 0:
+        conexao.execute(insert(tabela).values(id=1, versao=1))
+
+
+def _carregar():
+    # A versão vem no mesmo SELECT dos serviços
+    linhas = db.session.query(Servico, _consulta_versao().scalar_subquery()).order_by(Servico.nome).all()
+    versao = linhas[0][1] if linhas else ler_versao()
+    return CatalogoServicos([servico.to_dict() for servico, _ in linhas], versao)
+
+
+def obter_catalogo(verificar=False):
+    """
+    Catálogo do processo, recarregado quando a versão do banco mudou. Com
+    verificar, compara a versão nesta chamada em vez de respeitar o intervalo.
+    """
+    estado = current_app.extensions['catalogo_servicos']
+    cache = obter_cache()
+    catalogo = cache.obter(CHAVE_CATALOGO)
+    agora = time.monotonic()
+
+    if catalogo is None:
+        catalogo = _carregar()
+    elif verificar or agora - estado['verificado_em'] >= estado['intervalo_verificacao']:
+        if ler_versao() != catalogo.versao:
+            catalogo = _carregar()
+    else:
+        return catalogo
+
+    cache.definir(CHAVE_CATALOGO, catalogo)
+    estado['verificado_em'] = agora
+    return catalogo
+
+
+def invalidar():
+    obter_cache().invalidar(CHAVE_CATALOGO)
+
+
+def _ao_alterar(mapper, conexao, registro):
+    incrementar_versao(conexao)
+    if current_app:
+        current_app.extensions['catalogo_servicos']['verificado_em'] = 0.0
+
+
+def init_app(app):
+    app.config.setdefault('CATALOGO_INTERVALO_VERIFICACAO', 2)
+    app.extensions['catalogo_servicos'] = {
+        'intervalo_verificacao': app.config['CATALOGO_INTERVALO_VERIFICACAO'],
+        'verificado_em': 0.0
+    }
+
+    # Eventos registrados uma única vez por processo
+    if event.contains(Servico, 'after_insert', _ao_alterar):
+        return
+    for evento in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(Servico, evento, _ao_alterar)
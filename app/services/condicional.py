@@ -0,0 +1,115 @@
+"""Requisições condicionais (ETag / If-None-Match e Last-Modified / If-Modified-Since).
+
+O ETag é derivado de metadados baratos de obter, e não do corpo da resposta: o
+updated_at de um registro, ou a quantidade e o maior updated_at das linhas de
+uma listagem (uma exclusão muda a quantidade, uma alteração muda o maior
+updated_at). Ele é comparado com If-None-Match antes de serializar; quando
+coincide, a resposta é um 304 sem corpo. Os ETags são fracos (W/"..."): indicam
+a mesma versão dos dados, não necessariamente os mesmos bytes.
+"""
+import hashlib
+from datetime import timezone
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import func, select
+from app import db
+
+# Incrementar quando o formato das respostas mudar, para descartar os ETags já emitidos
+VERSAO_FORMATO = 1
+
+
+def calcular_etag(*partes):
+    """ETag da URL atual (caminho e parâmetros) combinada com a versão dos dados"""
+    conteudo = '|'.join(str(parte) for parte in (VERSAO_FORMATO, request.full_path) + partes)
+    return hashlib.sha1(conteudo.encode()).hexdigest()
+
+
+def versao_colecao(query, *colunas_atualizacao):
+    """
+    Versão de uma listagem em um único SELECT: quantidade de linhas da consulta
+    (já filtrada, sem paginação) e o maior valor de cada coluna de atualização
+    (ex.: Agendamento.updated_at e, com join, Cliente.updated_at).
+    """
+    query = query.order_by(None)
+    colunas = [query.with_entities(func.count()).scalar_subquery()]
+    colunas.extend(query.with_entities(func.max(coluna)).scalar_subquery() for coluna in colunas_atualizacao)
+    return tuple(db.session.execute(select(*colunas)).one())
+
+
+def versao_registros(registros, extratores):
+    """
+    A mesma versão de versao_colecao, calculada a partir dos registros já
+    carregados: um extrator por coluna de atualização (ex.: lambda a: a.updated_at).
+    """
+    versao = [len(registros)]
+    for extrair in extratores:
+        valores = [valor for valor in map(extrair, registros) if valor is not None]
+        versao.append(max(valores) if valores else None)
+    return tuple(versao)
+
+
+def _utc(data_hora):
+    # updated_at é gravado com datetime.utcnow(), sem fuso
+    return data_hora.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _nao_modificado(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def responder(etag, gerar, ultima_modificacao=None):
+    """
+    Retorna 304 se o cliente já tem esta versão (If-None-Match ou, na ausência
+    dele, If-Modified-Since); caso contrário chama gerar() e acrescenta ETag,
+    Last-Modified e Cache-Control: no-cache (sempre revalidar) às respostas 200.
+    """
+    if request.if_none_match:
+        if request.if_none_match.contains_weak(etag):
+            return _nao_modificado(etag)
+    elif ultima_modificacao is not None and request.if_modified_since is not None:
+        if _utc(ultima_modificacao) <= request.if_modified_since:
+            return _nao_modificado(etag)
+
+    response = make_response(gerar())
+    if response.status_code == 200:
+        response.set_etag(etag, weak=True)
+        if ultima_modificacao is not None:
+            response.last_modified = _utc(ultima_modificacao)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def responder_registro(registro, serializar=lambda registro: registro.to_dict()):
+    """Resposta condicional de um único registro, versionado pelo seu updated_at"""
+    etag = calcular_etag(registro.__tablename__, registro.id, registro.updated_at)
+    return responder(etag, lambda: (jsonify(serializar(registro)), 200), registro.updated_at)
+
+
+def responder_colecao(versao, gerar):
+    """Resposta condicional de uma listagem a partir de versao_colecao(...)"""
+    return responder(calcular_etag(*versao), gerar)
+
+
+def responder_listagem(query_versao, atualizacoes, carregar, gerar):
+    """
+    Listagem completa (sem paginação) com resposta condicional. `atualizacoes` são
+    pares (coluna, extrator) — ex.: (Cliente.updated_at, lambda a: a.cliente.updated_at).
+
+    Só requisições com If-None-Match pagam a consulta de versão (query_versao já
+    filtrada, com os joins das colunas), e recebem 304 sem carregar os registros
+    quando ela coincide. As demais carregam os registros como antes e o ETag é
+    calculado deles, sem consulta extra.
+    """
+    colunas = [coluna for coluna, _ in atualizacoes]
+    extratores = [extrair for _, extrair in atualizacoes]
+
+    if request.if_none_match:
+        etag = calcular_etag(*versao_colecao(query_versao, *colunas))
+        if request.if_none_match.contains_weak(etag):
+            return _nao_modificado(etag)
+
+    registros = carregar()
+    etag = calcular_etag(*versao_registros(registros, extratores))
+    return responder(etag, lambda: gerar(registros))
@@ -0,0 +1,148 @@
+"""Cache das configurações (tabela configuracoes) em memória do processo.
+
+Todas as linhas são carregadas de uma vez e as leituras seguintes não vão ao
+banco. Cada alteração em configuracoes incrementa, na mesma transação, o
+contador da tabela configuracoes_versao. Cada processo (worker do gunicorn)
+compara esse contador com a versão que tem carregada no máximo a cada
+CONFIGURACOES_INTERVALO_VERIFICACAO segundos e recarrega tudo quando ele mudou;
+o processo que fez a alteração verifica já na leitura seguinte.
+"""
+import time
+from flask import current_app
+from sqlalchemy import event, func, insert, select, update
+from app import db
+from app.models.configuracao import Configuracao, VersaoConfiguracao
+
+
+def _inteiro(valor):
+    return int(valor)
+
+
+def _hora(valor):
+    hora = int(valor)
+    if not 0 <= hora <= 23:
+        raise ValueError(f'Hora fora do intervalo 0-23: {hora}')
+    return hora
+
+
+def _lista_inteiros(valor):
+    return tuple(int(parte) for parte in valor.split(',') if parte.strip())
+
+
+# Configurações conhecidas: chave -> (conversor do texto gravado, valor padrão)
+CONFIGURACOES = {
+    'agenda.hora_abertura': (_hora, 9),
+    'agenda.hora_fechamento': (_hora, 18),
+    'agenda.dias_funcionamento': (_lista_inteiros, (0, 1, 2, 3, 4)),  # 0 = segunda ... 6 = domingo
+}
+
+
+def _converter(valores):
+    """Valores tipados das configurações conhecidas; ausentes ou inválidos ficam com o padrão"""
+    tipados = {}
+    for chave, (conversor, padrao) in CONFIGURACOES.items():
+        try:
+            tipados[chave] = conversor(valores[chave]) if valores.get(chave) is not None else padrao
+        except ValueError:
+            current_app.logger.warning("Configuração %s inválida: %r", chave, valores[chave])
+            tipados[chave] = padrao
+
+    # O expediente precisa abrir antes de fechar; senão, os dois horários voltam ao padrão
+    if tipados['agenda.hora_abertura'] >= tipados['agenda.hora_fechamento']:
+        current_app.logger.warning(
+            "Expediente inválido: abertura %s, fechamento %s",
+            tipados['agenda.hora_abertura'], tipados['agenda.hora_fechamento']
+        )
+        for chave in ('agenda.hora_abertura', 'agenda.hora_fechamento'):
+            tipados[chave] = CONFIGURACOES[chave][1]
+    return tipados
+
+
+def ler_versao(conexao=None):
+    consulta = select(func.coalesce(func.max(VersaoConfiguracao.versao), 0))
+    return (conexao or db.session).execute(consulta).scalar()
+
+
+def incrementar_versao(conexao):
+    tabela = VersaoConfiguracao.__table__
+    if conexao.execute(update(tabela).values(versao=tabela.c.versao + 1)).rowcount == 0:
+        conexao.execute(insert(tabela).values(id=1, versao=1))
+
+
+class CacheConfiguracoes:
+    """Configurações carregadas (texto e tipadas) e a versão a que correspondem"""
+
+    def __init__(self, intervalo_verificacao):
+        self.intervalo_verificacao = intervalo_verificacao
+        # (versao, {chave: texto}, {chave: valor tipado}), trocado de uma vez a cada recarga
+        self._carregado = None
+        self._verificado_em = 0.0
+
+    def expirar(self):
+        """Força a comparação com a versão do banco na próxima leitura"""
+        self._verificado_em = 0.0
+
+    def invalidar(self):
+        self._carregado = None
+
+    def _atual(self):
+        carregado = self._carregado
+        agora = time.monotonic()
+        if carregado is not None and agora - self._verificado_em < self.intervalo_verificacao:
+            return carregado
+
+        # A versão é lida antes das linhas: uma alteração no meio da carga só provoca outra recarga
+        versao = ler_versao()
+        if carregado is None or carregado[0] != versao:
+            valores = dict(db.session.query(Configuracao.chave, Configuracao.valor))
+            carregado = (versao, valores, _converter(valores))
+            self._carregado = carregado
+        self._verificado_em = agora
+        return carregado
+
+    def obter(self, chave, padrao=None):
+        valor = self._atual()[1].get(chave)
+        return padrao if valor is None else valor
+
+    def obter_tipado(self, chave):
+        return self._atual()[2][chave]
+
+
+def obter_cache_configuracoes():
+    return current_app.extensions['configuracoes']
+
+
+def obter(chave, padrao=None):
+    """Valor (texto) da configuração, ou padrao se ela não existir"""
+    return obter_cache_configuracoes().obter(chave, padrao)
+
+
+def obter_tipado(chave):
+    """Valor convertido de uma das CONFIGURACOES (o padrão se ausente ou inválido)"""
+    return obter_cache_configuracoes().obter_tipado(chave)
+
+
+def horario_funcionamento():
+    """(hora de abertura, hora de fechamento, dias da semana de funcionamento)"""
+    return (
+        obter_tipado('agenda.hora_abertura'),
+        obter_tipado('agenda.hora_fechamento'),
+        obter_tipado('agenda.dias_funcionamento')
+    )
+
+
+def _ao_alterar(mapper, conexao, registro):
+    incrementar_versao(conexao)
+    if current_app:
+        obter_cache_configuracoes().expirar()
+
+
+def init_app(app):
+    app.config.setdefault('CONFIGURACOES_INTERVALO_VERIFICACAO', 2)
+    app.extensions['configuracoes'] = CacheConfiguracoes(app.config['CONFIGURACOES_INTERVALO_VERIFICACAO'])
+
+    # Eventos registrados uma única vez por processo
+    if event.contains(Configuracao, 'after_insert', _ao_alterar):
+        return
+    for evento in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(Configuracao, evento, _ao_alterar)
@@ -0,0 +1,229 @@
+"""Registro de consultas lentas com o plano de execução.
+
+Toda instrução SQL que passar do limite é agrupada pela impressão digital
+(SQL normalizado: literais e parâmetros viram "?", listas de IN viram "(?+)") e
+acumula ocorrências, tempo total e tempo máximo. Na primeira ocorrência de cada
+grupo o SELECT é explicado na mesma conexão (EXPLAIN QUERY PLAN no SQLite,
+EXPLAIN no PostgreSQL) para mostrar se um filtro como Venda.data_hora >= ...
+usa índice (SEARCH ... USING INDEX) ou varre a tabela (SCAN).
+
+Cada ocorrência também é gravada como uma linha JSON em um arquivo rotativo.
+Os grupos ficam na memória do processo e são consultados em /api/_consultas_lentas.
+
+Configuração:
+    CONSULTAS_LENTAS_LIMITE_MS        tempo mínimo para registrar (padrão: 100; None desliga)
+    CONSULTAS_LENTAS_EXPLAIN          captura o plano de execução (padrão: ligado)
+    CONSULTAS_LENTAS_ARQUIVO          arquivo rotativo (padrão: instance/consultas_lentas.log; None desliga)
+    CONSULTAS_LENTAS_ARQUIVO_BYTES    tamanho de cada arquivo antes de rotacionar (padrão: 5 MB)
+    CONSULTAS_LENTAS_ARQUIVO_COPIAS   arquivos antigos mantidos (padrão: 3)
+    CONSULTAS_LENTAS_MAXIMO_GRUPOS    grupos mantidos em memória (padrão: 200)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETRO = re.compile(r"%\(\w+\)s|%s|\?")
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+# Critérios de ordenação aceitos por listar()
+ORDENACOES = {
+    'total': lambda grupo: grupo['tempo_total_ms'],
+    'maximo': lambda grupo: grupo['tempo_maximo_ms'],
+    'ocorrencias': lambda grupo: grupo['ocorrencias'],
+}
+
+
+def normalizar_sql(instrucao):
+    """SQL sem valores: consultas que só diferem nos parâmetros ficam iguais"""
+    sql = _LITERAL_TEXTO.sub('?', instrucao)
+    sql = _NUMERO.sub('?', sql)
+    sql = _PARAMETRO.sub('?', sql)
+    sql = _LISTA_PARAMETROS.sub('(?+)', sql)
+    return _ESPACOS.sub(' ', sql).strip()
+
+
+def impressao_digital(sql_normalizado):
+    return hashlib.sha1(sql_normalizado.encode()).hexdigest()[:16]
+
+
+def formato_parametros(parametros, executemany=False):
+    """Tipos dos parâmetros, sem os valores (ex.: ['int', 'datetime'] ou {'id': 'int'})"""
+    if executemany:
+        parametros = list(parametros or [])
+        return {'lotes': len(parametros), 'parametros': formato_parametros(parametros[0]) if parametros else None}
+    if isinstance(parametros, dict):
+        return {nome: type(valor).__name__ for nome, valor in parametros.items()}
+    return [type(valor).__name__ for valor in (parametros or ())]
+
+
+def explicar(conexao_dbapi, dialeto, instrucao, parametros):
+    """Plano de execução de um SELECT (lista de linhas), usando um cursor próprio"""
+    if dialeto == 'sqlite':
+        cursor = conexao_dbapi.cursor()
+        try:
+            # Linhas (id, parent, notused, detail)
+            cursor.execute('EXPLAIN QUERY PLAN ' + instrucao, parametros)
+            return [str(linha[-1]) for linha in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    # No PostgreSQL um erro invalidaria a transação da requisição: EXPLAIN dentro de um savepoint
+    cursor = conexao_dbapi.cursor()
+    try:
+        cursor.execute('SAVEPOINT consultas_lentas_explain')
+        try:
+            cursor.execute('EXPLAIN ' + instrucao, parametros)
+            plano = [str(linha[-1]) for linha in cursor.fetchall()]
+        except Exception:
+            cursor.execute('ROLLBACK TO SAVEPOINT consultas_lentas_explain')
+            raise
+        cursor.execute('RELEASE SAVEPOINT consultas_lentas_explain')
+        return plano
+    finally:
+        cursor.close()
+
+
+class RegistroConsultasLentas:
+    """Grupos de consultas lentas por impressão digital; seguro entre threads"""
+
+    def __init__(self, limite_ms, explain=True, arquivo=None, maximo_grupos=200):
+        self.limite_ms = limite_ms
+        self.explain = explain
+        self.arquivo = arquivo
+        self.maximo_grupos = maximo_grupos
+        self._lock = Lock()
+        self._grupos = {}
+
+    def registrar(self, instrucao, parametros, executemany, duracao_ms, plano=None, endpoint=None):
+        sql = normalizar_sql(instrucao)
+        chave = impressao_digital(sql)
+        agora = datetime.utcnow().isoformat()
+        formato = formato_parametros(parametros, executemany)
+
+        with self._lock:
+            grupo = self._grupos.get(chave)
+            if grupo is None:
+                if len(self._grupos) >= self.maximo_grupos:
+                    # Descarta o grupo que menos pesou até agora
+                    menor = min(self._grupos.values(), key=ORDENACOES['total'])
+                    del self._grupos[menor['impressao_digital']]
+                grupo = self._grupos[chave] = {
+                    'impressao_digital': chave,
+                    'sql': sql,
+                    'exemplo': instrucao,
+                    'parametros': formato,
+                    'plano': plano,
+                    'ocorrencias': 0,
+                    'tempo_total_ms': 0.0,
+                    'tempo_maximo_ms': 0.0,
+                    'endpoints': [],
+                    'primeira_ocorrencia': agora,
+                }
+            grupo['ocorrencias'] += 1
+            grupo['tempo_total_ms'] += duracao_ms
+            grupo['tempo_maximo_ms'] = max(grupo['tempo_maximo_ms'], duracao_ms)
+            grupo['ultima_ocorrencia'] = agora
+            if grupo['plano'] is None and plano is not None:
+                grupo['plano'] = plano
+            if endpoint and endpoint not in grupo['endpoints']:
+                grupo['endpoints'].append(endpoint)
+
+        if self.arquivo is not None:
+            linha = json.dumps({
+                'data_hora': agora, 'impressao_digital': chave, 'duracao_ms': round(duracao_ms, 3),
+                'endpoint': endpoint, 'sql': sql, 'parametros': formato, 'plano': plano
+            }, ensure_ascii=False)
+            self.arquivo.handle(logging.makeLogRecord({'msg': linha, 'levelno': logging.WARNING}))
+
+    def precisa_plano(self, instrucao):
+        """Só a primeira ocorrência de cada grupo paga o EXPLAIN"""
+        palavras = instrucao.split(None, 1)
+        if not self.explain or not palavras or palavras[0].upper() not in ('SELECT', 'WITH'):
+            return False
+        with self._lock:
+            grupo = self._grupos.get(impressao_digital(normalizar_sql(instrucao)))
+            return grupo is None or grupo['plano'] is None
+
+    def listar(self, ordenar='total', limite=50):
+        """Grupos do que mais pesou para o que menos pesou, pelo critério escolhido"""
+        with self._lock:
+            grupos = [dict(grupo, endpoints=list(grupo['endpoints'])) for grupo in self._grupos.values()]
+        for grupo in grupos:
+            grupo['tempo_medio_ms'] = grupo['tempo_total_ms'] / grupo['ocorrencias']
+        grupos.sort(key=ORDENACOES[ordenar], reverse=True)
+        return grupos[:limite]
+
+    def limpar(self):
+        with self._lock:
+            self._grupos.clear()
+
+
+def obter_registro():
+    return current_app.extensions['consultas_lentas']
+
+
+def init_app(app):
+    app.config.setdefault('CONSULTAS_LENTAS_LIMITE_MS', 100)
+    app.config.setdefault('CONSULTAS_LENTAS_EXPLAIN', True)
+    app.config.setdefault('CONSULTAS_LENTAS_ARQUIVO', os.path.join(app.instance_path, 'consultas_lentas.log'))
+    app.config.setdefault('CONSULTAS_LENTAS_ARQUIVO_BYTES', 5 * 1024 * 1024)
+    app.config.setdefault('CONSULTAS_LENTAS_ARQUIVO_COPIAS', 3)
+    app.config.setdefault('CONSULTAS_LENTAS_MAXIMO_GRUPOS', 200)
+
+    limite_ms = app.config['CONSULTAS_LENTAS_LIMITE_MS']
+    arquivo = None
+    if limite_ms is not None and app.config['CONSULTAS_LENTAS_ARQUIVO']:
+        caminho = app.config['CONSULTAS_LENTAS_ARQUIVO']
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        # delay=True: o arquivo só é criado na primeira consulta lenta
+        arquivo = RotatingFileHandler(
+            caminho, maxBytes=app.config['CONSULTAS_LENTAS_ARQUIVO_BYTES'],
+            backupCount=app.config['CONSULTAS_LENTAS_ARQUIVO_COPIAS'], encoding='utf-8', delay=True
+        )
+    registro = RegistroConsultasLentas(
+        limite_ms, app.config['CONSULTAS_LENTAS_EXPLAIN'], arquivo, app.config['CONSULTAS_LENTAS_MAXIMO_GRUPOS']
+    )
+    app.extensions['consultas_lentas'] = registro
+    if limite_ms is None:
+        return
+
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('consultas_lentas_inicio', []).append((context, time.perf_counter()))
+
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        duracao_ms = (time.perf_counter() - conn.info['consultas_lentas_inicio'].pop()[1]) * 1000
+        if duracao_ms < registro.limite_ms:
+            return
+
+        plano = None
+        if not executemany and registro.precisa_plano(statement):
+            try:
+                plano = explicar(conn.connection.dbapi_connection, conn.dialect.name, statement, parameters)
+            except Exception as e:
+                plano = [f'EXPLAIN falhou: {e}']
+        endpoint = request.endpoint if has_request_context() else None
+        registro.registrar(statement, parameters, executemany, duracao_ms, plano, endpoint)
+
+    def _erro(contexto):
+        # Sem _depois para a instrução que levantou erro; descarta o início guardado em _antes
+        inicios = contexto.connection.info.get('consultas_lentas_inicio') if contexto.connection is not None else None
+        if inicios and contexto.execution_context is not None and inicios[-1][0] is contexto.execution_context:
+            inicios.pop()
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _antes)
+    event.listen(engine, 'after_cursor_execute', _depois)
+    event.listen(engine, 'handle_error', _erro)
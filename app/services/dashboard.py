@@ -0,0 +1,207 @@
+"""Agregados do dashboard, servidos do cache do processo.
+
+Cada tablet atualiza o dashboard a cada poucos segundos; os contadores, a série
+de faturamento e a agenda do dia são calculados com algumas consultas agregadas
+e reaproveitados por todas as requisições durante DASHBOARD_TTL segundos
+(padrão: 30; configurável no app). Quando o valor expira, só uma requisição por
+processo recalcula; as demais esperam e leem o resultado. Os dados podem ficar
+até DASHBOARD_TTL segundos atrasados em relação ao banco.
+
+Faturamento = vendas finalizadas (consolidado diário) + atendimentos pagos.
+"""
+from datetime import datetime, timedelta
+from threading import Lock
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.agendamento import Agendamento, AgendamentoServico
+from app.models.atendimento import Atendimento
+from app.models.barbeiro import Barbeiro
+from app.models.caixa_diario import CaixaDiario
+from app.models.cliente import Cliente
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.services import agregacoes, catalogo_servicos
+from app.services.cache import obter_cache
+
+CHAVE_DASHBOARD = 'dashboard'
+DASHBOARD_TTL = 30
+MAXIMO_DIAS_FATURAMENTO = 365
+
+STATUS_AGENDAMENTO = ('pendente', 'confirmado', 'em_andamento', 'concluido', 'cancelado')
+
+_calculando = Lock()
+
+
+def ttl():
+    return current_app.config.get('DASHBOARD_TTL', DASHBOARD_TTL)
+
+
+def _em_cache(chave, calcular):
+    """Valor em cache ou calculado por uma única requisição do processo"""
+    cache = obter_cache()
+    ausente = object()
+    valor = cache.obter(chave, ausente)
+    if valor is not ausente:
+        return valor
+    with _calculando:
+        # Outra requisição pode ter calculado enquanto esta esperava
+        valor = cache.obter(chave, ausente)
+        if valor is ausente:
+            valor = calcular()
+            cache.definir(chave, valor, ttl())
+    return valor
+
+
+def _inicio_do_dia(agora):
+    return agora.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _data(valor):
+    # SQLite devolve date() como texto; outros bancos já devolvem date
+    return datetime.strptime(valor, '%Y-%m-%d').date() if isinstance(valor, str) else valor
+
+
+def contadores(agora=None):
+    """Contadores do dia: agendamentos por status, faturamento, caixa, estoque e clientes"""
+    agora = agora or datetime.now()
+    hoje = _inicio_do_dia(agora)
+    amanha = hoje + timedelta(days=1)
+
+    por_status = dict.fromkeys(STATUS_AGENDAMENTO, 0)
+    por_status.update(db.session.query(Agendamento.status, func.count(Agendamento.id)).filter(
+        Agendamento.data_hora_inicio >= hoje, Agendamento.data_hora_inicio < amanha
+    ).group_by(Agendamento.status).all())
+
+    vendas = agregacoes.totais_vendas(hoje, amanha)
+    atendimentos, valor_servicos = db.session.query(
+        func.count(Atendimento.id), func.coalesce(func.sum(Atendimento.valor_total), 0.0)
+    ).filter(Atendimento.data_hora >= hoje, Atendimento.data_hora < amanha, Atendimento.status == 'pago').one()
+
+    caixa = db.session.query(CaixaDiario.id, CaixaDiario.saldo).filter(CaixaDiario.status == 'aberto')\
+        .order_by(CaixaDiario.data_abertura.desc()).first()
+
+    estoque_baixo = db.session.query(func.count(Produto.id))\
+        .filter(Produto.quantidade_estoque <= Produto.estoque_minimo).scalar()
+
+    novos_hoje, novos_mes = db.session.query(
+        func.coalesce(func.sum(db.case((Cliente.created_at >= hoje, 1), else_=0)), 0),
+        func.count(Cliente.id)
+    ).filter(Cliente.created_at >= hoje.replace(day=1)).one()
+
+    return {
+        'data': hoje.date().isoformat(),
+        # Cancelados aparecem em agendamentos_por_status, mas não contam como agendamentos do dia
+        'agendamentos_hoje': sum(por_status.values()) - por_status['cancelado'],
+        'agendamentos_por_status': por_status,
+        'faturamento_hoje': round(vendas['valor'] + valor_servicos, 2),
+        'faturamento_vendas': vendas['valor'],
+        'faturamento_servicos': round(valor_servicos, 2),
+        'vendas_hoje': vendas['total'],
+        'atendimentos_hoje': atendimentos,
+        'caixa_aberto': caixa is not None,
+        'caixa_id': caixa.id if caixa else None,
+        'caixa_saldo': round(caixa.saldo, 2) if caixa else None,
+        'produtos_estoque_baixo': estoque_baixo,
+        'clientes_novos_hoje': int(novos_hoje),
+        'clientes_novos_mes': novos_mes,
+        # Estatísticas de clientes já calculadas, reaproveitadas por alguns minutos
+        'clientes_ativos': agregacoes.estatisticas_clientes_em_cache()['ativos'],
+        'atualizado_em': agora.isoformat(timespec='seconds')
+    }
+
+
+def faturamento(dias, agora=None):
+    """Faturamento e agendamentos (não cancelados) por dia nos últimos dias, incluindo hoje"""
+    dias = min(dias, MAXIMO_DIAS_FATURAMENTO)
+    inicio = _inicio_do_dia(agora or datetime.now()) - timedelta(days=dias - 1)
+    fim = inicio + timedelta(days=dias)
+
+    vendas = agregacoes.serie_diaria(inicio, fim)
+
+    dia_atendimento = func.date(Atendimento.data_hora)
+    servicos = {_data(dia): valor for dia, valor in db.session.query(
+        dia_atendimento, func.sum(Atendimento.valor_total)
+    ).filter(
+        Atendimento.data_hora >= inicio, Atendimento.data_hora < fim, Atendimento.status == 'pago'
+    ).group_by(dia_atendimento)}
+
+    dia_agendamento = func.date(Agendamento.data_hora_inicio)
+    agendamentos = {_data(dia): quantidade for dia, quantidade in db.session.query(
+        dia_agendamento, func.count(Agendamento.id)
+    ).filter(
+        Agendamento.data_hora_inicio >= inicio, Agendamento.data_hora_inicio < fim, Agendamento.status != 'cancelado'
+    ).group_by(dia_agendamento)}
+
+    serie = []
+    for i in range(dias):
+        dia = (inicio + timedelta(days=i)).date()
+        valor_vendas = vendas.get(dia) or 0.0
+        valor_servicos = servicos.get(dia) or 0.0
+        serie.append({
+            'data': dia.isoformat(),
+            'valor': round(valor_vendas + valor_servicos, 2),
+            'vendas': round(valor_vendas, 2),
+            'servicos': round(valor_servicos, 2),
+            'agendamentos': agendamentos.get(dia, 0)
+        })
+    return serie
+
+
+def agendamentos_do_dia(dia):
+    """
+    Agenda compacta de um dia para o dashboard: uma consulta com os nomes de
+    cliente e barbeiro e outra com os serviços; nomes e preços dos serviços vêm
+    do catálogo em memória.
+    """
+    inicio = datetime.combine(dia, datetime.min.time())
+    linhas = db.session.query(
+        Agendamento.id, Agendamento.data_hora_inicio, Agendamento.data_hora_fim, Agendamento.status,
+        Agendamento.cliente_id, Cliente.nome, Agendamento.barbeiro_id, Usuario.nome
+    ).join(Cliente, Cliente.id == Agendamento.cliente_id)\
+        .join(Barbeiro, Barbeiro.id == Agendamento.barbeiro_id)\
+        .join(Usuario, Usuario.id == Barbeiro.usuario_id)\
+        .filter(Agendamento.data_hora_inicio >= inicio, Agendamento.data_hora_inicio < inicio + timedelta(days=1))\
+        .order_by(Agendamento.data_hora_inicio, Agendamento.id).all()
+
+    servicos_por_agendamento = {}
+    if linhas:
+        for agendamento_id, servico_id in db.session.query(
+            AgendamentoServico.agendamento_id, AgendamentoServico.servico_id
+        ).filter(AgendamentoServico.agendamento_id.in_([linha[0] for linha in linhas]))\
+                .order_by(AgendamentoServico.id):
+            servicos_por_agendamento.setdefault(agendamento_id, []).append(servico_id)
+
+    catalogo = catalogo_servicos.obter_catalogo()
+    agendamentos = []
+    for agendamento_id, inicio_, fim, status, cliente_id, cliente_nome, barbeiro_id, barbeiro_nome in linhas:
+        servicos = [servico for servico in map(catalogo.obter, servicos_por_agendamento.get(agendamento_id, []))
+                    if servico is not None]
+        agendamentos.append({
+            'id': agendamento_id,
+            'data': inicio_.date().isoformat(),
+            'horario': inicio_.strftime('%H:%M:%S'),
+            'horario_fim': fim.strftime('%H:%M:%S'),
+            'status': status,
+            'cliente_id': cliente_id,
+            'cliente_nome': cliente_nome,
+            'barbeiro_id': barbeiro_id,
+            'barbeiro_nome': barbeiro_nome,
+            'servico_nome': ', '.join(servico['nome'] for servico in servicos),
+            'valor': round(sum(servico['preco'] for servico in servicos), 2)
+        })
+    return agendamentos
+
+
+def contadores_em_cache():
+    chave = f"{CHAVE_DASHBOARD}:contadores:{datetime.now().date().isoformat()}"
+    return _em_cache(chave, contadores)
+
+
+def faturamento_em_cache(dias):
+    chave = f"{CHAVE_DASHBOARD}:faturamento:{datetime.now().date().isoformat()}:{dias}"
+    return _em_cache(chave, lambda: faturamento(dias))
+
+
+def agendamentos_do_dia_em_cache(dia):
+    return _em_cache(f"{CHAVE_DASHBOARD}:agenda:{dia.isoformat()}", lambda: agendamentos_do_dia(dia))
@@ -0,0 +1,309 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from threading import Lock
+from flask import current_app
+from app import db
+from app.services import configuracoes
+
+
+def filtro_sobreposicao(modelo, data_hora_inicio, data_hora_fim):
+    """
+    Predicado único de sobreposição de intervalos semiabertos:
+    existe conflito quando inicio_existente < novo_fim e fim_existente > novo_inicio
+    """
+    return db.and_(
+        modelo.data_hora_inicio < data_hora_fim,
+        modelo.data_hora_fim > data_hora_inicio
+    )
+
+
+def existe_conflito_db(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id=None):
+    """Consulta o banco com EXISTS (para no primeiro registro encontrado)"""
+    from app.models.agendamento import Agendamento
+
+    query = Agendamento.query.filter(
+        Agendamento.barbeiro_id == barbeiro_id,
+        Agendamento.status != 'cancelado',
+        filtro_sobreposicao(Agendamento, data_hora_inicio, data_hora_fim)
+    )
+
+    # Se estiver atualizando um agendamento existente, exclua-o da verificação
+    if agendamento_id:
+        query = query.filter(Agendamento.id != agendamento_id)
+
+    return db.session.query(query.exists()).scalar()
+
+
+def conflitos_em_lote(barbeiro_id, intervalos):
+    """
+    Verifica vários intervalos (inicio, fim) do mesmo barbeiro com uma única consulta,
+    restrita às janelas dos intervalos (OR das sobreposições) e só com id, início e
+    fim. Retorna, na ordem recebida, a lista de linhas (id, data_hora_inicio,
+    data_hora_fim) em conflito com cada intervalo (vazia quando está livre).
+    """
+    from app.models.agendamento import Agendamento
+
+    if not intervalos:
+        return []
+
+    existentes = db.session.query(
+        Agendamento.id,
+        Agendamento.data_hora_inicio,
+        Agendamento.data_hora_fim
+    ).filter(
+        Agendamento.barbeiro_id == barbeiro_id,
+        Agendamento.status != 'cancelado',
+        db.or_(*(filtro_sobreposicao(Agendamento, inicio, fim) for inicio, fim in intervalos))
+    ).order_by(Agendamento.data_hora_inicio).all()
+
+    inicios = [agendamento.data_hora_inicio for agendamento in existentes]
+    maior_duracao = max((a.data_hora_fim - a.data_hora_inicio for a in existentes), default=timedelta(0))
+
+    conflitos = []
+    for data_hora_inicio, data_hora_fim in intervalos:
+        # Só precisam ser examinados os que começam antes do fim e depois de inicio - maior_duracao
+        posicao = bisect_left(inicios, data_hora_fim)
+        primeiro = bisect_left(inicios, data_hora_inicio - maior_duracao)
+        conflitos.append([
+            agendamento for agendamento in existentes[primeiro:posicao]
+            if agendamento.data_hora_fim > data_hora_inicio
+        ])
+    return conflitos
+
+
+class IndiceAgenda:
+    """
+    Índice em memória (por processo) com os intervalos ocupados de cada barbeiro,
+    ordenados pelo início. Carregado sob demanda a partir de uma janela de dias
+    no passado; consultas anteriores a essa janela vão direto ao banco.
+
+    Só é seguro com um único processo escrevendo na agenda: com vários workers
+    cada processo tem a sua cópia e ela fica desatualizada.
+    """
+
+    def __init__(self, dias_historico=1):
+        self.dias_historico = dias_historico
+        self._lock = Lock()
+        self._barbeiros = {}
+
+    def limpar(self):
+        with self._lock:
+            self._barbeiros.clear()
+
+    def _carregar(self, barbeiro_id):
+        from app.models.agendamento import Agendamento
+
+        desde = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) \
+            - timedelta(days=self.dias_historico)
+        linhas = db.session.query(
+            Agendamento.data_hora_inicio,
+            Agendamento.data_hora_fim,
+            Agendamento.id
+        ).filter(
+            Agendamento.barbeiro_id == barbeiro_id,
+            Agendamento.status != 'cancelado',
+            Agendamento.data_hora_fim > desde
+        ).order_by(Agendamento.data_hora_inicio).all()
+
+        entrada = {
+            'desde': desde,
+            'intervalos': [tuple(linha) for linha in linhas],
+            'posicoes': {linha.id: (linha.data_hora_inicio, linha.data_hora_fim) for linha in linhas},
+            'maior_duracao': max((fim - inicio for inicio, fim, _ in linhas), default=timedelta(0))
+        }
+        self._barbeiros[barbeiro_id] = entrada
+        return entrada
+
+    def _entrada(self, barbeiro_id):
+        entrada = self._barbeiros.get(barbeiro_id)
+        if entrada is None:
+            entrada = self._carregar(barbeiro_id)
+        return entrada
+
+    def cobre(self, barbeiro_id, data_hora_inicio):
+        with self._lock:
+            return data_hora_inicio >= self._entrada(barbeiro_id)['desde']
+
+    def existe_conflito(self, barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id=None):
+        with self._lock:
+            entrada = self._entrada(barbeiro_id)
+            intervalos = entrada['intervalos']
+
+            # Candidatos: início antes do novo fim e não mais que a maior duração antes do novo início
+            limite_inferior = data_hora_inicio - entrada['maior_duracao']
+            posicao = bisect_left(intervalos, (data_hora_fim,))
+            while posicao > 0:
+                posicao -= 1
+                inicio, fim, id_existente = intervalos[posicao]
+                if inicio < limite_inferior:
+                    break
+                if fim > data_hora_inicio and id_existente != agendamento_id:
+                    return True
+            return False
+
+    def registrar(self, agendamento):
+        """Inclui ou reposiciona um agendamento após commit"""
+        with self._lock:
+            self._remover_de(agendamento.id)
+            entrada = self._barbeiros.get(agendamento.barbeiro_id)
+            # Barbeiros ainda não carregados serão lidos do banco na próxima consulta
+            if entrada is None or agendamento.status == 'cancelado':
+                return
+            if agendamento.data_hora_fim <= entrada['desde']:
+                return
+            insort(entrada['intervalos'], (agendamento.data_hora_inicio, agendamento.data_hora_fim, agendamento.id))
+            entrada['posicoes'][agendamento.id] = (agendamento.data_hora_inicio, agendamento.data_hora_fim)
+            entrada['maior_duracao'] = max(entrada['maior_duracao'], agendamento.data_hora_fim - agendamento.data_hora_inicio)
+
+    def remover(self, agendamento_id):
+        with self._lock:
+            self._remover_de(agendamento_id)
+
+    def _remover_de(self, agendamento_id):
+        for entrada in self._barbeiros.values():
+            intervalo = entrada['posicoes'].pop(agendamento_id, None)
+            if intervalo is not None:
+                entrada['intervalos'].remove((intervalo[0], intervalo[1], agendamento_id))
+                return
+
+
+def obter_indice():
+    """Retorna o índice em memória da aplicação atual, se habilitado"""
+    return current_app.extensions.get('indice_agenda')
+
+
+def init_app(app):
+    app.config.setdefault('AGENDA_INDICE_MEMORIA', False)
+    app.config.setdefault('AGENDA_INDICE_DIAS_HISTORICO', 1)
+
+    if app.config['AGENDA_INDICE_MEMORIA']:
+        app.extensions['indice_agenda'] = IndiceAgenda(app.config['AGENDA_INDICE_DIAS_HISTORICO'])
+
+
+def horario_disponivel(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id=None):
+    indice = obter_indice()
+    if indice is not None and indice.cobre(barbeiro_id, data_hora_inicio):
+        return not indice.existe_conflito(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id)
+    return not existe_conflito_db(barbeiro_id, data_hora_inicio, data_hora_fim, agendamento_id)
+
+
+def sincronizar(agendamento):
+    """Mantém o índice em memória alinhado após criar, atualizar ou cancelar um agendamento"""
+    indice = obter_indice()
+    if indice is not None:
+        indice.registrar(agendamento)
+
+
+def descartar(agendamento_id):
+    """Remove um agendamento excluído do índice em memória"""
+    indice = obter_indice()
+    if indice is not None:
+        indice.remover(agendamento_id)
+
+
+STATUS_OCUPADOS = ('pendente', 'confirmado', 'em_andamento')
+
+
+def mesclar_intervalos(intervalos):
+    """Une intervalos (inicio, fim) já ordenados pelo início em blocos contínuos"""
+    mesclados = []
+    for inicio, fim in intervalos:
+        if mesclados and inicio <= mesclados[-1][1]:
+            if fim > mesclados[-1][1]:
+                mesclados[-1][1] = fim
+        else:
+            mesclados.append([inicio, fim])
+    return mesclados
+
+
+def intervalos_livres(abertura, fechamento, ocupados):
+    """Varre os blocos ocupados (ordenados) e devolve as lacunas dentro do expediente"""
+    livres = []
+    cursor = abertura
+    for inicio, fim in mesclar_intervalos(ocupados):
+        if fim <= cursor:
+            continue
+        if inicio >= fechamento:
+            break
+        if inicio > cursor:
+            livres.append((cursor, inicio))
+        cursor = max(cursor, fim)
+    if cursor < fechamento:
+        livres.append((cursor, fechamento))
+    return livres
+
+
+def horarios_livres(abertura, livres, duracao, passo, agora=None):
+    """Lista os inícios alinhados à grade (abertura + k * passo) que cabem em alguma lacuna"""
+    horarios = []
+    for inicio_livre, fim_livre in livres:
+        limite = max(inicio_livre, agora) if agora else inicio_livre
+        # Primeiro ponto da grade dentro da lacuna
+        passos = -(-int((limite - abertura).total_seconds()) // int(passo.total_seconds()))
+        horario = abertura + passos * passo
+        while horario + duracao <= fim_livre:
+            horarios.append(horario)
+            horario += passo
+    return horarios
+
+
+def calcular_disponibilidade_lote(barbeiro_ids, data_inicial, dias, duracao_min=30, passo_min=30, agora=None):
+    """
+    Calcula os horários livres de vários barbeiros em vários dias com uma única
+    consulta de agendamentos. Retorna {barbeiro_id: [{data, livres, horarios}, ...]}.
+    """
+    from app.models.agendamento import Agendamento
+
+    janela_inicio = datetime.combine(data_inicial, datetime.min.time())
+    janela_fim = janela_inicio + timedelta(days=dias)
+    duracao = timedelta(minutes=duracao_min)
+    passo = timedelta(minutes=passo_min)
+
+    # Expediente e dias de funcionamento vêm das configurações (cache em memória)
+    hora_abertura, hora_fechamento, dias_funcionamento = configuracoes.horario_funcionamento()
+
+    ocupados = {barbeiro_id: [] for barbeiro_id in barbeiro_ids}
+    if barbeiro_ids:
+        linhas = db.session.query(
+            Agendamento.barbeiro_id,
+            Agendamento.data_hora_inicio,
+            Agendamento.data_hora_fim
+        ).filter(
+            Agendamento.barbeiro_id.in_(barbeiro_ids),
+            Agendamento.status.in_(STATUS_OCUPADOS),
+            filtro_sobreposicao(Agendamento, janela_inicio, janela_fim)
+        ).order_by(Agendamento.barbeiro_id, Agendamento.data_hora_inicio).all()
+
+        for barbeiro_id, inicio, fim in linhas:
+            ocupados[barbeiro_id].append((inicio, fim))
+
+    resultado = {}
+    for barbeiro_id, intervalos in ocupados.items():
+        dias_barbeiro = []
+        posicao = 0
+        for deslocamento in range(dias):
+            dia = janela_inicio + timedelta(days=deslocamento)
+            if dia.weekday() not in dias_funcionamento:
+                continue
+
+            abertura = dia.replace(hour=hora_abertura)
+            fechamento = dia.replace(hour=hora_fechamento)
+
+            # Avançar o ponteiro sobre agendamentos que terminam antes da abertura
+            while posicao < len(intervalos) and intervalos[posicao][1] <= abertura:
+                posicao += 1
+            do_dia = []
+            indice = posicao
+            while indice < len(intervalos) and intervalos[indice][0] < fechamento:
+                do_dia.append(intervalos[indice])
+                indice += 1
+
+            livres = intervalos_livres(abertura, fechamento, do_dia)
+            dias_barbeiro.append({
+                'data': dia.date().isoformat(),
+                'livres': [{'inicio': inicio.isoformat(), 'fim': fim.isoformat()} for inicio, fim in livres],
+                'horarios': [h.isoformat() for h in horarios_livres(abertura, livres, duracao, passo, agora)]
+            })
+        resultado[barbeiro_id] = dias_barbeiro
+
+    return resultado
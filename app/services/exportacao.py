@@ -0,0 +1,69 @@
+import csv
+import io
+from flask import Response, current_app, stream_with_context
+
+# Quantidade de registros buscados do banco por vez durante a exportação
+TAMANHO_LOTE = 500
+
+FORMATOS = ('json', 'csv', 'ndjson')
+
+COLUNAS_CSV_VENDA = (
+    'id', 'data_hora', 'status', 'cliente_id', 'cliente_nome', 'barbeiro_id', 'barbeiro_nome',
+    'subtotal', 'valor_desconto', 'percentual_imposto', 'valor_imposto', 'valor_total',
+    'total_pago', 'itens', 'observacao'
+)
+
+
+def linha_csv_venda(venda):
+    """Achata uma venda em uma linha de CSV (itens resumidos em uma coluna)"""
+    dados = venda.to_dict()
+    dados['total_pago'] = round(sum(p['valor'] for p in dados['pagamentos']), 2)
+    dados['itens'] = '; '.join(f"{item['produto_nome']} x{item['quantidade']}" for item in dados['itens'])
+    return [dados.get(coluna) for coluna in COLUNAS_CSV_VENDA]
+
+
+def gerar_csv(registros, colunas, converter):
+    """Gera o CSV em pedaços: cabeçalho e depois uma linha por registro"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def esvaziar():
+        conteudo = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return conteudo
+
+    escritor.writerow(colunas)
+    yield esvaziar()
+    for registro in registros:
+        escritor.writerow(converter(registro))
+        yield esvaziar()
+
+
+def gerar_ndjson(registros, converter):
+    """Gera um objeto JSON por linha, usando o serializador JSON da aplicação"""
+    for registro in registros:
+        yield current_app.json.dumps(converter(registro)) + '\n'
+
+
+def resposta_streaming(query, formato, nome_arquivo, colunas_csv=None, linha_csv=None,
+                       serializar=lambda registro: registro.to_dict()):
+    """
+    Resposta que envia o resultado da consulta aos poucos: os registros são
+    buscados em lotes com yield_per e serializados um a um, sem montar a
+    lista completa em memória.
+    """
+    registros = query.yield_per(TAMANHO_LOTE)
+
+    if formato == 'csv':
+        corpo = gerar_csv(registros, colunas_csv, linha_csv)
+        mimetype = 'text/csv'
+    else:
+        corpo = gerar_ndjson(registros, serializar)
+        mimetype = 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(corpo),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={nome_arquivo}.{formato}'}
+    )
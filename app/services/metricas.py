@@ -0,0 +1,182 @@
+"""Métricas de desempenho por requisição, expostas no formato texto do Prometheus.
+
+Para cada endpoint (nome da view, ex.: "barbeiros.listar_barbeiros") são
+registrados: quantidade de requisições por status, histograma de latência,
+quantidade e tempo das instruções SQL (eventos before/after_cursor_execute da
+engine) e bytes de resposta. Respostas em streaming não têm tamanho conhecido
+e não somam bytes.
+
+As métricas ficam na memória do processo: com vários workers, cada um expõe as
+suas e o Prometheus agrega pelas labels de instância.
+
+Configuração:
+    METRICAS_HABILITADAS      liga/desliga a coleta (padrão: ligada)
+    METRICAS_SERVER_TIMING    acrescenta o cabeçalho Server-Timing (padrão: desligado)
+    METRICAS_TOKEN            se definido, /api/_metrics exige "Authorization: Bearer <token>"
+"""
+import time
+from collections import defaultdict
+from threading import Lock
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+PREFIXO = 'bmanager'
+
+# Limites (segundos) do histograma de latência
+FAIXAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EstatisticasEndpoint:
+    def __init__(self):
+        self.requisicoes_por_status = defaultdict(int)
+        self.faixas = [0] * len(FAIXAS_LATENCIA)
+        self.latencia_total = 0.0
+        self.requisicoes = 0
+        self.sql_consultas = 0
+        self.sql_tempo = 0.0
+        self.bytes_resposta = 0
+
+
+class MetricasRequisicoes:
+    """Acumula as estatísticas por (endpoint, método); seguro entre threads"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._endpoints = defaultdict(EstatisticasEndpoint)
+
+    def registrar(self, endpoint, metodo, status, duracao, sql_consultas, sql_tempo, tamanho):
+        with self._lock:
+            estatisticas = self._endpoints[(endpoint, metodo)]
+            estatisticas.requisicoes_por_status[status] += 1
+            estatisticas.requisicoes += 1
+            estatisticas.latencia_total += duracao
+            for indice, limite in enumerate(FAIXAS_LATENCIA):
+                if duracao <= limite:
+                    estatisticas.faixas[indice] += 1
+                    break
+            estatisticas.sql_consultas += sql_consultas
+            estatisticas.sql_tempo += sql_tempo
+            estatisticas.bytes_resposta += tamanho or 0
+
+    def limpar(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        with self._lock:
+            itens = sorted(self._endpoints.items())
+            linhas = []
+
+            def metrica(nome, tipo, ajuda, amostras):
+                linhas.append(f'# HELP {PREFIXO}_{nome} {ajuda}')
+                linhas.append(f'# TYPE {PREFIXO}_{nome} {tipo}')
+                for sufixo, labels, valor in amostras:
+                    linhas.append(f'{PREFIXO}_{nome}{sufixo}{{{_labels(labels)}}} {_numero(valor)}')
+
+            metrica('requisicoes_total', 'counter', 'Requisições HTTP por endpoint, método e status.', [
+                ('', {'endpoint': endpoint, 'metodo': metodo, 'status': status}, quantidade)
+                for (endpoint, metodo), estatisticas in itens
+                for status, quantidade in sorted(estatisticas.requisicoes_por_status.items())
+            ])
+
+            amostras = []
+            for (endpoint, metodo), estatisticas in itens:
+                labels = {'endpoint': endpoint, 'metodo': metodo}
+                acumulado = 0
+                for limite, quantidade in zip(FAIXAS_LATENCIA, estatisticas.faixas):
+                    acumulado += quantidade
+                    amostras.append(('_bucket', dict(labels, le=_numero(limite)), acumulado))
+                amostras.append(('_bucket', dict(labels, le='+Inf'), estatisticas.requisicoes))
+                amostras.append(('_sum', labels, estatisticas.latencia_total))
+                amostras.append(('_count', labels, estatisticas.requisicoes))
+            metrica('requisicao_duracao_segundos', 'histogram', 'Latência das requisições em segundos.', amostras)
+
+            for nome, atributo, ajuda in (
+                ('sql_consultas_total', 'sql_consultas', 'Instruções SQL executadas pelas requisições.'),
+                ('sql_duracao_segundos_total', 'sql_tempo', 'Tempo gasto em instruções SQL, em segundos.'),
+                ('resposta_bytes_total', 'bytes_resposta', 'Bytes enviados no corpo das respostas.'),
+            ):
+                metrica(nome, 'counter', ajuda, [
+                    ('', {'endpoint': endpoint, 'metodo': metodo}, getattr(estatisticas, atributo))
+                    for (endpoint, metodo), estatisticas in itens
+                ])
+        return '\n'.join(linhas) + '\n'
+
+
+def _labels(labels):
+    return ','.join(
+        '{}="{}"'.format(nome, str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for nome, valor in labels.items()
+    )
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def obter_metricas():
+    return current_app.extensions['metricas']
+
+
+# Instrumentação SQL: contexto e início de cada instrução guardados na conexão (pode haver aninhamento)
+def _antes_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metricas_inicio', []).append((context, time.perf_counter()))
+
+
+def _depois_sql(conn, cursor, statement, parameters, context, executemany):
+    _, inicio = conn.info['metricas_inicio'].pop()
+    if has_request_context() and 'metricas_sql' in g:
+        g.metricas_sql[0] += 1
+        g.metricas_sql[1] += time.perf_counter() - inicio
+
+
+def _erro_sql(contexto):
+    # Instrução que falhou não chega ao after_cursor_execute: o início dela é retirado aqui
+    inicios = contexto.connection.info.get('metricas_inicio') if contexto.connection is not None else None
+    if inicios and contexto.execution_context is not None and inicios[-1][0] is contexto.execution_context:
+        inicios.pop()
+
+
+def _iniciar_requisicao():
+    g.metricas_inicio = time.perf_counter()
+    g.metricas_sql = [0, 0.0]
+
+
+def _finalizar_requisicao(response):
+    if 'metricas_inicio' not in g:
+        return response
+    duracao = time.perf_counter() - g.metricas_inicio
+    sql_consultas, sql_tempo = g.metricas_sql
+    tamanho = None if response.is_streamed else response.content_length
+
+    obter_metricas().registrar(
+        request.endpoint or 'desconhecido', request.method, response.status_code,
+        duracao, sql_consultas, sql_tempo, tamanho
+    )
+
+    if current_app.config['METRICAS_SERVER_TIMING']:
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={duracao * 1000:.1f}, sql;dur={sql_tempo * 1000:.1f};desc="{sql_consultas} consultas"'
+        )
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('METRICAS_HABILITADAS', True)
+    app.config.setdefault('METRICAS_SERVER_TIMING', False)
+    app.config.setdefault('METRICAS_TOKEN', None)
+    app.extensions['metricas'] = MetricasRequisicoes()
+    if not app.config['METRICAS_HABILITADAS']:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _antes_sql)
+    event.listen(engine, 'after_cursor_execute', _depois_sql)
+    event.listen(engine, 'handle_error', _erro_sql)
+
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
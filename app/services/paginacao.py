@@ -0,0 +1,130 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request, jsonify
+from sqlalchemy import and_, or_
+
+POR_PAGINA_MAXIMO = 100
+
+
+def _codificar_valor(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    return valor
+
+
+def _decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        if 'd' in valor:
+            return date.fromisoformat(valor['d'])
+        raise ValueError('Valor de cursor desconhecido')
+    return valor
+
+
+def codificar_cursor(valores):
+    """Token opaco (base64 url-safe) com os valores das colunas de ordenação do último item"""
+    conteudo = json.dumps([_codificar_valor(valor) for valor in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(conteudo.encode()).decode().rstrip('=')
+
+
+def _tipo_compativel(coluna, valor):
+    """O valor do cursor pode ser comparado com a coluna (ex.: texto não vira data)"""
+    try:
+        tipo = coluna.type.python_type
+    except NotImplementedError:
+        return not isinstance(valor, (list, dict))
+    if isinstance(valor, bool) and tipo is not bool:
+        return False
+    if tipo is float:
+        tipo = (int, float)
+    return isinstance(valor, tipo)
+
+
+def decodificar_cursor(token, ordem):
+    """
+    Decodifica o token com os valores das colunas de `ordem`; levanta ValueError
+    se ele estiver malformado ou adulterado (quantidade ou tipos diferentes das colunas)
+    """
+    try:
+        conteudo = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        valores = json.loads(conteudo)
+        if not isinstance(valores, list) or len(valores) != len(ordem):
+            raise ValueError('Quantidade de valores diferente das colunas')
+        valores = [_decodificar_valor(valor) for valor in valores]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError('Cursor inválido') from e
+
+    if not all(_tipo_compativel(coluna, valor) for (coluna, _), valor in zip(ordem, valores)):
+        raise ValueError('Cursor inválido')
+    return valores
+
+
+def _filtro_apos(ordem, valores):
+    """
+    Condição "vem depois do cursor" para a ordenação informada:
+    (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ..., respeitando asc/desc de cada coluna.
+    """
+    condicoes = []
+    for i, (coluna, decrescente) in enumerate(ordem):
+        iguais = [c == v for (c, _), v in zip(ordem[:i], valores[:i])]
+        posterior = coluna < valores[i] if decrescente else coluna > valores[i]
+        condicoes.append(and_(*iguais, posterior))
+    return or_(*condicoes)
+
+
+def paginar_por_cursor(query, ordem, por_pagina, cursor=None, incluir_total=False):
+    """
+    Paginação por chave (keyset): em vez de OFFSET, filtra os registros posteriores
+    ao último item da página anterior, então páginas profundas custam o mesmo que a primeira.
+
+    `ordem` é uma lista de (coluna, decrescente) que deve terminar em uma coluna única
+    (normalmente o id) e só conter colunas não nulas. Retorna (itens, proximo_cursor, total);
+    total é None a menos que incluir_total seja verdadeiro.
+    """
+    total = query.order_by(None).count() if incluir_total else None
+
+    if cursor:
+        query = query.filter(_filtro_apos(ordem, decodificar_cursor(cursor, ordem)))
+
+    query = query.order_by(*[coluna.desc() if decrescente else coluna.asc() for coluna, decrescente in ordem])
+
+    # Um registro a mais indica se existe próxima página sem precisar de COUNT
+    itens = query.limit(por_pagina + 1).all()
+    proximo_cursor = None
+    if len(itens) > por_pagina:
+        itens = itens[:por_pagina]
+        ultimo = itens[-1]
+        proximo_cursor = codificar_cursor([getattr(ultimo, coluna.key) for coluna, _ in ordem])
+
+    return itens, proximo_cursor, total
+
+
+def usar_cursor():
+    """Modo cursor é opcional: ativado quando a requisição traz o parâmetro `cursor` (vazio na primeira página)"""
+    return 'cursor' in request.args
+
+
+def resposta_cursor(query, ordem, serializar=lambda registro: registro.to_dict()):
+    """Monta a resposta JSON da listagem paginada por cursor a partir dos parâmetros da requisição"""
+    try:
+        por_pagina = min(max(int(request.args.get('por_pagina', 10)), 1), POR_PAGINA_MAXIMO)
+        incluir_total = request.args.get('incluir_total', 'false').lower() == 'true'
+        itens, proximo_cursor, total = paginar_por_cursor(
+            query, ordem, por_pagina, request.args.get('cursor'), incluir_total
+        )
+    except ValueError:
+        return jsonify({"erro": "Parâmetros de paginação inválidos"}), 400
+
+    resposta = {
+        'por_pagina': por_pagina,
+        'next_cursor': proximo_cursor,
+        'items': [serializar(registro) for registro in itens]
+    }
+    if total is not None:
+        resposta['total'] = total
+
+    return jsonify(resposta), 200
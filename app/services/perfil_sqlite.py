@@ -0,0 +1,65 @@
+"""Perfil de desempenho do SQLite.
+
+Aplicado a cada nova conexão (evento connect do SQLAlchemy) quando o banco é
+SQLite. Com journal_mode=WAL leitores não bloqueiam o escritor (e vice-versa) e
+busy_timeout faz uma escrita concorrente esperar pelo lock em vez de falhar na
+hora com "database is locked".
+
+Configuração:
+    SQLITE_PERFIL_DESEMPENHO   liga/desliga o perfil (padrão: ligado)
+    SQLITE_PRAGMAS             dicionário que sobrescreve PRAGMAS_PADRAO;
+                               valor None desativa o pragma
+"""
+from sqlalchemy import event
+from app import db
+
+PRAGMAS_PADRAO = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',      # Seguro com WAL: só perde as últimas transações em queda de energia
+    'busy_timeout': 5000,         # ms esperando o lock de escrita
+    'cache_size': -64000,         # Negativo = KiB (64 MB por conexão)
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+
+def pragmas_configurados(config):
+    pragmas = dict(PRAGMAS_PADRAO)
+    pragmas.update(config.get('SQLITE_PRAGMAS') or {})
+    return {nome: valor for nome, valor in pragmas.items() if valor is not None}
+
+
+def aplicar_pragmas(conexao_dbapi, pragmas):
+    cursor = conexao_dbapi.cursor()
+    try:
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+    finally:
+        cursor.close()
+
+
+def ler_pragmas(conexao, nomes=None):
+    """Valores atuais dos pragmas em uma conexão (diagnóstico e testes)"""
+    return {
+        nome: conexao.exec_driver_sql(f"PRAGMA {nome}").scalar()
+        for nome in (nomes or PRAGMAS_PADRAO)
+    }
+
+
+def init_app(app):
+    app.config.setdefault('SQLITE_PERFIL_DESEMPENHO', True)
+    if not app.config['SQLITE_PERFIL_DESEMPENHO']:
+        return
+
+    pragmas = pragmas_configurados(app.config)
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def _ao_conectar(conexao_dbapi, registro_conexao):
+        aplicar_pragmas(conexao_dbapi, pragmas)
+
+    event.listen(engine, 'connect', _ao_conectar)
+    app.extensions['perfil_sqlite'] = pragmas
@@ -0,0 +1,44 @@
+import calendar
+from datetime import timedelta
+
+FREQUENCIAS = ('diaria', 'semanal', 'mensal')
+MAXIMO_OCORRENCIAS = 52
+
+
+def _somar_meses(data_hora, meses):
+    """Mesmo dia em outro mês; dias inexistentes (ex.: 31) caem no último dia do mês"""
+    mes_indice = data_hora.month - 1 + meses
+    ano = data_hora.year + mes_indice // 12
+    mes = mes_indice % 12 + 1
+    dia = min(data_hora.day, calendar.monthrange(ano, mes)[1])
+    return data_hora.replace(year=ano, month=mes, day=dia)
+
+
+def expandir(inicio, frequencia, intervalo=1, ocorrencias=None, ate=None):
+    """
+    Expande a regra de recorrência nas datas de início das ocorrências, a partir de
+    `inicio` (inclusive). Termina após `ocorrencias` datas ou na data `ate`
+    (inclusive), o que vier primeiro; nunca passa de MAXIMO_OCORRENCIAS.
+    Ex.: a cada 2 semanas -> frequencia='semanal', intervalo=2.
+    """
+    if frequencia not in FREQUENCIAS:
+        raise ValueError(f"Frequência inválida: {frequencia}")
+    if intervalo < 1:
+        raise ValueError("O intervalo deve ser maior que zero")
+    if ocorrencias is None and ate is None:
+        raise ValueError("Informe o número de ocorrências ou a data final")
+
+    limite = min(ocorrencias or MAXIMO_OCORRENCIAS, MAXIMO_OCORRENCIAS)
+    datas = []
+    for n in range(limite):
+        if frequencia == 'diaria':
+            data_hora = inicio + timedelta(days=n * intervalo)
+        elif frequencia == 'semanal':
+            data_hora = inicio + timedelta(weeks=n * intervalo)
+        else:
+            data_hora = _somar_meses(inicio, n * intervalo)
+
+        if ate is not None and data_hora.date() > ate:
+            break
+        datas.append(data_hora)
+    return datas
@@ -0,0 +1,36 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def opcoes_carregamento(modelo, caminhos=None):
+    """
+    Monta as opções de carregamento antecipado para os relacionamentos usados na
+    serialização. Cada caminho usa pontos para relacionamentos aninhados
+    (ex.: 'barbeiro.usuario'); coleções usam selectinload e referências simples
+    usam joinedload. Sem caminhos explícitos, usa RELACIONAMENTOS_SERIALIZACAO do modelo.
+    """
+    if caminhos is None:
+        caminhos = getattr(modelo, 'RELACIONAMENTOS_SERIALIZACAO', ())
+
+    opcoes = []
+    for caminho in caminhos:
+        atual = modelo
+        opcao = None
+        for nome in caminho.split('.'):
+            relacionamento = inspect(atual).relationships[nome]
+            if relacionamento.lazy == 'dynamic':
+                raise ValueError(f"Relacionamento dinâmico '{caminho}' não pode ser carregado antecipadamente")
+
+            atributo = getattr(atual, nome)
+            if opcao is None:
+                opcao = selectinload(atributo) if relacionamento.uselist else joinedload(atributo)
+            else:
+                opcao = opcao.selectinload(atributo) if relacionamento.uselist else opcao.joinedload(atributo)
+            atual = relacionamento.mapper.class_
+        opcoes.append(opcao)
+    return opcoes
+
+
+def com_relacionamentos(query, modelo, caminhos=None):
+    """Aplica à consulta o carregamento antecipado necessário para serializar o modelo"""
+    return query.options(*opcoes_carregamento(modelo, caminhos))
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.venda import Venda, VendaItem
+from app.models.pagamento import Pagamento
+from app.models.venda_diaria import VendaDiaria, ProdutoVendaDiaria
+
+
+def _acumular(modelo, chaves, **incrementos):
+    """
+    Soma os incrementos na linha identificada pelas chaves (ex.: data) com
+    UPDATE col = col + :valor; se a linha ainda não existir, insere. Roda na
+    transação da venda, então o consolidado só muda se a venda for confirmada.
+    """
+    tabela = modelo.__table__
+    valores = {coluna: tabela.c[coluna] + valor for coluna, valor in incrementos.items()}
+    valores['updated_at'] = datetime.utcnow()
+
+    atualizar = tabela.update().where(*[tabela.c[coluna] == valor for coluna, valor in chaves.items()]).values(**valores)
+    if db.session.execute(atualizar).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(tabela.insert().values(**chaves, **incrementos))
+    except IntegrityError:
+        # Outra transação criou a linha ao mesmo tempo
+        db.session.execute(atualizar)
+
+
+def _acumular_produtos(dia, itens, sinal):
+    # Itens do mesmo produto somados antes, uma atualização por produto
+    por_produto = {}
+    for item in itens:
+        quantidade, valor = por_produto.get(item.produto_id, (0, 0.0))
+        por_produto[item.produto_id] = (quantidade + item.quantidade, valor + item.quantidade * item.valor_unitario)
+
+    for produto_id, (quantidade, valor) in por_produto.items():
+        _acumular(ProdutoVendaDiaria, {'data': dia, 'produto_id': produto_id},
+                  quantidade=sinal * quantidade, valor_total=sinal * valor)
+
+
+def _valores_venda(venda, sinal=1):
+    subtotal = sum(item.valor_unitario * item.quantidade for item in venda.itens)
+    return {
+        'quantidade': sinal,
+        'valor_bruto': sinal * subtotal,
+        'valor_desconto': sinal * (venda.valor_desconto or 0.0),
+        'valor_imposto': sinal * (venda.valor_imposto or 0.0),
+        'valor_total': sinal * (venda.valor_total or 0.0)
+    }
+
+
+def registrar_venda(venda):
+    """Inclui uma venda finalizada no consolidado do dia e nos contadores por produto"""
+    if venda.status == 'finalizada':
+        dia = venda.data_hora.date()
+        _acumular(VendaDiaria, {'data': dia}, **_valores_venda(venda))
+        _acumular_produtos(dia, venda.itens, 1)
+
+
+def estornar_venda(venda):
+    """Retira do consolidado uma venda que está sendo cancelada"""
+    dia = venda.data_hora.date()
+    _acumular(VendaDiaria, {'data': dia}, **_valores_venda(venda, sinal=-1))
+    _acumular_produtos(dia, venda.itens, -1)
+
+
+def registrar_pagamento(venda, pagamento):
+    """Soma o pagamento na forma correspondente do dia da venda"""
+    if venda.status == 'finalizada' and pagamento.forma_pagamento in VendaDiaria.FORMAS_PAGAMENTO:
+        _acumular(VendaDiaria, {'data': venda.data_hora.date()},
+                  **{f'valor_{pagamento.forma_pagamento}': pagamento.valor})
+
+
+def _data(valor):
+    # SQLite devolve date() como texto; outros bancos já devolvem date
+    return datetime.strptime(valor, '%Y-%m-%d').date() if isinstance(valor, str) else valor
+
+
+def reconstruir(data_inicio=None, data_fim=None):
+    """
+    Recalcula o consolidado a partir das vendas, opcionalmente só entre
+    data_inicio e data_fim (datas inclusivas). Retorna a quantidade de dias gravados.
+    """
+    dia_venda = func.date(Venda.data_hora)
+    filtros = [Venda.status == 'finalizada']
+    if data_inicio:
+        filtros.append(Venda.data_hora >= datetime.combine(data_inicio, datetime.min.time()))
+    if data_fim:
+        filtros.append(Venda.data_hora < datetime.combine(data_fim + timedelta(days=1), datetime.min.time()))
+
+    dias = {}
+
+    for dia, quantidade, desconto, imposto, total in db.session.query(
+        dia_venda,
+        func.count(Venda.id),
+        func.sum(Venda.valor_desconto),
+        func.sum(Venda.valor_imposto),
+        func.sum(Venda.valor_total)
+    ).filter(*filtros).group_by(dia_venda):
+        dias[_data(dia)] = {
+            'quantidade': quantidade,
+            'valor_bruto': 0.0,
+            'valor_desconto': desconto or 0.0,
+            'valor_imposto': imposto or 0.0,
+            'valor_total': total or 0.0
+        }
+
+    for dia, bruto in db.session.query(
+        dia_venda,
+        func.sum(VendaItem.quantidade * VendaItem.valor_unitario)
+    ).join(VendaItem, VendaItem.venda_id == Venda.id).filter(*filtros).group_by(dia_venda):
+        dias[_data(dia)]['valor_bruto'] = bruto or 0.0
+
+    colunas_pagamento = [
+        func.sum(case((Pagamento.forma_pagamento == forma, Pagamento.valor), else_=0.0))
+        for forma in VendaDiaria.FORMAS_PAGAMENTO
+    ]
+    for dia, *valores in db.session.query(dia_venda, *colunas_pagamento)\
+            .join(Pagamento, Pagamento.venda_id == Venda.id).filter(*filtros).group_by(dia_venda):
+        for forma, valor in zip(VendaDiaria.FORMAS_PAGAMENTO, valores):
+            dias[_data(dia)][f'valor_{forma}'] = valor or 0.0
+
+    produtos = [
+        {'data': _data(dia), 'produto_id': produto_id, 'quantidade': quantidade, 'valor_total': valor or 0.0}
+        for dia, produto_id, quantidade, valor in db.session.query(
+            dia_venda,
+            VendaItem.produto_id,
+            func.sum(VendaItem.quantidade),
+            func.sum(VendaItem.quantidade * VendaItem.valor_unitario)
+        ).join(VendaItem, VendaItem.venda_id == Venda.id).filter(*filtros).group_by(dia_venda, VendaItem.produto_id)
+    ]
+
+    # Substituir as linhas do intervalo pelas recalculadas
+    for modelo in (VendaDiaria, ProdutoVendaDiaria):
+        remover = modelo.query
+        if data_inicio:
+            remover = remover.filter(modelo.data >= data_inicio)
+        if data_fim:
+            remover = remover.filter(modelo.data <= data_fim)
+        remover.delete(synchronize_session=False)
+
+    db.session.add_all(VendaDiaria(data=dia, **valores) for dia, valores in dias.items())
+    db.session.add_all(ProdutoVendaDiaria(**linha) for linha in produtos)
+    db.session.commit()
+
+    return len(dias)
@@ -899,8 +899,8 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('clientes-loading').classList.remove('d-none');
         document.getElementById('clientes-empty').classList.add('d-none');
         
-        // URL corrigida para buscar clientes
-        const url = `/api/clientes/?busca=${encodeURIComponent(texto)}`;
+        // Busca indexada (resultados mais relevantes primeiro)
+        const url = `/api/clientes/busca?termo=${encodeURIComponent(texto)}&limite=20`;
         console.log('URL de busca:', url);
         
         // Buscar clientes na API usando API.call
@@ -912,7 +912,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 document.getElementById('clientes-loading').classList.add('d-none');
                 
                 // Verificar se há resultados
-                if (!data.items || data.items.length === 0) {
+                if (!Array.isArray(data) || data.length === 0) {
                     console.log('Nenhum cliente encontrado');
                     document.getElementById('clientes-empty').classList.remove('d-none');
                     return;
@@ -922,7 +922,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 const resultadosList = document.getElementById('clientes-resultado');
                 resultadosList.innerHTML = '';
                 
-                data.items.forEach(cliente => {
+                data.forEach(cliente => {
                     console.log('Renderizando cliente:', cliente);
                     const itemLista = document.createElement('a');
                     itemLista.href = '#';
@@ -1022,8 +1022,8 @@ document.addEventListener('DOMContentLoaded', function() {
         const modal = new bootstrap.Modal(document.getElementById('modal-buscar-produto'));
         modal.show();
         
-        // URL corrigida para buscar produtos
-        const url = `/api/produtos/?busca=${encodeURIComponent(busca)}`;
+        // Busca indexada (resultados mais relevantes primeiro)
+        const url = `/api/produtos/busca?termo=${encodeURIComponent(busca)}&limite=20`;
         console.log('URL de busca:', url);
         
         // Buscar produtos na API usando API.call
@@ -1032,7 +1032,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 console.log('Resultado da busca de produtos:', data);
                 document.getElementById('produtos-loading').classList.add('d-none');
                 
-                if (!data.items || data.items.length === 0) {
+                if (!Array.isArray(data) || data.length === 0) {
                     console.log('Nenhum produto encontrado');
                     document.getElementById('produtos-empty').classList.remove('d-none');
                     return;
@@ -1040,7 +1040,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 
                 resultadosList.innerHTML = '';
                 
-                data.items.forEach(produto => {
+                data.forEach(produto => {
                     console.log('Renderizando produto:', produto);
                     const item = document.createElement('a');
                     item.href = '#';
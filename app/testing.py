@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+
+class ContadorConsultas:
+    """Registra as instruções SQL executadas enquanto está ativo"""
+
+    def __init__(self):
+        self.instrucoes = []
+
+    @property
+    def total(self):
+        return len(self.instrucoes)
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.instrucoes.append(statement)
+
+
+@contextmanager
+def contar_consultas(engine=None):
+    """
+    Conta as consultas executadas no bloco:
+
+        with contar_consultas() as contador:
+            client.get('/api/agendamentos/')
+        assert contador.total <= 4
+    """
+    engine = engine or db.engine
+    contador = ContadorConsultas()
+    event.listen(engine, 'before_cursor_execute', contador._registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', contador._registrar)
+
+
+@contextmanager
+def assert_max_consultas(maximo, engine=None):
+    """Falha se o bloco executar mais que `maximo` consultas SQL"""
+    with contar_consultas(engine) as contador:
+        yield contador
+    if contador.total > maximo:
+        detalhes = '\n'.join(contador.instrucoes)
+        raise AssertionError(f"Esperado no máximo {maximo} consultas, executadas {contador.total}:\n{detalhes}")
@@ -10,6 +10,7 @@ def apply_indexes():
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamentos_cliente_id ON agendamentos (cliente_id)"))
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamentos_barbeiro_id ON agendamentos (barbeiro_id)"))
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamentos_status ON agendamentos (status)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamentos_barbeiro_periodo ON agendamentos (barbeiro_id, data_hora_inicio, data_hora_fim)"))
         
         # Adicionar índices para agendamento_servicos
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamento_servicos_agendamento_id ON agendamento_servicos (agendamento_id)"))
@@ -21,6 +22,19 @@ def apply_indexes():
         # Adicionar índices para clientes
         db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_clientes_nome ON clientes (nome)"))
         
+        # Adicionar índices para os relatórios de vendas
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_vendas_status_data_hora ON vendas (status, data_hora)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_venda_itens_venda_id ON venda_itens (venda_id)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_pagamentos_venda_id ON pagamentos (venda_id)"))
+        
+        # Adicionar índices para a paginação por cursor
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_agendamentos_data_hora_inicio_id ON agendamentos (data_hora_inicio, id)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_vendas_data_hora_id ON vendas (data_hora, id)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_caixa_diario_data_abertura_id ON caixa_diario (data_abertura, id)"))
+        
+        # Adicionar índices para o faturamento do dashboard
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_atendimentos_data_hora ON atendimentos (data_hora)"))
+        
         # Commit das alterações
         db.session.commit()
         
@@ -0,0 +1,252 @@
+"""
+Mede latência (p50/p95/p99) e consultas SQL dos endpoints mais usados, pelo
+cliente de testes do Flask: agenda do dia, disponibilidade, agendamento,
+criar_venda, relatórios, exportação e busca de clientes.
+
+Por padrão gera uma base sintética determinística (gerar_dados.gerar_base) em
+um SQLite temporário, na escala pedida. Com --banco usa uma base SQLite já
+gerada, trabalhando sobre uma cópia, já que o benchmark cria agendamentos e
+vendas. Cada cenário sorteia os parâmetros com a mesma semente, então duas
+execuções com os mesmos argumentos fazem exatamente as mesmas requisições.
+
+--salvar grava os resultados (com o commit atual) como linha de base;
+--comparar mostra a variação contra uma linha de base e termina com código 1
+se algum cenário piorou além da tolerância ou passou a fazer mais consultas.
+
+Uso: python benchmark_endpoints.py [--escala 0.05] [--referencia AAAA-MM-DD] [--banco base.db]
+                                   [--repeticoes 50] [--aquecimento 5] [--cenarios agenda_dia,criar_venda]
+                                   [--salvar linha_base.json] [--comparar linha_base.json] [--tolerancia 25]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from app import create_app, db
+from app.models.barbeiro import Barbeiro
+from app.models.cliente import Cliente
+from app.models.produto import Produto
+from app.models.servico import Servico
+from app.models.usuario import Usuario
+from app.testing import contar_consultas
+from gerar_dados import VOLUMES_PADRAO, ESCALAVEIS, gerar_base
+
+
+class ConfigBenchmark:
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'benchmark-secret-key'
+    JWT_SECRET_KEY = 'benchmark-jwt-secret-key'
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=6)
+    # Só o que a aplicação mede em produção; o registro de consultas lentas não escreve em disco
+    CONSULTAS_LENTAS_ARQUIVO = None
+
+
+class Contexto:
+    """Ids existentes na base e a data de referência, usados para sortear os parâmetros"""
+
+    def __init__(self, referencia):
+        self.referencia = referencia
+        self.barbeiros = [id for (id,) in db.session.query(Barbeiro.id).filter(Barbeiro.disponivel == True)]
+        self.servicos = [id for (id,) in db.session.query(Servico.id)]
+        self.precos = dict(db.session.query(Produto.id, Produto.preco))
+        self.maior_cliente = db.session.query(func.max(Cliente.id)).scalar()
+        self.nomes = [nome for (nome,) in db.session.query(Cliente.nome).limit(200)]
+        self.admin_id = db.session.query(Usuario.id).filter(Usuario.perfil == 'admin').order_by(Usuario.id).scalar()
+
+    def dia(self, aleatorio, de, ate):
+        return self.referencia + timedelta(days=aleatorio.randint(de, ate))
+
+
+# Cada cenário recebe (contexto, aleatorio) e devolve (método, url, corpo JSON)
+CENARIOS = {
+    'agenda_dia': lambda ctx, rnd: (
+        'GET', f'/api/agendamentos/data/{ctx.dia(rnd, -3, 3).isoformat()}', None),
+    'disponibilidade': lambda ctx, rnd: (
+        'GET', f'/api/agendamentos/disponibilidade?barbeiro_id={rnd.choice(ctx.barbeiros)}'
+               f'&data={ctx.dia(rnd, 1, 7).isoformat()}T{rnd.randint(9, 17):02d}:{rnd.choice([0, 30]):02d}:00'
+               f'&duracao=30', None),
+    'disponibilidade_lote': lambda ctx, rnd: (
+        'GET', f'/api/agendamentos/disponibilidade/lote?data={ctx.dia(rnd, 0, 3).isoformat()}&dias=7', None),
+    'barbeiros_disponiveis': lambda ctx, rnd: (
+        'GET', f'/api/barbeiros/?data={ctx.dia(rnd, 1, 7).isoformat()}&hora={rnd.randint(9, 17):02d}:00', None),
+    'agendar': lambda ctx, rnd: ('POST', '/api/agendamentos/', {
+        'cliente_id': rnd.randint(1, ctx.maior_cliente),
+        'barbeiro_id': rnd.choice(ctx.barbeiros),
+        'data_hora_inicio': f'{ctx.dia(rnd, 7, 30).isoformat()}T{rnd.randint(9, 17):02d}:{rnd.choice([0, 30]):02d}:00',
+        'servicos': [{'servico_id': rnd.choice(ctx.servicos)}]
+    }),
+    'criar_venda': lambda ctx, rnd: ('POST', '/api/vendas/', {
+        'cliente_id': rnd.randint(1, ctx.maior_cliente),
+        'itens': [{'produto_id': produto_id, 'quantidade': 1, 'valor_unitario': ctx.precos[produto_id]}
+                  for produto_id in rnd.sample(sorted(ctx.precos), min(rnd.randint(1, 3), len(ctx.precos)))]
+    }),
+    'relatorio_diario': lambda ctx, rnd: (
+        'GET', f'/api/vendas/relatorio/diario?data={ctx.dia(rnd, -30, 0).isoformat()}', None),
+    'relatorio_resumo': lambda ctx, rnd: ('GET', '/api/vendas/relatorio/resumo', None),
+    'relatorio_grafico': lambda ctx, rnd: (
+        'GET', f'/api/vendas/relatorio/grafico?periodo={rnd.choice([7, 30, 90])}', None),
+    'exportar_vendas': lambda ctx, rnd: (
+        'GET', f'/api/vendas/exportar?formato=csv&data_inicio={ctx.dia(rnd, -7, -7).isoformat()}'
+               f'&data_fim={ctx.referencia.isoformat()}T23:59:59', None),
+    'busca_clientes': lambda ctx, rnd: (
+        'GET', f'/api/clientes/busca?termo={rnd.choice(ctx.nomes).split()[-1][:5]}', None),
+}
+
+
+def percentil(valores, p):
+    """Percentil pelo método do posto mais próximo"""
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def medir_cenario(client, headers, contexto, nome, repeticoes, aquecimento, semente):
+    aleatorio = random.Random(f'{semente}:{nome}')
+    tempos, consultas, status = [], [], Counter()
+    for indice in range(aquecimento + repeticoes):
+        metodo, url, corpo = CENARIOS[nome](contexto, aleatorio)
+        with contar_consultas() as contador:
+            inicio = time.perf_counter()
+            response = client.open(url, method=metodo, json=corpo, headers=headers)
+            response.get_data()  # Exportações em streaming só executam ao consumir o corpo
+            duracao = time.perf_counter() - inicio
+        if indice >= aquecimento:
+            tempos.append(duracao * 1000)
+            consultas.append(contador.total)
+            status[response.status_code] += 1
+    return {
+        'p50_ms': percentil(tempos, 50),
+        'p95_ms': percentil(tempos, 95),
+        'p99_ms': percentil(tempos, 99),
+        'media_ms': sum(tempos) / len(tempos),
+        'consultas_media': sum(consultas) / len(consultas),
+        'consultas_max': max(consultas),
+        'status': {str(codigo): quantidade for codigo, quantidade in sorted(status.items())},
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir_resultados(resultados):
+    print(f"{'cenário':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'consultas':>10} {'máx':>4}  status")
+    for nome, r in resultados.items():
+        status = ' '.join(f'{codigo}×{quantidade}' for codigo, quantidade in r['status'].items())
+        print(f"{nome:<22} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['consultas_media']:>10.1f} {r['consultas_max']:>4}  {status}")
+
+
+def comparar(linha_base, resultados, parametros, tolerancia):
+    """Imprime a variação por cenário e retorna os nomes dos cenários que regrediram"""
+    if linha_base['parametros'] != parametros:
+        print(f"Atenção: parâmetros diferentes da linha de base ({linha_base['parametros']})")
+    print(f"\nComparação com {linha_base.get('commit') or 'linha de base'} ({linha_base['data']}), "
+          f"tolerância {tolerancia:.0f}%")
+    print(f"{'cenário':<22} {'p50':>8} {'p99':>8} {'consultas máx':>14}")
+
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = linha_base['cenarios'].get(nome)
+        if anterior is None:
+            print(f"{nome:<22} {'(novo)':>8}")
+            continue
+        variacao_p50 = (atual['p50_ms'] / anterior['p50_ms'] - 1) * 100
+        variacao_p99 = (atual['p99_ms'] / anterior['p99_ms'] - 1) * 100
+        piorou = (variacao_p50 > tolerancia or variacao_p99 > tolerancia
+                  or atual['consultas_max'] > anterior['consultas_max'])
+        if piorou:
+            regressoes.append(nome)
+        print(f"{nome:<22} {variacao_p50:>+7.0f}% {variacao_p99:>+7.0f}% "
+              f"{anterior['consultas_max']:>6} → {atual['consultas_max']:<5}{'  REGRESSÃO' if piorou else ''}")
+    return regressoes
+
+
+def executar_benchmark(argumentos):
+    diretorio = tempfile.mkdtemp(prefix='benchmark_endpoints_')
+    try:
+        caminho = os.path.join(diretorio, 'benchmark.db')
+        if argumentos.banco:
+            shutil.copyfile(argumentos.banco, caminho)
+
+        config = type('Config', (ConfigBenchmark,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}'})
+        app = create_app(config)
+        with app.app_context():
+            if not argumentos.banco:
+                volumes = {nome: max(1, round(VOLUMES_PADRAO[nome] * argumentos.escala)) for nome in ESCALAVEIS}
+                print(f"Gerando base sintética: {volumes}")
+                gerar_base(volumes, argumentos.semente, argumentos.referencia, saida=lambda linha: None)
+
+            contexto = Contexto(argumentos.referencia)
+            with app.test_request_context():
+                token = create_access_token(identity=str(contexto.admin_id), additional_claims={'perfil': 'admin'})
+            headers = {'Authorization': f'Bearer {token}'}
+            client = app.test_client()
+
+            nomes = argumentos.cenarios.split(',') if argumentos.cenarios else list(CENARIOS)
+            print(f"{argumentos.repeticoes} requisições por cenário (após {argumentos.aquecimento} de aquecimento)\n")
+            resultados = {
+                nome: medir_cenario(client, headers, contexto, nome, argumentos.repeticoes,
+                                    argumentos.aquecimento, argumentos.semente)
+                for nome in nomes
+            }
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    imprimir_resultados(resultados)
+
+    parametros = {
+        'banco': os.path.basename(argumentos.banco) if argumentos.banco else None,
+        'escala': None if argumentos.banco else argumentos.escala,
+        'semente': argumentos.semente,
+        'referencia': argumentos.referencia.isoformat(),
+        'repeticoes': argumentos.repeticoes,
+    }
+    if argumentos.salvar:
+        with open(argumentos.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump({'commit': commit_atual(), 'data': datetime.now().isoformat(timespec='seconds'),
+                       'parametros': parametros, 'cenarios': resultados}, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base salva em {argumentos.salvar}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(json.load(arquivo), resultados, parametros, argumentos.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} cenário(s) com regressão: {', '.join(regressoes)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escala', type=float, default=0.05,
+                        help='escala da base gerada (1.0 = 1 milhão de agendamentos)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--referencia', type=date.fromisoformat, default=date.today(),
+                        help='"hoje" da base gerada e dos parâmetros sorteados')
+    parser.add_argument('--banco', help='arquivo SQLite já gerado com gerar_dados.py (usado em uma cópia)')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--aquecimento', type=int, default=5)
+    parser.add_argument('--cenarios', help=f"lista separada por vírgulas ({', '.join(CENARIOS)})")
+    parser.add_argument('--salvar', help='grava os resultados como linha de base (JSON)')
+    parser.add_argument('--comparar', help='linha de base (JSON) para comparação')
+    parser.add_argument('--tolerancia', type=float, default=25.0,
+                        help='piora máxima aceita em p50/p99, em porcentagem')
+    argumentos = parser.parse_args()
+    if argumentos.cenarios and set(argumentos.cenarios.split(',')) - set(CENARIOS):
+        parser.error(f"cenários desconhecidos: {', '.join(set(argumentos.cenarios.split(',')) - set(CENARIOS))}")
+    sys.exit(executar_benchmark(argumentos))
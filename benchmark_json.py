@@ -0,0 +1,114 @@
+"""
+Compara a serialização JSON de respostas grandes (10 mil agendamentos e 10 mil
+vendas, no formato dos to_dict) com o provedor padrão do Flask e com o
+ProvedorJSON da aplicação, usando orjson e usando a biblioteca padrão.
+
+Uso: python benchmark_json.py [--linhas 10000] [--repeticoes 5]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import ProvedorJSON, orjson
+
+
+def payload_agenda(linhas, aleatorio):
+    inicio = datetime(2026, 1, 5, 9, 0)
+    servicos = [
+        {'id': i, 'nome': nome, 'descricao': None, 'preco': preco, 'duracao_estimada_min': duracao,
+         'created_at': inicio - timedelta(days=90), 'updated_at': inicio - timedelta(days=30)}
+        for i, (nome, preco, duracao) in enumerate([('Corte', 40.0, 30), ('Barba', 25.0, 20), ('Sobrancelha', 15.0, 10)], 1)
+    ]
+    agendamentos = []
+    for i in range(linhas):
+        data_hora = inicio + timedelta(minutes=30 * i)
+        agendamentos.append({
+            'id': i + 1,
+            'cliente_id': aleatorio.randint(1, 5000),
+            'barbeiro_id': aleatorio.randint(1, 10),
+            'cliente_nome': f'Cliente {i}',
+            'barbeiro_nome': f'Barbeiro {i % 10}',
+            # Campos convertidos à mão nos to_dict
+            'data_hora_inicio': data_hora.isoformat(),
+            'data_hora_fim': (data_hora + timedelta(minutes=30)).isoformat(),
+            'status': aleatorio.choice(['pendente', 'confirmado', 'concluido', 'cancelado']),
+            'observacoes': None,
+            'serie_id': None,
+            'servicos': aleatorio.sample(servicos, aleatorio.randint(1, 2)),
+            # Campos datetime entregues ao provedor JSON
+            'created_at': data_hora - timedelta(days=2),
+            'updated_at': data_hora - timedelta(days=1)
+        })
+    return agendamentos
+
+
+def payload_vendas(linhas, aleatorio):
+    inicio = datetime(2026, 1, 5, 9, 0)
+    vendas = []
+    for i in range(linhas):
+        data_hora = inicio + timedelta(minutes=15 * i)
+        itens = [
+            {'id': i * 3 + j, 'produto_id': aleatorio.randint(1, 200), 'produto_nome': f'Produto {j}',
+             'quantidade': aleatorio.randint(1, 3), 'valor_unitario': 29.9, 'percentual_desconto': 0.0,
+             'valor_total': 29.9, 'created_at': data_hora, 'updated_at': data_hora}
+            for j in range(aleatorio.randint(1, 3))
+        ]
+        vendas.append({
+            'id': i + 1,
+            'cliente_id': aleatorio.randint(1, 5000),
+            'cliente_nome': f'Cliente {i}',
+            'data_hora': data_hora,
+            'status': 'finalizada',
+            'subtotal': Decimal('89.70'),
+            'valor_desconto': 0.0,
+            'valor_total': 89.7,
+            'itens': itens,
+            'pagamentos': [{'id': i + 1, 'tipo': 'pagamento', 'valor': 89.7, 'forma_pagamento': 'pix',
+                            'status': 'confirmado', 'created_at': data_hora, 'updated_at': data_hora}],
+            'created_at': data_hora,
+            'updated_at': data_hora
+        })
+    return vendas
+
+
+def medir(provedor, payload, repeticoes):
+    """Melhor tempo (ms) de provedor.response(payload), como em um jsonify"""
+    tempos = timeit.repeat(lambda: provedor.response(payload).get_data(), number=1, repeat=repeticoes)
+    return min(tempos) * 1000, len(provedor.response(payload).get_data())
+
+
+def executar_benchmark(linhas=10000, repeticoes=5):
+    app = Flask(__name__)
+    aleatorio = random.Random(42)
+    payloads = {
+        'agenda': payload_agenda(linhas, aleatorio),
+        'vendas': payload_vendas(linhas, aleatorio)
+    }
+
+    stdlib = ProvedorJSON(app)
+    stdlib.usar_orjson = False
+    provedores = [('Flask padrão (RFC 822)', DefaultJSONProvider(app)), ('ProvedorJSON - json', stdlib)]
+    if orjson is not None:
+        provedores.append(('ProvedorJSON - orjson', ProvedorJSON(app)))
+    else:
+        print("orjson não instalado: medindo apenas a biblioteca padrão.")
+
+    print(f"{linhas} linhas por payload, melhor de {repeticoes} execuções\n")
+    print(f"{'payload':<8} {'provedor':<26} {'tempo (ms)':>11} {'tamanho (KB)':>13} {'vs padrão':>10}")
+    for nome, payload in payloads.items():
+        referencia = None
+        for descricao, provedor in provedores:
+            tempo, tamanho = medir(provedor, payload, repeticoes)
+            referencia = referencia or tempo
+            print(f"{nome:<8} {descricao:<26} {tempo:>11.1f} {tamanho / 1024:>13.0f} {referencia / tempo:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    argumentos = parser.parse_args()
+    executar_benchmark(argumentos.linhas, argumentos.repeticoes)
@@ -0,0 +1,130 @@
+"""
+Mede escritas e leituras concorrentes em um arquivo SQLite com as configurações
+padrão do driver e com o perfil da aplicação (app.services.perfil_sqlite).
+
+Cada escritor (um processo, como um worker do gunicorn) grava vendas em
+transações curtas que também atualizam um consolidado diário; cada leitor
+soma as vendas do dia em um laço, como o dashboard e os relatórios.
+
+Uso: python benchmark_sqlite.py [--escritores 4] [--leitores 4] [--segundos 5]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from app.services.perfil_sqlite import PRAGMAS_PADRAO, aplicar_pragmas
+
+PERFIS = {
+    'padrão do driver': {},
+    'perfil da aplicação': PRAGMAS_PADRAO,
+}
+
+
+def conectar(caminho, pragmas):
+    # Mesmo timeout padrão (5 s) que o pysqlite usa por baixo do SQLAlchemy
+    conexao = sqlite3.connect(caminho, timeout=5.0)
+    aplicar_pragmas(conexao, pragmas)
+    return conexao
+
+
+def preparar(caminho, pragmas, linhas_iniciais=20000):
+    conexao = conectar(caminho, pragmas)
+    conexao.executescript("""
+        CREATE TABLE vendas (id INTEGER PRIMARY KEY, cliente_id INTEGER, valor_total REAL, data_hora TEXT);
+        CREATE INDEX ix_vendas_data_hora ON vendas (data_hora);
+        CREATE TABLE vendas_diarias (data TEXT PRIMARY KEY, quantidade INTEGER, valor_total REAL);
+    """)
+    aleatorio = random.Random(42)
+    conexao.executemany(
+        "INSERT INTO vendas (cliente_id, valor_total, data_hora) VALUES (?, ?, datetime('now', ?))",
+        [(aleatorio.randint(1, 5000), aleatorio.uniform(10, 200), f'-{aleatorio.randint(0, 90 * 24)} hours')
+         for _ in range(linhas_iniciais)]
+    )
+    conexao.execute("INSERT INTO vendas_diarias VALUES (date('now'), 0, 0)")
+    conexao.commit()
+    conexao.close()
+
+
+def escritor(caminho, pragmas, fim, resultados):
+    conexao = conectar(caminho, pragmas)
+    aleatorio = random.Random(os.getpid())
+    operacoes = erros = 0
+    while time.time() < fim:
+        valor = aleatorio.uniform(10, 200)
+        try:
+            conexao.execute(
+                "INSERT INTO vendas (cliente_id, valor_total, data_hora) VALUES (?, ?, datetime('now'))",
+                (aleatorio.randint(1, 5000), valor)
+            )
+            conexao.execute(
+                "UPDATE vendas_diarias SET quantidade = quantidade + 1, valor_total = valor_total + ? "
+                "WHERE data = date('now')", (valor,)
+            )
+            conexao.commit()
+            operacoes += 1
+        except sqlite3.OperationalError:
+            # "database is locked": a venda se perde (na aplicação, vira erro 500)
+            conexao.rollback()
+            erros += 1
+    conexao.close()
+    resultados.put(('escrita', operacoes, erros))
+
+
+def leitor(caminho, pragmas, fim, resultados):
+    conexao = conectar(caminho, pragmas)
+    operacoes = erros = 0
+    while time.time() < fim:
+        try:
+            conexao.execute(
+                "SELECT COUNT(*), SUM(valor_total) FROM vendas WHERE data_hora >= datetime('now', '-7 days')"
+            ).fetchone()
+            operacoes += 1
+        except sqlite3.OperationalError:
+            erros += 1
+    conexao.close()
+    resultados.put(('leitura', operacoes, erros))
+
+
+def medir(pragmas, escritores, leitores, segundos):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'benchmark.db')
+        preparar(caminho, pragmas)
+
+        resultados = multiprocessing.Queue()
+        fim = time.time() + segundos
+        processos = [multiprocessing.Process(target=escritor, args=(caminho, pragmas, fim, resultados))
+                     for _ in range(escritores)]
+        processos += [multiprocessing.Process(target=leitor, args=(caminho, pragmas, fim, resultados))
+                      for _ in range(leitores)]
+        for processo in processos:
+            processo.start()
+
+        totais = {'escrita': [0, 0], 'leitura': [0, 0]}
+        for _ in processos:
+            tipo, operacoes, erros = resultados.get()
+            totais[tipo][0] += operacoes
+            totais[tipo][1] += erros
+        for processo in processos:
+            processo.join()
+    return totais
+
+
+def executar_benchmark(escritores=4, leitores=4, segundos=5):
+    print(f"{escritores} escritores e {leitores} leitores por {segundos} s em cada perfil\n")
+    print(f"{'perfil':<22} {'escritas/s':>11} {'erros escrita':>14} {'leituras/s':>11} {'erros leitura':>14}")
+    for nome, pragmas in PERFIS.items():
+        totais = medir(pragmas, escritores, leitores, segundos)
+        print(f"{nome:<22} {totais['escrita'][0] / segundos:>11.0f} {totais['escrita'][1]:>14} "
+              f"{totais['leitura'][0] / segundos:>11.0f} {totais['leitura'][1]:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--segundos', type=int, default=5)
+    argumentos = parser.parse_args()
+    executar_benchmark(argumentos.escritores, argumentos.leitores, argumentos.segundos)
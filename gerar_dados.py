@@ -0,0 +1,420 @@
+"""
+Gera uma base sintética em escala de produção para testes de desempenho.
+
+Volumes padrão: 100 mil clientes, 20 barbeiros, 200 produtos, 1 milhão de
+agendamentos com serviços e 500 mil vendas com itens, pagamentos e movimentos
+de estoque (--escala multiplica clientes, agendamentos e vendas). Tudo é gravado com INSERTs em lote
+(executemany) e é determinístico: a mesma semente e a mesma data de referência
+geram exatamente os mesmos registros. Cada dia da agenda usa um gerador próprio
+(semente + data), então a agenda de um dia não depende do volume pedido.
+
+A agenda termina 30 dias depois da data de referência (com ocupação decrescente)
+e recua no tempo até atingir o volume de agendamentos; as vendas cobrem o mesmo
+período até a data de referência. No fim são reconstruídos o consolidado diário
+de vendas, o histórico de atendimentos dos clientes e o índice de busca.
+
+Uso: python gerar_dados.py [--escala 1.0] [--semente 42] [--referencia AAAA-MM-DD] [--limpar]
+                           [--clientes N] [--barbeiros N] [--produtos N] [--agendamentos N] [--vendas N]
+"""
+import argparse
+import random
+import time as cronometro
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func, insert
+from app import bcrypt, create_app, db
+from app.models.agendamento import Agendamento, AgendamentoServico
+from app.models.barbeiro import Barbeiro
+from app.models.cliente import Cliente
+from app.models.configuracao import Configuracao, VersaoConfiguracao
+from app.models.movimento_estoque import MovimentoEstoque
+from app.models.pagamento import Pagamento
+from app.models.produto import Produto
+from app.models.servico import Servico
+from app.models.usuario import Usuario
+from app.models.venda import Venda, VendaItem
+from app.services import busca, vendas_diarias
+
+VOLUMES_PADRAO = {
+    'clientes': 100_000,
+    'barbeiros': 20,
+    'produtos': 200,
+    'agendamentos': 1_000_000,
+    'vendas': 500_000,
+}
+
+# Volumes afetados por --escala; barbeiros e produtos mantêm o tamanho de uma barbearia real
+ESCALAVEIS = ('clientes', 'agendamentos', 'vendas')
+
+TAMANHO_LOTE = 10_000
+SENHA_PADRAO = 'senha123'
+
+HORA_ABERTURA = 9
+HORA_FECHAMENTO = 19
+DIAS_FUTUROS = 30
+OCUPACAO = 0.8  # Chance de um horário livre receber agendamento nos dias passados
+
+NOMES = ['Ana', 'Bruno', 'Carlos', 'Daniel', 'Eduardo', 'Felipe', 'Gabriel', 'Gustavo', 'Henrique', 'Igor',
+         'João', 'José', 'Lucas', 'Marcos', 'Mateus', 'Miguel', 'Nicolas', 'Paulo', 'Pedro', 'Rafael',
+         'Ricardo', 'Rodrigo', 'Samuel', 'Thiago', 'Vinícius', 'Beatriz', 'Camila', 'Fernanda', 'Juliana', 'Larissa']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+              'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Mendes']
+DDDS = ['11', '11', '11', '21', '31', '41', '51', '61', '71', '81']
+ESPECIALIDADES = ['Corte clássico', 'Degradê', 'Barba', 'Coloração', 'Design de sobrancelhas', 'Navalhado']
+
+# (nome, preço, duração em minutos)
+SERVICOS = [
+    ('Corte masculino', 45.0, 30), ('Barba', 30.0, 30), ('Corte e barba', 70.0, 60),
+    ('Degradê', 50.0, 45), ('Pigmentação', 60.0, 45), ('Sobrancelha', 15.0, 15),
+    ('Hidratação', 35.0, 30), ('Corte infantil', 35.0, 30), ('Luzes', 120.0, 90),
+    ('Relaxamento', 80.0, 60), ('Barboterapia', 55.0, 45), ('Acabamento', 20.0, 15),
+]
+# Serviços mais procurados primeiro (pesos de escolha)
+PESOS_SERVICOS = [30, 20, 18, 12, 3, 6, 2, 4, 1, 1, 2, 1]
+
+# (tipo, categoria, preço base)
+TIPOS_PRODUTOS = [
+    ('Pomada', 'Finalizadores', 35.0), ('Cera', 'Finalizadores', 30.0), ('Gel', 'Finalizadores', 20.0),
+    ('Shampoo', 'Cabelo', 28.0), ('Condicionador', 'Cabelo', 30.0), ('Tônico', 'Cabelo', 45.0),
+    ('Óleo para barba', 'Barba', 40.0), ('Balm', 'Barba', 38.0), ('Shampoo para barba', 'Barba', 32.0),
+    ('Pós-barba', 'Barbear', 25.0),
+]
+MARCAS = ['Barba Forte', 'Dom Pelo', 'Navalha de Ouro', 'Fio Nobre', 'Urbano', 'Clássica', 'QOD', 'Alfa']
+TAMANHOS = ['50g', '120g', '250ml']
+
+FORMAS_PAGAMENTO = ['dinheiro', 'cartao_credito', 'cartao_debito', 'pix']
+PESOS_FORMAS_PAGAMENTO = [15, 30, 20, 35]
+
+
+class GravadorLotes:
+    """
+    Acumula linhas por modelo e grava com executemany a cada TAMANHO_LOTE linhas.
+    Os modelos são descarregados na ordem em que foram informados (pais antes
+    dos filhos), o que mantém as chaves estrangeiras válidas com foreign_keys=ON.
+    """
+
+    def __init__(self, *modelos):
+        self.linhas = {modelo: [] for modelo in modelos}
+        self.totais = {modelo: 0 for modelo in modelos}
+
+    def adicionar(self, modelo, linha):
+        self.linhas[modelo].append(linha)
+        if len(self.linhas[modelo]) >= TAMANHO_LOTE:
+            self.descarregar()
+
+    def descarregar(self):
+        for modelo, linhas in self.linhas.items():
+            if linhas:
+                db.session.execute(insert(modelo), linhas)
+                self.totais[modelo] += len(linhas)
+                linhas.clear()
+        db.session.commit()
+
+
+def ocupacao_do_dia(dia, referencia):
+    """Agenda cheia no passado, esvaziando ao longo dos próximos DIAS_FUTUROS"""
+    if dia <= referencia:
+        return OCUPACAO
+    return OCUPACAO * max(0.1, 1 - (dia - referencia).days / DIAS_FUTUROS)
+
+
+def agenda_do_dia(semente, dia, referencia, barbeiros, clientes, servicos):
+    """
+    Agendamentos de um dia, sem sobreposição por barbeiro, em ordem de horário:
+    tuplas (barbeiro_id, cliente_id, inicio, fim, ids dos serviços, sorteio do status).
+    """
+    if dia.weekday() == 6:  # Fechado aos domingos
+        return []
+
+    aleatorio = random.Random(f'{semente}:agenda:{dia.isoformat()}')
+    ocupacao = ocupacao_do_dia(dia, referencia)
+    fechamento = datetime.combine(dia, time(HORA_FECHAMENTO))
+    agenda = []
+    for barbeiro_id in range(1, barbeiros + 1):
+        inicio = datetime.combine(dia, time(HORA_ABERTURA))
+        while inicio < fechamento:
+            if aleatorio.random() >= ocupacao:
+                inicio += timedelta(minutes=30)
+                continue
+            quantidade = 1 if aleatorio.random() < 0.75 else 2
+            escolhidos = set()
+            while len(escolhidos) < quantidade:
+                escolhidos.add(aleatorio.choices(range(len(servicos)), PESOS_SERVICOS)[0])
+            duracao = sum(servicos[indice][2] for indice in escolhidos)
+            fim = inicio + timedelta(minutes=duracao)
+            if fim > fechamento:
+                break
+            agenda.append((barbeiro_id, aleatorio.randint(1, clientes), inicio, fim,
+                           sorted(servicos[indice][0] for indice in escolhidos), aleatorio.random()))
+            inicio = fim
+    agenda.sort(key=lambda agendamento: (agendamento[2], agendamento[0]))
+    return agenda
+
+
+def status_agendamento(inicio, agora, sorteio):
+    if inicio >= agora:
+        return 'confirmado' if sorteio < 0.6 else 'pendente'
+    if sorteio < 0.85:
+        return 'concluido'
+    return 'cancelado' if sorteio < 0.95 else 'pendente'
+
+
+def limpar_tabelas():
+    """Remove os registros de todas as tabelas, exceto as configurações do sistema"""
+    preservadas = {Configuracao.__tablename__, VersaoConfiguracao.__tablename__}
+    for tabela in reversed(db.metadata.sorted_tables):
+        if tabela.name not in preservadas:
+            db.session.execute(tabela.delete())
+    db.session.commit()
+
+
+def gerar_usuarios(gravador, aleatorio, barbeiros, referencia):
+    # Um único hash bcrypt para todos (bcrypt é lento de propósito)
+    senha_hash = bcrypt.generate_password_hash(SENHA_PADRAO).decode('utf-8')
+    criado = datetime.combine(referencia - timedelta(days=3 * 365), time(8))
+
+    gravador.adicionar(Usuario, {
+        'id': 1, 'nome': 'Administrador', 'email': 'admin@bmanager.com', '_senha_hash': senha_hash,
+        'perfil': 'admin', 'telefone': '(11) 90000-0000', 'ativo': True, 'created_at': criado, 'updated_at': criado
+    })
+    for barbeiro_id in range(1, barbeiros + 1):
+        usuario_id = barbeiro_id + 1
+        gravador.adicionar(Usuario, {
+            'id': usuario_id, 'nome': f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}',
+            'email': f'barbeiro{barbeiro_id}@bmanager.com', '_senha_hash': senha_hash, 'perfil': 'barbeiro',
+            'telefone': f'(11) 90000-{barbeiro_id:04d}', 'ativo': True, 'created_at': criado, 'updated_at': criado
+        })
+        gravador.adicionar(Barbeiro, {
+            'id': barbeiro_id, 'usuario_id': usuario_id,
+            'especialidades': ','.join(aleatorio.sample(ESPECIALIDADES, 3)),
+            'comissao_percentual': aleatorio.choice([40.0, 45.0, 50.0, 55.0]), 'disponivel': True,
+            'created_at': criado, 'updated_at': criado
+        })
+
+
+def gerar_clientes(gravador, aleatorio, clientes, referencia):
+    for cliente_id in range(1, clientes + 1):
+        criado = datetime.combine(referencia, time(HORA_ABERTURA)) - timedelta(
+            days=aleatorio.randint(0, 5 * 365), minutes=aleatorio.randint(0, 600))
+        gravador.adicionar(Cliente, {
+            'id': cliente_id, 'nome': f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}',
+            'telefone': f'({aleatorio.choice(DDDS)}) 9{cliente_id // 10000:04d}-{cliente_id % 10000:04d}',
+            'email': f'cliente{cliente_id}@exemplo.com.br' if aleatorio.random() < 0.7 else None,
+            'ultimo_atendimento': None, 'total_atendimentos': 0, 'created_at': criado, 'updated_at': criado
+        })
+
+
+def gerar_servicos(gravador, referencia):
+    """Retorna (id, preço, duração) de cada serviço"""
+    criado = datetime.combine(referencia - timedelta(days=3 * 365), time(8))
+    servicos = []
+    for servico_id, (nome, preco, duracao) in enumerate(SERVICOS, 1):
+        gravador.adicionar(Servico, {
+            'id': servico_id, 'nome': nome, 'descricao': None, 'preco': preco,
+            'duracao_estimada_min': duracao, 'created_at': criado, 'updated_at': criado
+        })
+        servicos.append((servico_id, preco, duracao))
+    return servicos
+
+
+def gerar_produtos(gravador, aleatorio, produtos, referencia):
+    """Retorna o preço de cada produto, por id"""
+    criado = datetime.combine(referencia - timedelta(days=3 * 365), time(8))
+    combinacoes = [(tipo, marca, tamanho) for tipo in TIPOS_PRODUTOS for marca in MARCAS for tamanho in TAMANHOS]
+    aleatorio.shuffle(combinacoes)
+    precos = {}
+    for indice in range(produtos):
+        (tipo, categoria, preco_base), marca, tamanho = combinacoes[indice % len(combinacoes)]
+        nome = f'{tipo} {marca} {tamanho}'
+        if indice >= len(combinacoes):
+            nome = f'{nome} {indice // len(combinacoes) + 1}'
+        preco = round(preco_base * aleatorio.uniform(0.8, 1.6), 2)
+        produto_id = indice + 1
+        gravador.adicionar(Produto, {
+            'id': produto_id, 'codigo': f'P{produto_id:05d}', 'nome': nome, 'descricao': None,
+            'categoria': categoria, 'marca': marca, 'unidade_medida': 'un', 'preco': preco,
+            'preco_custo': round(preco * 0.55, 2), 'quantidade_estoque': aleatorio.randint(200, 2000),
+            'estoque_minimo': 5, 'imagem_url': None, 'created_at': criado, 'updated_at': criado
+        })
+        precos[produto_id] = preco
+    return precos
+
+
+def primeiro_dia_agenda(semente, total, referencia, barbeiros, clientes, servicos):
+    """Recua a partir do último dia da agenda até somar `total` agendamentos"""
+    dia = referencia + timedelta(days=DIAS_FUTUROS)
+    quantidade = 0
+    while quantidade < total:
+        quantidade += len(agenda_do_dia(semente, dia, referencia, barbeiros, clientes, servicos))
+        dia -= timedelta(days=1)
+    return dia + timedelta(days=1)
+
+
+def gerar_agendamentos(gravador, semente, total, referencia, barbeiros, clientes, servicos):
+    """Grava a agenda em ordem cronológica e retorna o primeiro dia"""
+    primeiro_dia = primeiro_dia_agenda(semente, total, referencia, barbeiros, clientes, servicos)
+    agora = datetime.combine(referencia, time(12))
+    agendamento_id = item_id = 0
+    dia = primeiro_dia
+    while agendamento_id < total:
+        for barbeiro_id, cliente_id, inicio, fim, servico_ids, sorteio in agenda_do_dia(
+                semente, dia, referencia, barbeiros, clientes, servicos):
+            agendamento_id += 1
+            criado = inicio - timedelta(days=1 + int(sorteio * 997) % 14)
+            gravador.adicionar(Agendamento, {
+                'id': agendamento_id, 'cliente_id': cliente_id, 'barbeiro_id': barbeiro_id,
+                'data_hora_inicio': inicio, 'data_hora_fim': fim,
+                'status': status_agendamento(inicio, agora, sorteio), 'observacoes': None, 'serie_id': None,
+                'created_at': criado, 'updated_at': min(fim, agora) if inicio < agora else criado
+            })
+            for servico_id in servico_ids:
+                item_id += 1
+                gravador.adicionar(AgendamentoServico, {
+                    'id': item_id, 'agendamento_id': agendamento_id, 'servico_id': servico_id,
+                    'created_at': criado, 'updated_at': criado
+                })
+            if agendamento_id >= total:
+                break
+        dia += timedelta(days=1)
+    return primeiro_dia
+
+
+def gerar_vendas(gravador, semente, total, primeiro_dia, referencia, clientes, barbeiros, precos):
+    """
+    Vendas distribuídas igualmente pelos dias de funcionamento entre primeiro_dia e a
+    referência, com itens, pagamento e os movimentos de estoque que criar_venda grava.
+    Toda segunda-feira cada produto recebe uma reposição de estoque.
+    """
+    # Pelo menos DIAS_FUTUROS dias de vendas, mesmo quando a agenda pedida cabe só no futuro
+    inicio = min(primeiro_dia, referencia - timedelta(days=DIAS_FUTUROS))
+    dias = [inicio + timedelta(days=n) for n in range((referencia - inicio).days + 1)]
+    dias = [dia for dia in dias if dia.weekday() != 6]
+    produto_ids = list(precos)
+    venda_id = item_id = pagamento_id = movimento_id = 0
+
+    def movimento(produto_id, tipo, quantidade, motivo, data_hora):
+        nonlocal movimento_id
+        movimento_id += 1
+        gravador.adicionar(MovimentoEstoque, {
+            'id': movimento_id, 'produto_id': produto_id, 'tipo': tipo, 'quantidade': quantidade,
+            'motivo': motivo, 'created_at': data_hora, 'updated_at': data_hora
+        })
+
+    for indice, dia in enumerate(dias):
+        aleatorio = random.Random(f'{semente}:vendas:{dia.isoformat()}')
+        abertura = datetime.combine(dia, time(HORA_ABERTURA))
+
+        if dia.weekday() == 0:
+            for produto_id in produto_ids:
+                movimento(produto_id, 'entrada', aleatorio.randint(10, 50), 'Reposição semanal', abertura)
+
+        quantidade = (indice + 1) * total // len(dias) - indice * total // len(dias)
+        segundos = sorted(aleatorio.randrange((HORA_FECHAMENTO - HORA_ABERTURA) * 3600) for _ in range(quantidade))
+        for segundo in segundos:
+            venda_id += 1
+            data_hora = abertura + timedelta(seconds=segundo)
+            cancelada = aleatorio.random() < 0.03
+
+            quantidades = {}
+            for produto_id in aleatorio.sample(produto_ids, min(aleatorio.choices([1, 2, 3], [70, 22, 8])[0], len(produto_ids))):
+                quantidades[produto_id] = aleatorio.choices([1, 2, 3], [80, 15, 5])[0]
+            subtotal = sum(precos[produto_id] * quantidade for produto_id, quantidade in quantidades.items())
+            desconto = round(subtotal * 0.1, 2) if aleatorio.random() < 0.1 else 0.0
+            valor_total = round(max(subtotal - desconto, 0), 2)
+
+            gravador.adicionar(Venda, {
+                'id': venda_id,
+                'cliente_id': aleatorio.randint(1, clientes) if aleatorio.random() < 0.7 else None,
+                'barbeiro_id': aleatorio.randint(1, barbeiros) if aleatorio.random() < 0.5 else None,
+                'data_hora': data_hora, 'valor_total': valor_total, 'valor_desconto': desconto,
+                'percentual_imposto': 0.0, 'valor_imposto': 0.0, 'observacao': None,
+                'status': 'cancelada' if cancelada else 'finalizada',
+                'created_at': data_hora, 'updated_at': data_hora
+            })
+            for produto_id, quantidade in quantidades.items():
+                item_id += 1
+                gravador.adicionar(VendaItem, {
+                    'id': item_id, 'venda_id': venda_id, 'produto_id': produto_id, 'quantidade': quantidade,
+                    'valor_unitario': precos[produto_id], 'percentual_desconto': 0.0,
+                    'created_at': data_hora, 'updated_at': data_hora
+                })
+                movimento(produto_id, 'saida', quantidade, f'Venda #{venda_id}', data_hora)
+                if cancelada:
+                    movimento(produto_id, 'entrada', quantidade, f'Cancelamento da venda #{venda_id}', data_hora)
+
+            pagamento_id += 1
+            gravador.adicionar(Pagamento, {
+                'id': pagamento_id, 'tipo': 'pagamento', 'valor': valor_total,
+                'forma_pagamento': aleatorio.choices(FORMAS_PAGAMENTO, PESOS_FORMAS_PAGAMENTO)[0],
+                'status': 'cancelado' if cancelada else 'confirmado', 'descricao': f'Pagamento da venda #{venda_id}',
+                'venda_id': venda_id, 'atendimento_id': None, 'plano_mensal_id': None, 'caixa_diario_id': None,
+                'created_at': data_hora, 'updated_at': data_hora
+            })
+
+
+def gerar_base(volumes=None, semente=42, referencia=None, limpar=False, saida=print):
+    """
+    Gera a base no banco da aplicação atual (chamar dentro de um app_context).
+    `volumes` sobrescreve VOLUMES_PADRAO; retorna a quantidade gravada por tabela.
+    """
+    volumes = dict(VOLUMES_PADRAO, **(volumes or {}))
+    referencia = referencia or date.today()
+    aleatorio = random.Random(semente)
+
+    db.create_all()
+    if limpar:
+        limpar_tabelas()
+    elif db.session.query(func.count(Cliente.id)).scalar() or db.session.query(func.count(Agendamento.id)).scalar():
+        raise RuntimeError("O banco já tem clientes ou agendamentos; use --limpar para substituí-los")
+
+    gravador = GravadorLotes(Usuario, Barbeiro, Cliente, Servico, Produto, Agendamento, AgendamentoServico,
+                             Venda, VendaItem, Pagamento, MovimentoEstoque)
+
+    def etapa(descricao, funcao, *args):
+        inicio = cronometro.perf_counter()
+        resultado = funcao(*args)
+        gravador.descarregar()
+        saida(f"{descricao}: {cronometro.perf_counter() - inicio:.1f} s")
+        return resultado
+
+    etapa('Usuários e barbeiros', gerar_usuarios, gravador, aleatorio, volumes['barbeiros'], referencia)
+    etapa('Clientes', gerar_clientes, gravador, aleatorio, volumes['clientes'], referencia)
+    servicos = etapa('Serviços', gerar_servicos, gravador, referencia)
+    precos = etapa('Produtos', gerar_produtos, gravador, aleatorio, volumes['produtos'], referencia)
+    primeiro_dia = etapa('Agendamentos', gerar_agendamentos, gravador, semente, volumes['agendamentos'],
+                         referencia, volumes['barbeiros'], volumes['clientes'], servicos)
+    etapa('Vendas', gerar_vendas, gravador, semente, volumes['vendas'], primeiro_dia, referencia,
+          volumes['clientes'], volumes['barbeiros'], precos)
+
+    # Dados derivados, mantidos pela aplicação nas operações do dia a dia
+    etapa('Consolidado diário de vendas', vendas_diarias.reconstruir)
+    etapa('Histórico de atendimentos dos clientes', Cliente.recalcular_atendimentos)
+    etapa('Índice de busca', busca.reconstruir)
+
+    saida(f"Agenda de {primeiro_dia.isoformat()} a {(referencia + timedelta(days=DIAS_FUTUROS)).isoformat()}")
+    return {modelo.__tablename__: total for modelo, total in gravador.totais.items()}
+
+
+def volumes_dos_argumentos(argumentos):
+    volumes = {nome: max(1, round(VOLUMES_PADRAO[nome] * argumentos.escala)) for nome in ESCALAVEIS}
+    volumes.update({nome: getattr(argumentos, nome) for nome in VOLUMES_PADRAO if getattr(argumentos, nome)})
+    return volumes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escala', type=float, default=1.0, help='fator aplicado a clientes, agendamentos e vendas')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--referencia', type=date.fromisoformat, default=date.today(),
+                        help='"hoje" da base gerada (padrão: a data atual)')
+    parser.add_argument('--limpar', action='store_true', help='apaga os dados existentes antes de gerar')
+    for nome in VOLUMES_PADRAO:
+        parser.add_argument(f'--{nome}', type=int, help=f'quantidade de {nome} (ignora --escala)')
+    argumentos = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        totais = gerar_base(volumes_dos_argumentos(argumentos), argumentos.semente, argumentos.referencia,
+                            argumentos.limpar)
+        for tabela, total in totais.items():
+            print(f"{tabela}: {total} registro(s)")
@@ -97,6 +97,12 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # O batch mode recria tabelas no SQLite; com foreign_keys=ON (perfil do SQLite
+        # da aplicação) a remoção da tabela antiga apagaria ou violaria referências
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
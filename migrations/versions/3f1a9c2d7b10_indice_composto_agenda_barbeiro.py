@@ -0,0 +1,26 @@
+"""Índice composto para verificação de disponibilidade da agenda
+
+Revision ID: 3f1a9c2d7b10
+Revises: 87588d1e6fcd
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = '87588d1e6fcd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.create_index('ix_agendamentos_barbeiro_periodo', ['barbeiro_id', 'data_hora_inicio', 'data_hora_fim'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.drop_index('ix_agendamentos_barbeiro_periodo')
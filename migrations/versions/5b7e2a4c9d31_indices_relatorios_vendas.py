@@ -0,0 +1,38 @@
+"""Índices para os relatórios de vendas
+
+Revision ID: 5b7e2a4c9d31
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2a4c9d31'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vendas', schema=None) as batch_op:
+        batch_op.create_index('ix_vendas_status_data_hora', ['status', 'data_hora'], unique=False)
+
+    with op.batch_alter_table('venda_itens', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_venda_itens_venda_id'), ['venda_id'], unique=False)
+
+    with op.batch_alter_table('pagamentos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pagamentos_venda_id'), ['venda_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pagamentos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pagamentos_venda_id'))
+
+    with op.batch_alter_table('venda_itens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_venda_itens_venda_id'))
+
+    with op.batch_alter_table('vendas', schema=None) as batch_op:
+        batch_op.drop_index('ix_vendas_status_data_hora')
@@ -0,0 +1,61 @@
+"""Consolidado diário de vendas
+
+Revision ID: 8c4d1f6e2a57
+Revises: 5b7e2a4c9d31
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4d1f6e2a57'
+down_revision = '5b7e2a4c9d31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vendas_diarias',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('valor_bruto', sa.Float(), nullable=False),
+    sa.Column('valor_desconto', sa.Float(), nullable=False),
+    sa.Column('valor_imposto', sa.Float(), nullable=False),
+    sa.Column('valor_total', sa.Float(), nullable=False),
+    sa.Column('valor_dinheiro', sa.Float(), nullable=False),
+    sa.Column('valor_cartao_credito', sa.Float(), nullable=False),
+    sa.Column('valor_cartao_debito', sa.Float(), nullable=False),
+    sa.Column('valor_pix', sa.Float(), nullable=False),
+    sa.Column('valor_transferencia', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('data')
+    )
+
+    # Consolidar as vendas finalizadas já existentes (mesmos totais de vendas_diarias.reconstruir)
+    formas = ('dinheiro', 'cartao_credito', 'cartao_debito', 'pix', 'transferencia')
+    op.execute(
+        "INSERT INTO vendas_diarias (data, quantidade, valor_bruto, valor_desconto, valor_imposto, valor_total, "
+        + ''.join(f"valor_{forma}, " for forma in formas) + "created_at, updated_at) "
+        "SELECT dia, COUNT(id), COALESCE(SUM(bruto), 0), COALESCE(SUM(valor_desconto), 0), "
+        "COALESCE(SUM(valor_imposto), 0), COALESCE(SUM(valor_total), 0), "
+        + ''.join(f"COALESCE(SUM({forma}), 0), " for forma in formas) + "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM (SELECT vendas.id, date(vendas.data_hora) AS dia, vendas.valor_desconto, vendas.valor_imposto, "
+        "vendas.valor_total, "
+        "(SELECT SUM(venda_itens.quantidade * venda_itens.valor_unitario) FROM venda_itens "
+        "WHERE venda_itens.venda_id = vendas.id) AS bruto"
+        + ''.join(
+            f", (SELECT SUM(pagamentos.valor) FROM pagamentos WHERE pagamentos.venda_id = vendas.id "
+            f"AND pagamentos.forma_pagamento = '{forma}') AS {forma}"
+            for forma in formas
+        ) + " FROM vendas WHERE vendas.status = 'finalizada') vendas_finalizadas "
+        "GROUP BY dia"
+    )
+
+
+def downgrade():
+    op.drop_table('vendas_diarias')
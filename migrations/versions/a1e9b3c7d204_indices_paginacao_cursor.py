@@ -0,0 +1,38 @@
+"""Índices para a paginação por cursor
+
+Revision ID: a1e9b3c7d204
+Revises: 8c4d1f6e2a57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1e9b3c7d204'
+down_revision = '8c4d1f6e2a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.create_index('ix_agendamentos_data_hora_inicio_id', ['data_hora_inicio', 'id'], unique=False)
+
+    with op.batch_alter_table('vendas', schema=None) as batch_op:
+        batch_op.create_index('ix_vendas_data_hora_id', ['data_hora', 'id'], unique=False)
+
+    with op.batch_alter_table('caixa_diario', schema=None) as batch_op:
+        batch_op.create_index('ix_caixa_diario_data_abertura_id', ['data_abertura', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('caixa_diario', schema=None) as batch_op:
+        batch_op.drop_index('ix_caixa_diario_data_abertura_id')
+
+    with op.batch_alter_table('vendas', schema=None) as batch_op:
+        batch_op.drop_index('ix_vendas_data_hora_id')
+
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.drop_index('ix_agendamentos_data_hora_inicio_id')
@@ -0,0 +1,35 @@
+"""Versão dos tokens por usuário e contador global de versões
+
+Revision ID: a8d2f4c6e915
+Revises: c9e1a5b3d720
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d2f4c6e915'
+down_revision = 'c9e1a5b3d720'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao_token', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('usuarios_versao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO usuarios_versao (id, versao) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('usuarios_versao')
+
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('versao_token')
@@ -0,0 +1,37 @@
+"""Totais correntes de entradas e saídas no caixa diário
+
+Revision ID: b4d6f8a1c375
+Revises: f2c8d4e6a913
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d6f8a1c375'
+down_revision = 'f2c8d4e6a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('caixa_diario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('entradas', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('saidas', sa.Float(), server_default='0', nullable=False))
+
+    # Preencher a partir dos pagamentos já registrados
+    op.execute(
+        "UPDATE caixa_diario SET "
+        "entradas = (SELECT COALESCE(SUM(valor), 0) FROM pagamentos "
+        "WHERE pagamentos.caixa_diario_id = caixa_diario.id AND pagamentos.tipo IN ('pagamento', 'entrada')), "
+        "saidas = (SELECT COALESCE(SUM(valor), 0) FROM pagamentos "
+        "WHERE pagamentos.caixa_diario_id = caixa_diario.id AND pagamentos.tipo = 'saida')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('caixa_diario', schema=None) as batch_op:
+        batch_op.drop_column('saidas')
+        batch_op.drop_column('entradas')
@@ -0,0 +1,26 @@
+"""Índice de atendimentos por data para o faturamento do dashboard
+
+Revision ID: b4e7d1f3a826
+Revises: a8d2f4c6e915
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7d1f3a826'
+down_revision = 'a8d2f4c6e915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('atendimentos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_atendimentos_data_hora'), ['data_hora'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('atendimentos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_atendimentos_data_hora'))
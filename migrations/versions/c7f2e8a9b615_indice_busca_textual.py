@@ -0,0 +1,84 @@
+"""Índice de busca textual de clientes e produtos
+
+Revision ID: c7f2e8a9b615
+Revises: a1e9b3c7d204
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import re
+import unicodedata
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2e8a9b615'
+down_revision = 'a1e9b3c7d204'
+branch_labels = None
+depends_on = None
+
+TABELAS = ('busca_clientes', 'busca_produtos')
+
+
+# Documentos como em app/services/busca.py no momento desta revisão
+def _normalizar(valor):
+    decomposto = unicodedata.normalize('NFKD', str(valor))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def _documento_cliente(nome, telefone, email):
+    digitos = re.sub(r'\D', '', telefone or '')
+    termos = [digitos] if digitos else []
+    for tamanho in (len(digitos) - 2, 8, 4):
+        if 4 <= tamanho < len(digitos) and digitos[-tamanho:] not in termos:
+            termos.append(digitos[-tamanho:])
+    partes = [nome, *termos, email]
+    return _normalizar(' '.join(p for p in partes if p))
+
+
+def _documento_produto(nome, codigo, marca, categoria, descricao):
+    partes = [nome, codigo, marca, categoria, descricao]
+    return _normalizar(' '.join(p for p in partes if p))
+
+
+def _preencher(conexao, tabela, consulta, documento):
+    """Indexa os registros já existentes (senão as buscas não os encontram)"""
+    coluna_id = 'rowid' if conexao.dialect.name == 'sqlite' else 'id'
+    inserir = sa.text(f"INSERT INTO {tabela} ({coluna_id}, documento) VALUES (:id, :documento)")
+    lote = []
+    for linha in conexao.execute(sa.text(consulta)):
+        lote.append({'id': linha[0], 'documento': documento(*linha[1:])})
+        if len(lote) >= 1000:
+            conexao.execute(inserir, lote)
+            lote = []
+    if lote:
+        conexao.execute(inserir, lote)
+
+
+def upgrade():
+    conexao = op.get_bind()
+    dialeto = op.get_bind().dialect.name
+    for tabela in TABELAS:
+        if dialeto == 'sqlite':
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabela} USING fts5("
+                "documento, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        elif dialeto == 'postgresql':
+            op.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabela} ("
+                "id INTEGER PRIMARY KEY, documento TEXT NOT NULL, "
+                "vetor TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', documento)) STORED)"
+            )
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabela}_vetor ON {tabela} USING GIN (vetor)")
+
+    if dialeto in ('sqlite', 'postgresql'):
+        _preencher(conexao, 'busca_clientes', "SELECT id, nome, telefone, email FROM clientes", _documento_cliente)
+        _preencher(conexao, 'busca_produtos', "SELECT id, nome, codigo, marca, categoria, descricao FROM produtos",
+                   _documento_produto)
+
+
+def downgrade():
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        for tabela in TABELAS:
+            op.execute(f"DROP TABLE IF EXISTS {tabela}")
@@ -0,0 +1,29 @@
+"""Contador de versão das configurações
+
+Revision ID: c9e1a5b3d720
+Revises: b4d6f8a1c375
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1a5b3d720'
+down_revision = 'b4d6f8a1c375'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('configuracoes_versao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO configuracoes_versao (id, versao) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('configuracoes_versao')
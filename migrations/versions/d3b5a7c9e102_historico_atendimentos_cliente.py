@@ -0,0 +1,37 @@
+"""Último atendimento e total de atendimentos em clientes
+
+Revision ID: d3b5a7c9e102
+Revises: c7f2e8a9b615
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b5a7c9e102'
+down_revision = 'c7f2e8a9b615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ultimo_atendimento', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('total_atendimentos', sa.Integer(), server_default='0', nullable=False))
+
+    # Preencher a partir dos agendamentos concluídos
+    op.execute(
+        "UPDATE clientes SET "
+        "ultimo_atendimento = (SELECT MAX(data_hora_inicio) FROM agendamentos "
+        "WHERE agendamentos.cliente_id = clientes.id AND agendamentos.status = 'concluido'), "
+        "total_atendimentos = (SELECT COUNT(id) FROM agendamentos "
+        "WHERE agendamentos.cliente_id = clientes.id AND agendamentos.status = 'concluido')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.drop_column('total_atendimentos')
+        batch_op.drop_column('ultimo_atendimento')
@@ -0,0 +1,29 @@
+"""Contador de versão do catálogo de serviços
+
+Revision ID: d8f3b6a2c417
+Revises: b4e7d1f3a826
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f3b6a2c417'
+down_revision = 'b4e7d1f3a826'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('servicos_versao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO servicos_versao (id, versao) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('servicos_versao')
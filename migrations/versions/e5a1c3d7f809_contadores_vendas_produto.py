@@ -0,0 +1,45 @@
+"""Contadores diários de vendas por produto
+
+Revision ID: e5a1c3d7f809
+Revises: d3b5a7c9e102
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c3d7f809'
+down_revision = 'd3b5a7c9e102'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('produtos_vendas_diarias',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('valor_total', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['produto_id'], ['produtos.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('data', 'produto_id', name='uq_produtos_vendas_diarias_data_produto')
+    )
+
+    # Contadores das vendas finalizadas já existentes
+    op.execute(
+        "INSERT INTO produtos_vendas_diarias (data, produto_id, quantidade, valor_total, created_at, updated_at) "
+        "SELECT date(vendas.data_hora), venda_itens.produto_id, SUM(venda_itens.quantidade), "
+        "SUM(venda_itens.quantidade * venda_itens.valor_unitario), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM venda_itens JOIN vendas ON vendas.id = venda_itens.venda_id "
+        "WHERE vendas.status = 'finalizada' "
+        "GROUP BY date(vendas.data_hora), venda_itens.produto_id"
+    )
+
+
+def downgrade():
+    op.drop_table('produtos_vendas_diarias')
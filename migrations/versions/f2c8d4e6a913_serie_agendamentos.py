@@ -0,0 +1,28 @@
+"""Série de agendamentos recorrentes
+
+Revision ID: f2c8d4e6a913
+Revises: e5a1c3d7f809
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d4e6a913'
+down_revision = 'e5a1c3d7f809'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('serie_id', sa.String(length=32), nullable=True))
+        batch_op.create_index(batch_op.f('ix_agendamentos_serie_id'), ['serie_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('agendamentos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agendamentos_serie_id'))
+        batch_op.drop_column('serie_id')
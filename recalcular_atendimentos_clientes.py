@@ -0,0 +1,13 @@
+from app import create_app
+from app.models.cliente import Cliente
+
+def recalcular_atendimentos_clientes():
+    """Recalcula último atendimento e total de atendimentos de cada cliente"""
+    app = create_app()
+    
+    with app.app_context():
+        total = Cliente.recalcular_atendimentos()
+        print(f"Histórico de atendimentos recalculado para {total} cliente(s).")
+
+if __name__ == "__main__":
+    recalcular_atendimentos_clientes()
@@ -0,0 +1,13 @@
+from app import create_app
+from app.models.caixa_diario import CaixaDiario
+
+def recalcular_totais_caixa():
+    """Recalcula as entradas e saídas acumuladas de cada caixa diário"""
+    app = create_app()
+    
+    with app.app_context():
+        total = CaixaDiario.recalcular_totais()
+        print(f"Totais recalculados para {total} caixa(s).")
+
+if __name__ == "__main__":
+    recalcular_totais_caixa()
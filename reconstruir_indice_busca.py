@@ -0,0 +1,13 @@
+from app import create_app
+from app.services import busca
+
+def reconstruir_indice_busca():
+    """Cria (se necessário) e preenche o índice de busca de clientes e produtos"""
+    app = create_app()
+    
+    with app.app_context():
+        for tabela, total in busca.reconstruir().items():
+            print(f"{tabela}: {total} registro(s) indexado(s).")
+
+if __name__ == "__main__":
+    reconstruir_indice_busca()
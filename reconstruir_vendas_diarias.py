@@ -0,0 +1,17 @@
+import sys
+from datetime import date
+from app import create_app
+from app.services import vendas_diarias
+
+def reconstruir_vendas_diarias(data_inicio=None, data_fim=None):
+    """Recalcula o consolidado diário de vendas e os contadores por produto a partir das vendas"""
+    app = create_app()
+    
+    with app.app_context():
+        dias = vendas_diarias.reconstruir(data_inicio, data_fim)
+        print(f"Consolidado diário reconstruído: {dias} dia(s) com vendas.")
+
+if __name__ == "__main__":
+    # Uso: python reconstruir_vendas_diarias.py [AAAA-MM-DD [AAAA-MM-DD]]
+    datas = [date.fromisoformat(valor) for valor in sys.argv[1:3]]
+    reconstruir_vendas_diarias(*datas)
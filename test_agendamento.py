@@ -6,7 +6,7 @@ from app.models.barbeiro import Barbeiro
 from app.models.servico import Servico
 from app.models.usuario import Usuario
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from flask_jwt_extended import create_access_token
 import bcrypt
 
@@ -18,8 +18,10 @@ class TestConfig:
     JWT_SECRET_KEY = 'teste-jwt-secret-key'
 
 class AgendamentoTestCase(unittest.TestCase):
+    config = TestConfig
+    
     def setUp(self):
-        self.app = create_app(TestConfig)
+        self.app = create_app(self.config)
         self.client = self.app.test_client()
         self.app_context = self.app.app_context()
         self.app_context.push()
@@ -270,6 +272,363 @@ class AgendamentoTestCase(unittest.TestCase):
         # A API atual parece estar retornando 422 Unprocessable Entity
         # para todas as requisições de cancelamento de agendamento
         self.assertEqual(response.status_code, 422)
+    
+    def test_verificar_disponibilidade_limites(self):
+        """Teste para horários adjacentes e agendamentos englobados"""
+        data_hora_inicio = datetime.now() + timedelta(days=1)
+        data_hora_inicio = data_hora_inicio.replace(hour=14, minute=0, second=0, microsecond=0)
+        
+        self.criar_agendamento_base(data_hora_inicio)
+        
+        # Horário imediatamente após o término (14:30 às 15:00) está livre
+        self.assertTrue(Agendamento.verificar_disponibilidade(
+            self.barbeiro.id,
+            data_hora_inicio + timedelta(minutes=30),
+            data_hora_inicio + timedelta(minutes=60)
+        ))
+        
+        # Horário que engloba o agendamento existente (13:00 às 16:00) está ocupado
+        self.assertFalse(Agendamento.verificar_disponibilidade(
+            self.barbeiro.id,
+            data_hora_inicio - timedelta(hours=1),
+            data_hora_inicio + timedelta(hours=2)
+        ))
+    
+    def test_verificar_disponibilidade_ignora_proprio_agendamento(self):
+        """Teste para a verificação durante a atualização do próprio agendamento"""
+        agendamento = self.criar_agendamento_base()
+        
+        self.assertTrue(Agendamento.verificar_disponibilidade(
+            self.barbeiro.id,
+            agendamento.data_hora_inicio,
+            agendamento.data_hora_fim,
+            agendamento_id=agendamento.id
+        ))
+    
+    def test_disponibilidade_lote_api(self):
+        """Teste para a consulta de horários livres de vários dias em lote"""
+        # Próximo dia útil a partir de amanhã
+        dia = datetime.now() + timedelta(days=1)
+        while dia.weekday() >= 5:
+            dia += timedelta(days=1)
+        data_agendamento = dia.replace(hour=14, minute=0, second=0, microsecond=0)
+        
+        self.criar_agendamento_base(data_agendamento)
+        
+        response = self.client.get(
+            f'/api/agendamentos/disponibilidade/lote?data={dia.strftime("%Y-%m-%d")}&dias=3'
+        )
+        dados = json.loads(response.data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(dados['barbeiros']), 1)
+        
+        dia_consultado = dados['barbeiros'][0]['dias'][0]
+        self.assertEqual(dia_consultado['data'], dia.strftime("%Y-%m-%d"))
+        self.assertNotIn(data_agendamento.isoformat(), dia_consultado['horarios'])
+        self.assertIn((data_agendamento + timedelta(minutes=30)).isoformat(), dia_consultado['horarios'])
+        self.assertEqual(dia_consultado['livres'][0], {
+            'inicio': data_agendamento.replace(hour=9).isoformat(),
+            'fim': data_agendamento.isoformat()
+        })
+    
+    def test_listar_agendamentos_por_data_sem_n_mais_1(self):
+        """Teste para a agenda do dia usar um número fixo de consultas"""
+        from app.testing import assert_max_consultas
+        
+        data_base = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+        for i in range(10):
+            self.criar_agendamento_base(data_base + timedelta(minutes=30 * i))
+        db.session.expunge_all()
+        
+        with assert_max_consultas(2):
+            response = self.client.get(f'/api/agendamentos/data/{data_base.strftime("%Y-%m-%d")}')
+        
+        dados = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(dados), 10)
+        self.assertEqual(dados[0]['cliente_nome'], "Cliente Teste")
+        self.assertEqual(dados[0]['barbeiro_nome'], "Barbeiro Teste")
+        self.assertEqual(dados[0]['servicos'][0]['nome'], "Corte de Cabelo")    
+    def test_listar_barbeiros_agendamentos_hoje(self):
+        """Teste para a contagem agrupada de agendamentos do dia na listagem de barbeiros"""
+        from app.testing import assert_max_consultas
+        
+        hoje = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        self.criar_agendamento_base(hoje)
+        cancelado = self.criar_agendamento_base(hoje + timedelta(hours=1))
+        cancelado.status = 'cancelado'
+        self.criar_agendamento_base(hoje + timedelta(days=1))
+        db.session.commit()
+        db.session.expunge_all()
+        
+        with assert_max_consultas(2):
+            response = self.client.get('/api/barbeiros/')
+        
+        dados = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(dados[0]['nome'], "Barbeiro Teste")
+        self.assertEqual(dados[0]['agendamentos_hoje'], 1)
+
+    def test_concluir_atualiza_historico_cliente(self):
+        """Teste para concluir agendamento manter último atendimento e total do cliente"""
+        agendamento = self.criar_agendamento_base()
+        
+        # Identidade como string, exigida pelas versões atuais do flask_jwt_extended
+        with self.app.test_request_context():
+            token = create_access_token(identity=str(self.admin.id), additional_claims={"perfil": "admin"})
+        
+        response = self.client.post(
+            f'/api/agendamentos/{agendamento.id}/concluir',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        cliente = Cliente.query.get(self.cliente.id)
+        self.assertEqual(cliente.total_atendimentos, 1)
+        self.assertEqual(cliente.ultimo_atendimento, agendamento.data_hora_inicio)
+        self.assertEqual(cliente.to_dict()['ultimo_atendimento'], agendamento.data_hora_inicio.isoformat())
+        
+        # O recálculo a partir dos agendamentos chega ao mesmo resultado
+        Cliente.query.filter_by(id=self.cliente.id).update({'total_atendimentos': 0, 'ultimo_atendimento': None})
+        db.session.commit()
+        Cliente.recalcular_atendimentos()
+        cliente = Cliente.query.get(self.cliente.id)
+        self.assertEqual(cliente.total_atendimentos, 1)
+        self.assertEqual(cliente.ultimo_atendimento, agendamento.data_hora_inicio)
+
+    def test_criar_serie_agendamentos(self):
+        """Teste da série recorrente com verificação de conflitos em lote"""
+        from app.testing import contar_consultas
+        
+        with self.app.test_request_context():
+            token = create_access_token(identity=str(self.admin.id), additional_claims={"perfil": "admin"})
+        
+        primeira = (datetime.now() + timedelta(days=7)).replace(hour=18, minute=0, second=0, microsecond=0)
+        ocupado = self.criar_agendamento_base(primeira + timedelta(weeks=4, minutes=15))
+        
+        payload = {
+            'cliente_id': self.cliente.id,
+            'barbeiro_id': self.barbeiro.id,
+            'data_hora_inicio': primeira.isoformat(),
+            'servicos': [{'servico_id': self.servico.id}],
+            'recorrencia': {'frequencia': 'semanal', 'intervalo': 2, 'ocorrencias': 4}
+        }
+        headers = {'Authorization': f'Bearer {token}'}
+        
+        # Por padrão, um conflito impede a série inteira
+        response = self.client.post('/api/agendamentos/serie', json=payload, headers=headers)
+        self.assertEqual(response.status_code, 409)
+        conflitos = json.loads(response.data)['ocorrencias_conflito']
+        self.assertEqual(len(conflitos), 1)
+        self.assertEqual(conflitos[0]['conflitos'], [ocupado.id])
+        self.assertEqual(Agendamento.query.count(), 1)
+        
+        payload['ignorar_conflitos'] = True
+        with contar_consultas() as contador:
+            response = self.client.post('/api/agendamentos/serie', json=payload, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.data)
+        self.assertEqual(len(data['agendamentos']), 3)
+        self.assertEqual(len(data['ocorrencias_conflito']), 1)
+        
+        # Cliente, barbeiro, serviços, conflitos, inserções em lote e leitura da série, independente das ocorrências
+        self.assertLessEqual(contador.total, 8)
+        
+        criados = Agendamento.query.filter_by(serie_id=data['serie_id']).order_by(Agendamento.data_hora_inicio).all()
+        self.assertEqual([a.data_hora_inicio for a in criados],
+                         [primeira, primeira + timedelta(weeks=2), primeira + timedelta(weeks=6)])
+        self.assertTrue(all(len(a.servicos) == 1 for a in criados))
+        
+        # Horário com fuso (em UTC) é gravado no horário local correspondente
+        outra = primeira + timedelta(days=1)
+        payload.update({
+            'data_hora_inicio': outra.astimezone(timezone.utc).isoformat(),
+            'recorrencia': {'frequencia': 'semanal', 'ocorrencias': 1}
+        })
+        response = self.client.post('/api/agendamentos/serie', json=payload, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        serie_id = json.loads(response.data)['serie_id']
+        self.assertEqual(Agendamento.query.filter_by(serie_id=serie_id).one().data_hora_inicio, outra)
+
+    def test_horario_funcionamento_configuravel(self):
+        """Teste para o expediente vir das configurações em cache e acompanhar a versão"""
+        from app.models.configuracao import Configuracao
+        from app.services import configuracoes
+        from app.testing import contar_consultas
+        
+        dia = datetime.now() + timedelta(days=1)
+        while dia.weekday() >= 5:
+            dia += timedelta(days=1)
+        url = f'/api/agendamentos/disponibilidade/lote?data={dia.strftime("%Y-%m-%d")}&dias=1'
+        
+        dados = json.loads(self.client.get(url).data)
+        self.assertEqual(dados['barbeiros'][0]['dias'][0]['livres'][0]['inicio'], dia.replace(hour=9, minute=0, second=0, microsecond=0).isoformat())
+        
+        # Leituras seguintes não vão ao banco
+        with contar_consultas() as contador:
+            self.assertEqual(configuracoes.horario_funcionamento(), (9, 18, (0, 1, 2, 3, 4)))
+        self.assertEqual(contador.total, 0)
+        
+        # Alteração no próprio processo vale na leitura seguinte
+        Configuracao.definir_valor('agenda.hora_abertura', 10)
+        Configuracao.definir_valor('agenda.dias_funcionamento', '0,1,2,3,4,5')
+        db.session.commit()
+        self.assertEqual(Configuracao.obter_valor('agenda.hora_abertura'), '10')
+        dados = json.loads(self.client.get(url).data)
+        self.assertEqual(dados['barbeiros'][0]['dias'][0]['livres'][0]['inicio'], dia.replace(hour=10, minute=0, second=0, microsecond=0).isoformat())
+        
+        # Alteração feita por outro processo: vista quando a versão é verificada novamente
+        cache = configuracoes.obter_cache_configuracoes()
+        cache.intervalo_verificacao = 3600
+        configuracoes.horario_funcionamento()
+        with db.engine.begin() as conexao:
+            conexao.execute(db.text("UPDATE configuracoes SET valor = '11' WHERE chave = 'agenda.hora_abertura'"))
+            configuracoes.incrementar_versao(conexao)
+        self.assertEqual(configuracoes.obter_tipado('agenda.hora_abertura'), 10)
+        cache.intervalo_verificacao = 0
+        self.assertEqual(configuracoes.obter_tipado('agenda.hora_abertura'), 11)
+        
+        # Valor inválido cai no padrão
+        Configuracao.definir_valor('agenda.hora_fechamento', 'dezoito')
+        db.session.commit()
+        self.assertEqual(configuracoes.obter_tipado('agenda.hora_fechamento'), 18)
+        
+        # Hora fora de 0-23 também cai no padrão, e a disponibilidade continua respondendo
+        Configuracao.definir_valor('agenda.hora_fechamento', 24)
+        db.session.commit()
+        self.assertEqual(configuracoes.horario_funcionamento()[:2], (11, 18))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        
+        # Fechamento antes da abertura: os dois horários voltam ao padrão
+        Configuracao.definir_valor('agenda.hora_fechamento', 10)
+        db.session.commit()
+        self.assertEqual(configuracoes.horario_funcionamento()[:2], (9, 18))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_agenda_resposta_condicional(self):
+        """Teste para a agenda do dia responder 304 enquanto nada mudar"""
+        from app.testing import contar_consultas
+        
+        inicio = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        agendamento = self.criar_agendamento_base(inicio)
+        self.criar_agendamento_base(inicio + timedelta(hours=1))
+        url = f'/api/agendamentos/data/{inicio.strftime("%Y-%m-%d")}'
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        
+        # Mesma versão: 304 só com a consulta de versão
+        with contar_consultas() as contador:
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(contador.total, 1)
+        
+        # Alterar o nome do cliente exibido muda a versão
+        self.cliente.nome = "Cliente Renomeado"
+        db.session.commit()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)[0]['cliente_nome'], "Cliente Renomeado")
+        etag = response.headers['ETag']
+        
+        # Exclusão muda a quantidade
+        db.session.delete(agendamento)
+        db.session.commit()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)), 1)
+        
+        # Listagem paginada e registro individual
+        response = self.client.get('/api/agendamentos/?por_pagina=1')
+        self.assertEqual(json.loads(response.data)['total'], 1)
+        response = self.client.get('/api/agendamentos/?por_pagina=1', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        
+        response = self.client.get(f'/api/clientes/{self.cliente.id}')
+        self.assertIn('Last-Modified', response.headers)
+        response = self.client.get(f'/api/clientes/{self.cliente.id}', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_agenda_versao_barbeiro_e_servicos(self):
+        """Teste para a versão da agenda mudar com o nome do barbeiro e com os serviços exibidos"""
+        inicio = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        agendamento = self.criar_agendamento_base(inicio)
+        url = f'/api/agendamentos/data/{inicio.strftime("%Y-%m-%d")}'
+        etag = self.client.get(url).headers['ETag']
+        
+        # Nome do barbeiro (usuário)
+        self.usuario_barbeiro.nome = "Barbeiro Renomeado"
+        db.session.commit()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)[0]['barbeiro_nome'], "Barbeiro Renomeado")
+        etag = response.headers['ETag']
+        
+        # Preço de um serviço do agendamento
+        self.servico.preco = 60.00
+        db.session.commit()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)[0]['servicos'][0]['preco'], 60.00)
+        etag = response.headers['ETag']
+        
+        # Troca apenas dos serviços do agendamento
+        barba = Servico(nome="Barba", preco=30.00, duracao_estimada_min=30)
+        db.session.add(barba)
+        db.session.commit()
+        with self.app.test_request_context():
+            token = create_access_token(identity=str(self.admin.id), additional_claims={"perfil": "admin"})
+        response = self.client.put(
+            f'/api/agendamentos/{agendamento.id}',
+            data=json.dumps({
+                'cliente_id': self.cliente.id,
+                'barbeiro_id': self.barbeiro.id,
+                'data_hora_inicio': inicio.isoformat(),
+                'servicos': [{'servico_id': barba.id}]
+            }),
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)[0]['servicos'][0]['nome'], "Barba")
+        
+        # Sem mudanças, a consulta de versão coincide com a versão calculada dos registros
+        response = self.client.get(url, headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+class IndiceAgendaTestConfig(TestConfig):
+    AGENDA_INDICE_MEMORIA = True
+
+
+class IndiceAgendaTestCase(AgendamentoTestCase):
+    """Repete os testes de agendamento com o índice de disponibilidade em memória"""
+    config = IndiceAgendaTestConfig
+    
+    def test_indice_sincronizado_apos_cancelamento(self):
+        """Teste para o índice refletir agendamentos registrados e cancelados"""
+        from app.services.disponibilidade import obter_indice
+        
+        indice = obter_indice()
+        data_hora_inicio = (datetime.now() + timedelta(days=1)).replace(hour=16, minute=0, second=0, microsecond=0)
+        data_hora_fim = data_hora_inicio + timedelta(minutes=30)
+        
+        # Carregar o barbeiro no índice antes de criar o agendamento
+        self.assertTrue(Agendamento.verificar_disponibilidade(self.barbeiro.id, data_hora_inicio, data_hora_fim))
+        
+        agendamento = self.criar_agendamento_base(data_hora_inicio)
+        indice.registrar(agendamento)
+        self.assertFalse(Agendamento.verificar_disponibilidade(self.barbeiro.id, data_hora_inicio, data_hora_fim))
+        
+        agendamento.status = 'cancelado'
+        db.session.commit()
+        indice.registrar(agendamento)
+        self.assertTrue(Agendamento.verificar_disponibilidade(self.barbeiro.id, data_hora_inicio, data_hora_fim))
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,161 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models.agendamento import Agendamento
+from app.models.barbeiro import Barbeiro
+from app.models.cliente import Cliente
+from app.models.usuario import Usuario
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    AUTORIZACAO_INTERVALO_VERIFICACAO = 60
+
+class TestAutorizacao(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.usuario_barbeiro = Usuario(nome='Barbeiro Teste', email='barbeiro@teste.com', perfil='barbeiro', ativo=True)
+        self.usuario_barbeiro.senha = 'senha123'
+        self.usuario_cliente = Usuario(nome='Cliente Teste', email='cliente@teste.com', perfil='cliente', ativo=True)
+        self.usuario_cliente.senha = 'senha123'
+        db.session.add_all([self.usuario_barbeiro, self.usuario_cliente])
+        db.session.commit()
+
+        self.barbeiro = Barbeiro(usuario_id=self.usuario_barbeiro.id, especialidades='Corte', disponivel=True)
+        self.cliente = Cliente(nome='Cliente Teste', email='cliente@teste.com', telefone='11999999999')
+        self.outro_cliente = Cliente(nome='Outro Cliente', email='outro@teste.com', telefone='11888888888')
+        db.session.add_all([self.barbeiro, self.cliente, self.outro_cliente])
+        db.session.commit()
+
+        inicio = datetime.now() + timedelta(days=2)
+        self.agendamentos = []
+        for i in range(3):
+            agendamento = Agendamento(
+                cliente_id=self.cliente.id, barbeiro_id=self.barbeiro.id,
+                data_hora_inicio=inicio + timedelta(hours=i), data_hora_fim=inicio + timedelta(hours=i, minutes=30),
+                status='confirmado'
+            )
+            db.session.add(agendamento)
+            self.agendamentos.append(agendamento)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, senha='senha123'):
+        response = self.client.post('/api/auth/login', json={'email': email, 'senha': senha})
+        self.assertEqual(response.status_code, 200)
+        dados = json.loads(response.data)
+        return dados, {'Authorization': f"Bearer {dados['access_token']}"}
+
+    def consultas_de_autorizacao(self, funcao):
+        """Executa funcao e devolve as buscas de barbeiro/cliente do usuário e de versões dos tokens"""
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            resultado = funcao()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        padroes = ('barbeiros.usuario_id = ?', 'clientes.email = ?', 'usuarios_versao')
+        return resultado, [sql for sql in consultas if any(padrao in sql for padrao in padroes)]
+
+    def test_claims_do_login(self):
+        """Testa se o login grava barbeiro_id, cliente_id e a versão no token"""
+        dados, _ = self.login('barbeiro@teste.com')
+        claims = decode_token(dados['access_token'])
+        self.assertEqual(claims['sub'], str(self.usuario_barbeiro.id))
+        self.assertEqual(claims['barbeiro_id'], self.barbeiro.id)
+        self.assertIsNone(claims['cliente_id'])
+        self.assertEqual(claims['versao'], self.usuario_barbeiro.versao_token)
+
+        dados, _ = self.login('cliente@teste.com')
+        claims = decode_token(dados['access_token'])
+        self.assertEqual(claims['cliente_id'], self.cliente.id)
+        self.assertIsNone(claims['barbeiro_id'])
+
+    def test_autorizacao_sem_consultas(self):
+        """Testa se cancelar e a agenda do cliente autorizam sem buscar barbeiro, cliente ou versões"""
+        _, headers = self.login('barbeiro@teste.com')
+        # Aquecimento: carrega as versões dos tokens na memória
+        self.client.post(f'/api/agendamentos/{self.agendamentos[0].id}/concluir', headers=headers)
+
+        response, consultas = self.consultas_de_autorizacao(
+            lambda: self.client.post(f'/api/agendamentos/{self.agendamentos[1].id}/cancelar', headers=headers, json={}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas, [])
+
+        _, headers_cliente = self.login('cliente@teste.com')
+        response, consultas = self.consultas_de_autorizacao(
+            lambda: self.client.get(f'/api/agendamentos/cliente/{self.cliente.id}', headers=headers_cliente))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas, [])
+
+    def test_acesso_negado_por_claims(self):
+        """Testa se o cliente não acessa nem agenda para outro cliente"""
+        _, headers = self.login('cliente@teste.com')
+        response = self.client.get(f'/api/agendamentos/cliente/{self.outro_cliente.id}', headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post('/api/agendamentos/', headers=headers, json={
+            'cliente_id': self.outro_cliente.id,
+            'barbeiro_id': self.barbeiro.id,
+            'data_hora_inicio': (datetime.now() + timedelta(days=5)).isoformat(),
+            'servicos': [{'servico_id': 1}]
+        })
+        self.assertEqual(response.status_code, 403)
+
+    def test_revogacao_ao_desativar(self):
+        """Testa se desativar o usuário invalida o token já emitido"""
+        _, headers = self.login('barbeiro@teste.com')
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 200)
+
+        self.usuario_barbeiro.ativo = False
+        db.session.commit()
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 401)
+
+    def test_revogacao_ao_trocar_vinculo(self):
+        """Testa se mudar o vínculo barbeiro/usuário ou a senha invalida o token"""
+        _, headers = self.login('barbeiro@teste.com')
+        self.barbeiro.usuario_id = self.usuario_cliente.id
+        db.session.commit()
+        response = self.client.post(f'/api/agendamentos/{self.agendamentos[0].id}/concluir', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+        _, headers = self.login('cliente@teste.com')
+        response = self.client.post('/api/auth/alterar-senha', headers=headers,
+                                    json={'senha_atual': 'senha123', 'nova_senha': 'senha456'})
+        self.assertEqual(response.status_code, 200)
+        novos = json.loads(response.data)
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 401)
+        headers = {'Authorization': f"Bearer {novos['access_token']}"}
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 200)
+
+    def test_token_sem_claims(self):
+        """Testa se tokens emitidos antes das claims continuam funcionando"""
+        with self.app.test_request_context():
+            token = create_access_token(identity=str(self.usuario_barbeiro.id), additional_claims={'perfil': 'barbeiro'})
+        headers = {'Authorization': f'Bearer {token}'}
+        response = self.client.get(f'/api/agendamentos/barbeiro/{self.barbeiro.id}', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(f'/api/agendamentos/{self.agendamentos[0].id}/concluir', headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
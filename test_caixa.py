@@ -0,0 +1,91 @@
+import unittest
+import json
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.usuario import Usuario
+from app.models.caixa_diario import CaixaDiario
+from app.models.pagamento import Pagamento
+from app.testing import contar_consultas
+from flask_jwt_extended import create_access_token
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+
+class TestCaixa(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        
+        self.admin = Usuario(nome='Admin Teste', email='admin@teste.com', perfil='admin', ativo=True)
+        self.admin.senha = 'senha123'
+        db.session.add(self.admin)
+        db.session.commit()
+        
+        with self.app.test_request_context():
+            token = create_access_token(identity=str(self.admin.id), additional_claims={'perfil': 'admin'})
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def movimento(self, tipo, valor):
+        return self.client.post('/api/caixa/movimento', headers=self.headers, json={
+            'tipo': tipo, 'valor': valor, 'forma_pagamento': 'dinheiro', 'descricao': f'{tipo} teste'
+        })
+
+    def test_totais_correntes(self):
+        """Testa se entradas, saídas e saldo acompanham os movimentos e batem com o recálculo"""
+        response = self.client.post('/api/caixa/abrir', headers=self.headers, json={'valor_inicial': 100.0})
+        self.assertEqual(response.status_code, 201)
+        
+        self.movimento('entrada', 50.0)
+        self.movimento('entrada', 25.0)
+        response = self.movimento('saida', 30.0)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.data)['saldo_atual'], 145.0)
+        
+        data = json.loads(self.client.get('/api/caixa/atual', headers=self.headers).data)
+        self.assertEqual((data['total_entradas'], data['total_saidas'], data['saldo']), (75.0, 30.0, 145.0))
+        self.assertEqual(len(data['pagamentos']), 3)
+        
+        # O recálculo a partir dos pagamentos chega aos mesmos totais
+        CaixaDiario.query.update({CaixaDiario.entradas: 0, CaixaDiario.saidas: 0})
+        db.session.commit()
+        CaixaDiario.recalcular_totais()
+        caixa = CaixaDiario.query.one()
+        self.assertEqual((caixa.entradas, caixa.saidas, caixa.saldo), (75.0, 30.0, 145.0))
+        
+        data = json.loads(self.client.post('/api/caixa/fechar', headers=self.headers, json={}).data)
+        self.assertEqual(data['caixa']['valor_final'], 145.0)
+
+    def test_saldo_em_sql(self):
+        """Testa o saldo como expressão SQL e o histórico sem carregar pagamentos por caixa"""
+        agora = datetime.now()
+        for i, (entradas, saidas) in enumerate([(10.0, 0.0), (200.0, 50.0), (80.0, 90.0)]):
+            db.session.add(CaixaDiario(
+                data_abertura=agora - timedelta(days=i), valor_inicial=20.0, status='fechado',
+                usuario_abertura_id=self.admin.id, entradas=entradas, saidas=saidas
+            ))
+        db.session.commit()
+        
+        saldos = [saldo for (saldo,) in db.session.query(CaixaDiario.saldo).order_by(CaixaDiario.saldo)]
+        self.assertEqual(saldos, [10.0, 30.0, 170.0])
+        self.assertEqual(CaixaDiario.query.filter(CaixaDiario.saldo > 20.0).count(), 2)
+        
+        with contar_consultas() as consultas:
+            response = self.client.get('/api/caixa/historico', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['saldo'] for c in json.loads(response.data)['items']], [30.0, 170.0, 10.0])
+        self.assertFalse(any('FROM pagamentos' in sql for sql in consultas.instrucoes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from app import create_app, db
 from app.models.cliente import Cliente
 from app.models.usuario import Usuario
 import json
+import time
 from flask_jwt_extended import create_access_token
 import bcrypt
 
@@ -174,5 +175,125 @@ class ClienteTestCase(unittest.TestCase):
         dados = json.loads(response.data)
         self.assertIn("Cliente não encontrado", dados["erro"])
 
+    def test_listar_clientes_sem_consultas_por_linha(self):
+        """Teste para a listagem de clientes não consultar agendamentos de cada cliente"""
+        from app.testing import assert_max_consultas
+        
+        for i in range(100):
+            db.session.add(Cliente(nome=f"Cliente {i:03d}", telefone=f"11{900000000 + i}"))
+        db.session.commit()
+        db.session.expire_all()
+        
+        # COUNT da paginação e SELECT da página
+        with assert_max_consultas(2):
+            response = self.client.get('/api/clientes/?por_pagina=100')
+        self.assertEqual(len(json.loads(response.data)['items']), 100)
+    
+    def test_estatisticas_clientes(self):
+        """Teste das estatísticas de clientes ativos, frequentes e inativos"""
+        from datetime import datetime, timedelta
+        from app.models.agendamento import Agendamento
+        from app.models.barbeiro import Barbeiro
+        from app.services import agregacoes
+        
+        barbeiro = Barbeiro(usuario_id=self.admin.id, disponivel=True)
+        antigo = datetime.now() - timedelta(days=200)
+        ativo = Cliente(nome="Ativo", telefone="11900000001")
+        frequente = Cliente(nome="Frequente", telefone="11900000002")
+        inativo = Cliente(nome="Inativo", telefone="11900000003", created_at=antigo)
+        nunca_veio = Cliente(nome="Nunca Veio", telefone="11900000004", created_at=antigo)
+        db.session.add_all([barbeiro, ativo, frequente, inativo, nunca_veio])
+        db.session.commit()
+        
+        agora = datetime.now()
+        for cliente, dias in [(ativo, 5), (frequente, 40), (frequente, 50), (frequente, 60), (inativo, 120)]:
+            inicio = agora - timedelta(days=dias)
+            db.session.add(Agendamento(cliente_id=cliente.id, barbeiro_id=barbeiro.id, data_hora_inicio=inicio,
+                                       data_hora_fim=inicio + timedelta(minutes=30), status='concluido'))
+        db.session.commit()
+        
+        response = self.client.get('/api/clientes/estatisticas')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), {
+            'total': 4, 'novos_mes': 2, 'ativos': 1, 'frequentes': 1, 'inativos': 2
+        })
+        
+        # Total e novos no mês acompanham os cadastros; a atividade é reaproveitada do cache até a invalidação
+        novo = Cliente(nome="Novo", telefone="11900000005")
+        db.session.add(novo)
+        db.session.commit()
+        inicio = agora - timedelta(days=1)
+        db.session.add(Agendamento(cliente_id=novo.id, barbeiro_id=barbeiro.id, data_hora_inicio=inicio,
+                                   data_hora_fim=inicio + timedelta(minutes=30), status='concluido'))
+        db.session.commit()
+        estatisticas = json.loads(self.client.get('/api/clientes/estatisticas').data)
+        self.assertEqual((estatisticas['total'], estatisticas['novos_mes'], estatisticas['ativos']), (5, 3, 1))
+        agregacoes.invalidar_estatisticas_clientes()
+        self.assertEqual(json.loads(self.client.get('/api/clientes/estatisticas').data)['ativos'], 2)
+        
+        # Nos demais workers (sem a invalidação), o valor expira após ESTATISTICAS_CLIENTES_TTL
+        self.app.config['ESTATISTICAS_CLIENTES_TTL'] = 0.05
+        agregacoes.invalidar_estatisticas_clientes()
+        self.client.get('/api/clientes/estatisticas')
+        db.session.add(Agendamento(cliente_id=nunca_veio.id, barbeiro_id=barbeiro.id, data_hora_inicio=inicio,
+                                   data_hora_fim=inicio + timedelta(minutes=30), status='concluido'))
+        db.session.commit()
+        time.sleep(0.1)
+        self.assertEqual(json.loads(self.client.get('/api/clientes/estatisticas').data)['ativos'], 3)
+    
+    def test_buscar_clientes_indice(self):
+        """Teste da busca indexada: acentos, telefone só com dígitos e sincronização por eventos"""
+        joao = Cliente(nome="João Conceição", telefone="(11) 98765-4321", email="joao@teste.com")
+        maria = Cliente(nome="Maria Joana", telefone="(21) 91234-0000", email="maria@teste.com")
+        db.session.add_all([joao, maria])
+        db.session.commit()
+        
+        def buscar(termo):
+            response = self.client.get('/api/clientes/busca', query_string={'termo': termo})
+            self.assertEqual(response.status_code, 200)
+            return [cliente['nome'] for cliente in json.loads(response.data)]
+        
+        self.assertEqual(buscar('joao conc'), ["João Conceição"])
+        self.assertEqual(buscar('CONCEICAO'), ["João Conceição"])
+        self.assertEqual(buscar('98765'), ["João Conceição"])
+        self.assertEqual(buscar('1198765'), ["João Conceição"])
+        self.assertEqual(sorted(buscar('jo')), ["João Conceição", "Maria Joana"])
+        
+        # Telefone no formato gravado, sem DDD, separado por espaços ou só os últimos dígitos
+        for telefone in ("(11) 98765-4321", "98765-4321", "11 98765 4321", "4321", "87654321"):
+            self.assertEqual(buscar(telefone), ["João Conceição"], telefone)
+        self.assertEqual(buscar('joao 4321'), ["João Conceição"])
+        
+        # Listagem com filtro usa o mesmo índice
+        response = self.client.get('/api/clientes/', query_string={'busca': 'mar'})
+        self.assertEqual([c['nome'] for c in json.loads(response.data)['items']], ["Maria Joana"])
+        response = self.client.get('/api/clientes/', query_string={'busca': '(11) 98765-4321'})
+        self.assertEqual([c['nome'] for c in json.loads(response.data)['items']], ["João Conceição"])
+        
+        # Alterações e exclusões refletem no índice
+        maria.nome = "Mariana Souza"
+        db.session.commit()
+        self.assertEqual(buscar('joana'), [])
+        self.assertEqual(buscar('souza'), ["Mariana Souza"])
+        
+        db.session.delete(joao)
+        db.session.commit()
+        self.assertEqual(buscar('conceicao'), [])
+    
+    def test_buscar_clientes_relevancia_entre_todos(self):
+        """Teste da ordenação por relevância considerando todos os registros que casam, não só os primeiros"""
+        db.session.add_all([
+            Cliente(nome=f"Joana Alves de Souza Pereira Lima Costa Ribeiro {i}", telefone=f"(31) 90000-{i:04d}",
+                    email=f"joana.alves.souza.{i}@teste.com")
+            for i in range(250)
+        ])
+        db.session.commit()
+        # Documento mais curto (mais relevante), com o maior rowid
+        db.session.add(Cliente(nome="Jo", telefone="(31) 99999-9999"))
+        db.session.commit()
+        
+        response = self.client.get('/api/clientes/busca', query_string={'termo': 'jo', 'limite': 1})
+        self.assertEqual([cliente['nome'] for cliente in json.loads(response.data)], ["Jo"])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
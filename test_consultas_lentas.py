@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models.usuario import Usuario
+from app.models.venda import Venda
+from app.services.consultas_lentas import normalizar_sql, obter_registro
+from flask_jwt_extended import create_access_token
+
+DIRETORIO_LOG = tempfile.mkdtemp()
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    # Limite zero: toda instrução conta como lenta
+    CONSULTAS_LENTAS_LIMITE_MS = 0
+    CONSULTAS_LENTAS_ARQUIVO = os.path.join(DIRETORIO_LOG, 'consultas_lentas.log')
+
+class TestConsultasLentas(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.admin = Usuario(nome='Admin Teste', email='admin@teste.com', perfil='admin', ativo=True)
+        self.admin.senha = 'senha123'
+        self.barbeiro = Usuario(nome='Barbeiro Teste', email='barbeiro@teste.com', perfil='barbeiro', ativo=True)
+        self.barbeiro.senha = 'senha123'
+        db.session.add_all([self.admin, self.barbeiro])
+        db.session.commit()
+
+        with self.app.test_request_context():
+            self.headers = {'Authorization': 'Bearer ' + create_access_token(
+                identity=str(self.admin.id), additional_claims={'perfil': 'admin'})}
+            self.headers_barbeiro = {'Authorization': 'Bearer ' + create_access_token(
+                identity=str(self.barbeiro.id), additional_claims={'perfil': 'barbeiro'})}
+        obter_registro().limpar()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(DIRETORIO_LOG, ignore_errors=True)
+
+    def consultar_vendas(self, dias):
+        return Venda.query.filter(Venda.data_hora >= datetime.utcnow() - timedelta(days=dias)).all()
+
+    def test_normalizar_sql(self):
+        """Testa se literais, parâmetros e listas de IN são normalizados"""
+        self.assertEqual(
+            normalizar_sql("SELECT * FROM vendas\n WHERE id IN (?, ?, ?) AND status = 'aberta' LIMIT 10"),
+            "SELECT * FROM vendas WHERE id IN (?+) AND status = ? LIMIT ?"
+        )
+        self.assertEqual(normalizar_sql("SELECT 1 FROM t WHERE a = %(a_1)s"), "SELECT ? FROM t WHERE a = ?")
+
+    def test_agrupamento_e_plano(self):
+        """Testa se consultas iguais com parâmetros diferentes formam um grupo com EXPLAIN"""
+        self.consultar_vendas(7)
+        self.consultar_vendas(30)
+
+        grupos = [g for g in obter_registro().listar(limite=100) if 'FROM vendas' in g['sql']
+                  and 'vendas.data_hora >= ?' in g['sql']]
+        self.assertEqual(len(grupos), 1)
+        grupo = grupos[0]
+        self.assertEqual(grupo['ocorrencias'], 2)
+        self.assertEqual(grupo['parametros'], ['str'])
+        # O filtro por data usa o índice (data_hora, id) em vez de varrer a tabela
+        self.assertTrue(any('USING INDEX ix_vendas_data_hora_id' in linha for linha in grupo['plano']), grupo['plano'])
+
+    def test_instrucao_com_erro(self):
+        """Testa se uma instrução que falha não deixa o início pendurado na conexão"""
+        conexao = db.session.connection()
+        with self.assertRaises(OperationalError):
+            conexao.execute(text('SELECT * FROM tabela_inexistente'))
+        self.assertEqual(conexao.info['consultas_lentas_inicio'], [])
+        db.session.rollback()
+
+    def test_arquivo_rotativo(self):
+        """Testa se cada ocorrência vira uma linha JSON no arquivo"""
+        self.consultar_vendas(7)
+        with open(TestConfig.CONSULTAS_LENTAS_ARQUIVO, encoding='utf-8') as arquivo:
+            linhas = [json.loads(linha) for linha in arquivo]
+        self.assertTrue(any('FROM vendas' in linha['sql'] and linha['plano'] for linha in linhas))
+        self.assertIn('duracao_ms', linhas[-1])
+
+    def test_endpoint_admin(self):
+        """Testa a listagem ordenada, a restrição a admin e a limpeza"""
+        self.client.get('/api/barbeiros/')
+
+        response = self.client.get('/api/_consultas_lentas?ordenar=ocorrencias&limite=5', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        consultas = json.loads(response.data)['consultas']
+        self.assertLessEqual(len(consultas), 5)
+        ocorrencias = [consulta['ocorrencias'] for consulta in consultas]
+        self.assertEqual(ocorrencias, sorted(ocorrencias, reverse=True))
+        self.assertTrue(any('barbeiros.listar_barbeiros' in consulta['endpoints'] for consulta in consultas))
+
+        self.assertEqual(self.client.get('/api/_consultas_lentas', headers=self.headers_barbeiro).status_code, 403)
+        self.assertEqual(self.client.get('/api/_consultas_lentas?ordenar=x', headers=self.headers).status_code, 400)
+
+        self.assertEqual(self.client.delete('/api/_consultas_lentas', headers=self.headers).status_code, 200)
+        self.assertEqual(obter_registro().listar(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models.agendamento import Agendamento, AgendamentoServico
+from app.models.atendimento import Atendimento
+from app.models.barbeiro import Barbeiro
+from app.models.caixa_diario import CaixaDiario
+from app.models.cliente import Cliente
+from app.models.produto import Produto
+from app.models.servico import Servico
+from app.models.usuario import Usuario
+from app.models.venda_diaria import VendaDiaria
+from app.services.cache import obter_cache
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    DASHBOARD_TTL = 60
+
+class TestDashboard(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.admin = Usuario(nome='Admin Teste', email='admin@teste.com', perfil='admin', ativo=True)
+        self.admin.senha = 'senha123'
+        usuario_barbeiro = Usuario(nome='Barbeiro Teste', email='barbeiro@teste.com', perfil='barbeiro', ativo=True)
+        usuario_barbeiro.senha = 'senha123'
+        db.session.add_all([self.admin, usuario_barbeiro])
+        db.session.commit()
+
+        self.barbeiro = Barbeiro(usuario_id=usuario_barbeiro.id, especialidades='Corte', disponivel=True)
+        self.cliente = Cliente(nome='Cliente Teste', email='cliente@teste.com', telefone='11999999999')
+        self.corte = Servico(nome='Corte', preco=40.0, duracao_estimada_min=30)
+        self.barba = Servico(nome='Barba', preco=25.0, duracao_estimada_min=20)
+        db.session.add_all([self.barbeiro, self.cliente, self.corte, self.barba])
+        db.session.commit()
+
+        self.hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.agendamentos = []
+        for hora, status in ((11, 'confirmado'), (9, 'concluido'), (15, 'cancelado')):
+            inicio = self.hoje + timedelta(hours=hora)
+            agendamento = Agendamento(cliente_id=self.cliente.id, barbeiro_id=self.barbeiro.id, status=status,
+                                      data_hora_inicio=inicio, data_hora_fim=inicio + timedelta(minutes=50))
+            agendamento.servicos = [AgendamentoServico(servico_id=self.corte.id),
+                                    AgendamentoServico(servico_id=self.barba.id)]
+            db.session.add(agendamento)
+            self.agendamentos.append(agendamento)
+        db.session.commit()
+
+        db.session.add_all([
+            Atendimento(agendamento_id=self.agendamentos[1].id, cliente_id=self.cliente.id,
+                        barbeiro_id=self.barbeiro.id, valor_total=65.0,
+                        data_hora=self.hoje + timedelta(hours=10), status='pago'),
+            VendaDiaria(data=self.hoje.date(), quantidade=2, valor_total=30.0),
+            VendaDiaria(data=(self.hoje - timedelta(days=2)).date(), quantidade=1, valor_total=12.5),
+            CaixaDiario(data_abertura=self.hoje, valor_inicial=100.0, entradas=20.0, saidas=5.0,
+                        usuario_abertura_id=self.admin.id, status='aberto'),
+            Produto(nome='Pomada', preco=30.0, quantidade_estoque=2, estoque_minimo=5),
+            Produto(nome='Shampoo', preco=20.0, quantidade_estoque=10, estoque_minimo=5)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def contar_consultas(self, funcao):
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            resultado = funcao()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        return resultado, consultas
+
+    def test_contadores(self):
+        """Testa os contadores do dia em uma única resposta"""
+        response = self.client.get('/api/dashboard/counters')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=60', response.headers['Cache-Control'])
+        dados = json.loads(response.data)
+
+        self.assertEqual(dados['agendamentos_hoje'], 2)
+        self.assertEqual(dados['agendamentos_por_status']['cancelado'], 1)
+        self.assertEqual(dados['agendamentos_por_status']['concluido'], 1)
+        self.assertEqual(dados['agendamentos_por_status']['pendente'], 0)
+        self.assertEqual(dados['faturamento_hoje'], 95.0)
+        self.assertEqual(dados['faturamento_vendas'], 30.0)
+        self.assertEqual(dados['faturamento_servicos'], 65.0)
+        self.assertTrue(dados['caixa_aberto'])
+        self.assertEqual(dados['caixa_saldo'], 115.0)
+        self.assertEqual(dados['produtos_estoque_baixo'], 1)
+        self.assertEqual(dados['clientes_novos_hoje'], 1)
+
+    def test_contadores_em_cache(self):
+        """Testa se as requisições seguintes não consultam o banco até o cache expirar"""
+        self.client.get('/api/dashboard/counters')
+        response, consultas = self.contar_consultas(lambda: self.client.get('/api/dashboard/counters'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas, [])
+
+        db.session.add(Produto(nome='Cera', preco=25.0, quantidade_estoque=0, estoque_minimo=5))
+        db.session.commit()
+        self.assertEqual(json.loads(self.client.get('/api/dashboard/counters').data)['produtos_estoque_baixo'], 1)
+
+        obter_cache().invalidar('dashboard')
+        self.assertEqual(json.loads(self.client.get('/api/dashboard/counters').data)['produtos_estoque_baixo'], 2)
+
+    def test_faturamento(self):
+        """Testa a série diária com todos os dias do período"""
+        response = self.client.get('/api/dashboard/faturamento?periodo=7')
+        self.assertEqual(response.status_code, 200)
+        serie = json.loads(response.data)['faturamento']
+        self.assertEqual(len(serie), 7)
+        self.assertEqual(serie[-1], {'data': self.hoje.date().isoformat(), 'valor': 95.0, 'vendas': 30.0,
+                                     'servicos': 65.0, 'agendamentos': 2})
+        self.assertEqual(serie[-3]['valor'], 12.5)
+        self.assertEqual(sum(dia['valor'] for dia in serie), 107.5)
+
+        self.assertEqual(self.client.get('/api/dashboard/faturamento?periodo=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/dashboard/faturamento?periodo=0').status_code, 400)
+
+    def test_agendamentos_do_dia(self):
+        """Testa a agenda compacta do dia com nomes, serviços e valor"""
+        data = self.hoje.date().isoformat()
+        response, consultas = self.contar_consultas(lambda: self.client.get(f'/api/agendamentos/dia/{data}'))
+        self.assertEqual(response.status_code, 200)
+        # Agendamentos com nomes, serviços dos agendamentos e o catálogo de serviços
+        self.assertLessEqual(len(consultas), 3)
+
+        dados = json.loads(response.data)
+        self.assertEqual(dados['total'], 3)
+        primeiro = dados['agendamentos'][0]
+        self.assertEqual(primeiro['horario'], '09:00:00')
+        self.assertEqual(primeiro['data'], data)
+        self.assertEqual(primeiro['cliente_nome'], 'Cliente Teste')
+        self.assertEqual(primeiro['barbeiro_nome'], 'Barbeiro Teste')
+        self.assertEqual(primeiro['servico_nome'], 'Corte, Barba')
+        self.assertEqual(primeiro['valor'], 65.0)
+
+        self.assertEqual(self.client.get('/api/agendamentos/dia/18-10-2026').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
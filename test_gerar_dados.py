@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+from sqlalchemy import text
+from app import create_app, db
+from app.models.agendamento import Agendamento
+from app.models.cliente import Cliente
+from app.models.venda import Venda
+from gerar_dados import gerar_base
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+
+VOLUMES = {'clientes': 50, 'barbeiros': 3, 'produtos': 10, 'agendamentos': 300, 'vendas': 120}
+REFERENCIA = date(2026, 3, 10)
+
+class TestGerarDados(unittest.TestCase):
+    def gerar(self):
+        """Gera a base em um app novo e retorna totais e uma amostra dos registros"""
+        app = create_app(TestConfig)
+        with app.app_context():
+            totais = gerar_base(VOLUMES, semente=7, referencia=REFERENCIA, saida=lambda linha: None)
+            amostra = {
+                'agendamentos': db.session.query(
+                    Agendamento.cliente_id, Agendamento.barbeiro_id, Agendamento.data_hora_inicio,
+                    Agendamento.status).order_by(Agendamento.id).all(),
+                'vendas': db.session.query(Venda.cliente_id, Venda.data_hora, Venda.valor_total,
+                                           Venda.status).order_by(Venda.id).all(),
+                'clientes': db.session.query(Cliente.nome, Cliente.telefone,
+                                             Cliente.total_atendimentos).order_by(Cliente.id).all(),
+            }
+            chaves_invalidas = db.session.execute(text('PRAGMA foreign_key_check')).all()
+            db.session.remove()
+            db.drop_all()
+        return totais, amostra, chaves_invalidas
+
+    def test_volumes_e_integridade(self):
+        """Testa volumes pedidos, chaves estrangeiras e agenda sem sobreposição"""
+        totais, amostra, chaves_invalidas = self.gerar()
+        for tabela in ('clientes', 'barbeiros', 'produtos', 'agendamentos', 'vendas'):
+            self.assertEqual(totais[tabela], VOLUMES[tabela])
+        self.assertEqual(totais['pagamentos'], VOLUMES['vendas'])
+        self.assertGreaterEqual(totais['agendamento_servicos'], VOLUMES['agendamentos'])
+        self.assertEqual(chaves_invalidas, [])
+
+        # Histórico dos clientes recalculado a partir dos agendamentos concluídos
+        concluidos = sum(1 for agendamento in amostra['agendamentos'] if agendamento.status == 'concluido')
+        self.assertEqual(sum(cliente.total_atendimentos for cliente in amostra['clientes']), concluidos)
+
+    def test_deterministico(self):
+        """Testa se a mesma semente e referência geram os mesmos registros"""
+        self.assertEqual(self.gerar()[1], self.gerar()[1])
+
+if __name__ == '__main__':
+    unittest.main()
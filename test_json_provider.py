@@ -0,0 +1,66 @@
+import unittest
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from app import create_app, db
+from app.json_provider import ProvedorJSON, orjson
+from app.models.servico import Servico
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+
+class TestProvedorJSON(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_datas_iso_8601(self):
+        """Testa datas em ISO 8601 nas respostas da API"""
+        self.assertIsInstance(self.app.json, ProvedorJSON)
+        criado_em = datetime(2026, 3, 14, 15, 9, 26, 535897)
+        db.session.add(Servico(nome='Corte', preco=40.0, duracao_estimada_min=30, created_at=criado_em))
+        db.session.commit()
+        
+        servico = json.loads(self.client.get('/api/servicos/').data)[0]
+        self.assertEqual(servico['created_at'], '2026-03-14T15:09:26.535897')
+        self.assertEqual(datetime.fromisoformat(servico['created_at']), criado_em)
+
+    def test_mesma_saida_com_e_sem_orjson(self):
+        """Testa se o orjson e a biblioteca padrão produzem o mesmo JSON"""
+        dados = {
+            'data_hora': datetime(2026, 1, 2, 3, 4, 5),
+            'dia': date(2026, 1, 2),
+            'valor': Decimal('10.50'),
+            'nome': 'Ação',
+            'itens': [{'b': 1, 'a': None}],
+            'por_id': {7: 'sete', 2: 'dois'}
+        }
+        padrao = ProvedorJSON(self.app)
+        padrao.usar_orjson = False
+        resposta_padrao = padrao.response(dados).get_data()
+        self.assertEqual(json.loads(resposta_padrao), {
+            'data_hora': '2026-01-02T03:04:05', 'dia': '2026-01-02', 'valor': '10.50',
+            'nome': 'Ação', 'itens': [{'a': None, 'b': 1}], 'por_id': {'2': 'dois', '7': 'sete'}
+        })
+        
+        if orjson is None:
+            self.skipTest('orjson não instalado')
+        rapido = ProvedorJSON(self.app)
+        self.assertTrue(rapido.usar_orjson)
+        self.assertEqual(rapido.response(dados).get_data(), resposta_padrao)
+        self.assertEqual(rapido.loads(rapido.dumps(dados)), padrao.loads(padrao.dumps(dados)))
+
+if __name__ == '__main__':
+    unittest.main()
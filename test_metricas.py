@@ -0,0 +1,88 @@
+import re
+import unittest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models.servico import Servico
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    METRICAS_SERVER_TIMING = True
+
+class TestMetricas(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(Servico(nome='Corte', preco=40.0, duracao_estimada_min=30))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def amostra(self, texto, nome, **labels):
+        """Valor de uma amostra da exposição, pelo nome e por um subconjunto das labels"""
+        for linha in texto.splitlines():
+            if not linha.startswith(nome + '{'):
+                continue
+            encontradas = dict(re.findall(r'(\w+)="([^"]*)"', linha))
+            if all(encontradas.get(chave) == str(valor) for chave, valor in labels.items()):
+                return float(linha.rsplit(' ', 1)[1])
+        return None
+
+    def test_metricas_por_endpoint(self):
+        """Testa requisições, histograma, SQL e bytes por endpoint no formato do Prometheus"""
+        for _ in range(3):
+            response = self.client.get('/api/servicos/1')
+            self.assertEqual(response.status_code, 200)
+        self.client.get('/api/servicos/999')
+        self.client.get('/api/barbeiros/')
+
+        response = self.client.get('/api/_metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        texto = response.get_data(as_text=True)
+
+        endpoint = {'endpoint': 'servicos.obter_servico', 'metodo': 'GET'}
+        self.assertEqual(self.amostra(texto, 'bmanager_requisicoes_total', status=200, **endpoint), 3)
+        self.assertEqual(self.amostra(texto, 'bmanager_requisicoes_total', status=404, **endpoint), 1)
+        self.assertEqual(self.amostra(texto, 'bmanager_requisicao_duracao_segundos_bucket', le='+Inf', **endpoint), 4)
+        self.assertEqual(self.amostra(texto, 'bmanager_requisicao_duracao_segundos_count', **endpoint), 4)
+        self.assertGreater(self.amostra(texto, 'bmanager_resposta_bytes_total', **endpoint), 0)
+
+        barbeiros = {'endpoint': 'barbeiros.listar_barbeiros', 'metodo': 'GET'}
+        self.assertGreaterEqual(self.amostra(texto, 'bmanager_sql_consultas_total', **barbeiros), 1)
+        self.assertGreater(self.amostra(texto, 'bmanager_sql_duracao_segundos_total', **barbeiros), 0)
+
+    def test_server_timing(self):
+        """Testa o cabeçalho Server-Timing com tempo total e de SQL"""
+        response = self.client.get('/api/servicos/1')
+        self.assertRegex(response.headers['Server-Timing'],
+                         r'^app;dur=[\d.]+, sql;dur=[\d.]+;desc="\d+ consultas"$')
+
+    def test_instrucao_com_erro(self):
+        """Testa se uma instrução que falha não deixa o início pendurado na conexão"""
+        conexao = db.session.connection()
+        with self.assertRaises(OperationalError):
+            conexao.execute(text('SELECT * FROM tabela_inexistente'))
+        self.assertEqual(conexao.info['metricas_inicio'], [])
+        db.session.rollback()
+
+    def test_token_metricas(self):
+        """Testa se METRICAS_TOKEN protege o endpoint de métricas"""
+        self.app.config['METRICAS_TOKEN'] = 'segredo'
+        self.assertEqual(self.client.get('/api/_metrics').status_code, 401)
+        response = self.client.get('/api/_metrics', headers={'Authorization': 'Bearer segredo'})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app, db
+from app.services.perfil_sqlite import ler_pragmas
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+
+class TestPerfilSqlite(unittest.TestCase):
+    def setUp(self):
+        # WAL só existe em banco de arquivo; em :memory: o journal_mode fica "memory"
+        self.diretorio = tempfile.mkdtemp()
+        self.uri = 'sqlite:///' + os.path.join(self.diretorio, 'perfil.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def criar_app(self, **config):
+        configuracao = type('Config', (TestConfig,), dict(SQLALCHEMY_DATABASE_URI=self.uri, **config))
+        app = create_app(configuracao)
+        self.addCleanup(self.descartar_engine, app)
+        return app
+
+    def descartar_engine(self, app):
+        with app.app_context():
+            db.engine.dispose()
+
+    def pragmas(self, app):
+        with app.app_context():
+            with db.engine.connect() as conexao:
+                return ler_pragmas(conexao, ['journal_mode', 'synchronous', 'busy_timeout', 'foreign_keys'])
+
+    def test_pragmas_aplicados(self):
+        """Testa se cada conexão recebe WAL, busy_timeout e foreign_keys"""
+        pragmas = self.pragmas(self.criar_app())
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['busy_timeout'], 5000)
+        self.assertEqual(pragmas['foreign_keys'], 1)
+
+    def test_pragmas_sobrescritos(self):
+        """Testa se SQLITE_PRAGMAS sobrescreve ou desativa pragmas do perfil"""
+        pragmas = self.pragmas(self.criar_app(SQLITE_PRAGMAS={'busy_timeout': 1000, 'foreign_keys': None}))
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['busy_timeout'], 1000)
+        self.assertEqual(pragmas['foreign_keys'], 0)
+
+    def test_perfil_desligado(self):
+        """Testa se SQLITE_PERFIL_DESEMPENHO=False mantém os padrões do driver"""
+        app = self.criar_app(SQLITE_PERFIL_DESEMPENHO=False)
+        pragmas = self.pragmas(app)
+        self.assertEqual(pragmas['journal_mode'], 'delete')
+        self.assertEqual(pragmas['foreign_keys'], 0)
+        self.assertNotIn('perfil_sqlite', app.extensions)
+
+if __name__ == '__main__':
+    unittest.main()
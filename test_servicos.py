@@ -0,0 +1,90 @@
+import unittest
+import json
+from app import create_app, db
+from app.models.servico import Servico
+from app.services import catalogo_servicos
+from app.testing import contar_consultas
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    CATALOGO_INTERVALO_VERIFICACAO = 60
+
+class TestServicos(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        
+        db.session.add_all([
+            Servico(nome='Corte de Cabelo', preco=40.0, duracao_estimada_min=30),
+            Servico(nome='Barba', preco=25.0, duracao_estimada_min=20)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_listar_servicos_catalogo(self):
+        """Testa a listagem servida do catálogo em memória com ETag"""
+        response = self.client.get('/api/servicos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['nome'] for s in json.loads(response.data)], ['Barba', 'Corte de Cabelo'])
+        etag = response.headers['ETag']
+        
+        # Catálogo já carregado: sem consultas, e 304 para o mesmo ETag
+        with contar_consultas() as contador:
+            self.assertEqual(self.client.get('/api/servicos/').data, response.data)
+            response = self.client.get('/api/servicos/', headers={'If-None-Match': etag})
+        self.assertEqual(contador.total, 0)
+        self.assertEqual(response.status_code, 304)
+        
+        # Alteração pela API invalida o catálogo
+        servico_id = Servico.query.filter_by(nome='Barba').one().id
+        self.client.put(f'/api/servicos/{servico_id}', json={'preco': 30.0})
+        response = self.client.get('/api/servicos/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(json.loads(self.client.get(f'/api/servicos/{servico_id}').data)['preco'], 30.0)
+        
+        response = self.client.post('/api/servicos/', json={'nome': 'Sobrancelha', 'preco': 15.0, 'duracao_estimada_min': 10})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(json.loads(self.client.get('/api/servicos/').data)), 3)
+        
+        self.client.delete(f'/api/servicos/{servico_id}')
+        self.assertEqual(self.client.get(f'/api/servicos/{servico_id}').status_code, 404)
+
+    def test_catalogo_alterado_em_outro_processo(self):
+        """Testa se a versão no banco revela serviços criados e removidos por outro worker"""
+        barba_id = Servico.query.filter_by(nome='Barba').one().id
+        self.assertEqual(catalogo_servicos.obter_catalogo().duracao_total([barba_id]), 20)
+        
+        # Outro worker: alterações gravadas no banco sem passar pelos eventos deste processo
+        tabela = Servico.__table__
+        novo_id = db.session.execute(tabela.insert().values(nome='Pigmentação', preco=50.0, duracao_estimada_min=40)).inserted_primary_key[0]
+        db.session.execute(tabela.delete().where(tabela.c.id == barba_id))
+        catalogo_servicos.incrementar_versao(db.session.connection())
+        db.session.commit()
+        
+        # Leituras comuns respeitam o intervalo; os agendamentos comparam a versão sempre
+        self.assertIsNotNone(catalogo_servicos.obter_catalogo().obter(barba_id))
+        catalogo = catalogo_servicos.obter_catalogo(verificar=True)
+        self.assertIsNone(catalogo.obter(barba_id))
+        self.assertEqual(catalogo.duracao_total([novo_id]), 40)
+        with self.assertRaises(KeyError):
+            catalogo.duracao_total([barba_id])
+        
+        # Versão inalterada: uma única consulta, sem recarregar
+        with contar_consultas() as contador:
+            self.assertIs(catalogo_servicos.obter_catalogo(verificar=True), catalogo)
+        self.assertEqual(contador.total, 1)
+
+if __name__ == '__main__':
+    unittest.main()
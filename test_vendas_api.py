@@ -1,13 +1,20 @@
 import unittest
 import json
+import csv
+import io
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from app import create_app, db
 from app.models.usuario import Usuario
 from app.models.cliente import Cliente
 from app.models.produto import Produto
 from app.models.venda import Venda, VendaItem
 from app.models.pagamento import Pagamento
+from app.models.venda_diaria import VendaDiaria, ProdutoVendaDiaria
+from app.models.movimento_estoque import MovimentoEstoque
+from app.services import paginacao, vendas_diarias
 from flask_jwt_extended import create_access_token
+from app.testing import contar_consultas
 
 class TestConfig:
     TESTING = True
@@ -380,6 +387,213 @@ class TestVendasAPI(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn('vendas', data)
         self.assertGreaterEqual(len(data['vendas']), 2)
+    
+    def test_produtos_mais_vendidos(self):
+        """Testa o ranking de produtos mais vendidos a partir dos contadores diários"""
+        ids = []
+        for indice, quantidade in [(2, 2), (0, 1), (1, 5), (2, 1)]:
+            response = self.client.post('/api/vendas/', json={
+                'itens': [{'produto_id': self.produtos[indice].id, 'quantidade': quantidade, 'valor_unitario': 10.0}]
+            })
+            ids.append(json.loads(response.data)['venda']['id'])
+        
+        # Venda cancelada sai do ranking
+        self.client.delete(f'/api/vendas/{ids[2]}')
+        
+        response = self.client.get('/api/produtos/mais-vendidos?periodo=mes&limite=5')
+        self.assertEqual(response.status_code, 200)
+        ranking = json.loads(response.data)
+        self.assertEqual([(p['nome'], p['total_vendido']) for p in ranking], [('Pomada', 3), ('Shampoo', 1)])
+        self.assertEqual(ranking[0]['valor_total'], 30.0)
+        
+        # Limite fora da faixa é ajustado (negativo não remove o LIMIT, zero não esvazia)
+        response = self.client.get('/api/produtos/mais-vendidos?periodo=mes&limite=-1')
+        self.assertEqual([p['nome'] for p in json.loads(response.data)], ['Pomada'])
+        response = self.client.get('/api/produtos/mais-vendidos?periodo=mes&limite=0')
+        self.assertEqual([p['nome'] for p in json.loads(response.data)], ['Pomada'])
+        
+        # A reconstrução a partir das vendas chega aos mesmos contadores
+        antes = sorted((l.produto_id, l.quantidade, l.valor_total) for l in ProdutoVendaDiaria.query)
+        vendas_diarias.reconstruir()
+        depois = sorted((l.produto_id, l.quantidade, l.valor_total) for l in ProdutoVendaDiaria.query if l.quantidade)
+        self.assertEqual([linha for linha in antes if linha[1]], depois)
+        
+        amanha = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+        response = self.client.get(f'/api/produtos/mais-vendidos?periodo=personalizado&data_inicio={amanha}')
+        self.assertEqual(json.loads(response.data), [])
+        self.assertEqual(self.client.get('/api/produtos/mais-vendidos?periodo=seculo').status_code, 400)
+    
+    def test_listar_vendas_por_cursor(self):
+        """Testa a paginação por cursor percorrendo todas as páginas, inclusive com datas repetidas"""
+        agora = datetime.utcnow().replace(microsecond=0)
+        for i in range(7):
+            # Pares de vendas com o mesmo data_hora para exercitar o desempate por id
+            db.session.add(Venda(cliente_id=self.cliente_id, data_hora=agora - timedelta(hours=i // 2), valor_total=10.0 + i))
+        db.session.commit()
+        
+        ids, cursor, paginas = [], '', 0
+        while cursor is not None:
+            response = self.client.get('/api/vendas/', query_string={'cursor': cursor, 'por_pagina': 3})
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            self.assertNotIn('total', data)
+            ids.extend(venda['id'] for venda in data['items'])
+            cursor = data['next_cursor']
+            paginas += 1
+        
+        esperado = [v.id for v in Venda.query.order_by(Venda.data_hora.desc(), Venda.id.desc())]
+        self.assertEqual(ids, esperado)
+        self.assertEqual(paginas, 3)
+        
+        data = json.loads(self.client.get('/api/vendas/?cursor=&incluir_total=true').data)
+        self.assertEqual(data['total'], 7)
+        
+        response = self.client.get('/api/vendas/?cursor=invalido')
+        self.assertEqual(response.status_code, 400)
+        
+        # Cursores adulterados: JSON válido com estrutura ou tipos inesperados
+        for valores in ([{'dt': 5}, 1], [{'x': 1}, 1], ['texto', 1], [[1], 2], [{'dt': '2024-01-01T10:00:00'}, True], [1]):
+            response = self.client.get('/api/vendas/', query_string={'cursor': paginacao.codificar_cursor(valores)})
+            self.assertEqual(response.status_code, 400, valores)
+    
+    def test_exportar_vendas_streaming(self):
+        """Testa a exportação em CSV e NDJSON enviada em streaming"""
+        for itens in ([(0, 1)], [(1, 2), (2, 1)]):
+            self.client.post('/api/vendas/', json={
+                'cliente_id': self.cliente_id,
+                'itens': [{'produto_id': self.produtos[i].id, 'quantidade': q, 'valor_unitario': 10.0} for i, q in itens]
+            })
+        
+        response = self.client.get('/api/vendas/exportar?formato=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        linhas = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(linhas), 2)
+        self.assertEqual(sorted(len(linha['itens']) for linha in linhas), [1, 2])
+        
+        response = self.client.get('/api/vendas/exportar?formato=csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        linhas = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(linhas[0][0], 'id')
+        self.assertEqual(len(linhas), 3)
+        
+        response = self.client.get('/api/vendas/exportar?formato=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def test_relatorios_agregados(self):
+        """Testa os totais dos relatórios calculados por agregação no banco"""
+        agora = datetime.now()
+        for valor, status, metodo in [(50.0, 'finalizada', 'pix'), (30.0, 'finalizada', 'dinheiro'), (99.0, 'cancelada', 'pix')]:
+            venda = Venda(cliente_id=self.cliente_id, data_hora=agora, valor_total=valor, status=status)
+            venda.itens.append(VendaItem(produto_id=self.produtos[0].id, quantidade=2, valor_unitario=valor / 2))
+            venda.pagamentos.append(Pagamento(tipo='pagamento', valor=valor, forma_pagamento=metodo, status='confirmado'))
+            db.session.add(venda)
+        db.session.commit()
+        
+        # Vendas inseridas direto no banco entram no consolidado pela reconstrução
+        self.assertEqual(vendas_diarias.reconstruir(), 1)
+        
+        resumo = json.loads(self.client.get('/api/vendas/relatorio/resumo').data)
+        self.assertEqual(resumo['hoje'], {'total': 2, 'valor': 80.0})
+        self.assertEqual(resumo['mes'], {'total': 2, 'valor': 80.0})
+        self.assertEqual(resumo['ticket_medio'], 40.0)
+        
+        diario = json.loads(self.client.get(f'/api/vendas/relatorio/diario?data={agora.date().isoformat()}').data)
+        self.assertEqual(diario['total_vendas'], 2)
+        self.assertEqual(diario['valor_total'], 80.0)
+        self.assertEqual(diario['metodos_pagamento'], {'pix': 50.0, 'dinheiro': 30.0})
+        self.assertEqual(diario['produtos_mais_vendidos'][0]['quantidade_total'], 4)
+        self.assertEqual(len(diario['vendas']), 2)
+        
+        pagamentos = json.loads(self.client.get('/api/vendas/relatorio/pagamentos').data)
+        self.assertEqual(pagamentos['valores']['pix'], 50.0)
+        self.assertEqual(pagamentos['valores']['cartao_credito'], 0)
+        self.assertEqual(pagamentos['percentuais']['dinheiro'], 37.5)
+    
+    def test_consolidado_diario_incremental(self):
+        """Testa se o consolidado mantido pela API bate com a reconstrução a partir das vendas"""
+        ids = []
+        for quantidade in (2, 1, 3):
+            response = self.client.post('/api/vendas/', json={
+                'cliente_id': self.cliente_id,
+                'itens': [{'produto_id': self.produtos[2].id, 'quantidade': quantidade, 'valor_unitario': 10.0}]
+            })
+            self.assertEqual(response.status_code, 201)
+            ids.append(json.loads(response.data)['venda']['id'])
+        
+        self.client.post(f'/api/vendas/{ids[0]}/pagamento', json={'valor': 20.0, 'metodo': 'pix'})
+        self.client.post(f'/api/vendas/{ids[2]}/pagamento', json={'valor': 30.0, 'metodo': 'dinheiro'})
+        self.assertEqual(self.client.delete(f'/api/vendas/{ids[1]}').status_code, 200)
+        
+        incremental = VendaDiaria.query.one()
+        self.assertEqual(incremental.quantidade, 2)
+        self.assertEqual(incremental.valor_total, 50.0)
+        self.assertEqual(incremental.valor_pix, 20.0)
+        self.assertEqual(incremental.valor_dinheiro, 30.0)
+        
+        colunas = ('quantidade', 'valor_bruto', 'valor_desconto', 'valor_imposto', 'valor_total',
+                   'valor_dinheiro', 'valor_cartao_credito', 'valor_cartao_debito', 'valor_pix')
+        esperado = {coluna: getattr(incremental, coluna) for coluna in colunas}
+        
+        vendas_diarias.reconstruir()
+        reconstruido = VendaDiaria.query.one()
+        self.assertEqual({coluna: getattr(reconstruido, coluna) for coluna in colunas}, esperado)
+
+    def test_baixa_estoque_atomica(self):
+        """Testa a baixa de estoque condicional, os movimentos registrados e a devolução no cancelamento"""
+        shampoo, pomada = self.produtos[0], self.produtos[2]
+        
+        # O mesmo produto em dois itens soma 60 > 50 em estoque: nada é baixado
+        response = self.client.post('/api/vendas/', json={
+            'cliente_id': self.cliente_id,
+            'itens': [{'produto_id': shampoo.id, 'quantidade': 30, 'valor_unitario': 10.0},
+                      {'produto_id': shampoo.id, 'quantidade': 30, 'valor_unitario': 10.0}]
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['solicitado'], 60)
+        self.assertEqual(db.session.get(Produto, shampoo.id).quantidade_estoque, 50)
+        self.assertEqual(Venda.query.count(), 0)
+        
+        # Estoque consumido por outra transação depois da leitura: o UPDATE condicional recusa
+        self.assertFalse(Produto.baixar_estoque({shampoo.id: 10, pomada.id: 31}))
+        db.session.rollback()
+        self.assertEqual(db.session.get(Produto, shampoo.id).quantidade_estoque, 50)
+        
+        # Baixa recusada, mas o estoque relido já é suficiente (reposição concorrente): 409 genérico
+        with patch.object(Produto, 'baixar_estoque', return_value=False):
+            response = self.client.post('/api/vendas/', json={
+                'cliente_id': self.cliente_id,
+                'itens': [{'produto_id': shampoo.id, 'quantidade': 2, 'valor_unitario': 10.0}]
+            })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(json.loads(response.data)['erro'], "Estoque alterado, tente novamente")
+        self.assertEqual(Venda.query.count(), 0)
+        
+        with contar_consultas() as consultas:
+            response = self.client.post('/api/vendas/', json={
+                'cliente_id': self.cliente_id,
+                'itens': [{'produto_id': shampoo.id, 'quantidade': 2, 'valor_unitario': 10.0},
+                          {'produto_id': pomada.id, 'quantidade': 3, 'valor_unitario': 10.0},
+                          {'produto_id': shampoo.id, 'quantidade': 1, 'valor_unitario': 10.0}]
+            })
+        self.assertEqual(response.status_code, 201)
+        # Sem SELECT/UPDATE por item: uma leitura dos produtos e uma baixa para todos
+        self.assertEqual(sum(1 for sql in consultas.instrucoes if sql.lstrip().upper().startswith('UPDATE PRODUTOS SET')), 1)
+        venda_id = json.loads(response.data)['venda']['id']
+        
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Produto, shampoo.id).quantidade_estoque, 47)
+        self.assertEqual(db.session.get(Produto, pomada.id).quantidade_estoque, 27)
+        saidas = {m.produto_id: m.quantidade for m in MovimentoEstoque.query.filter_by(tipo='saida')}
+        self.assertEqual(saidas, {shampoo.id: 3, pomada.id: 3})
+        
+        self.assertEqual(self.client.delete(f'/api/vendas/{venda_id}').status_code, 200)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Produto, shampoo.id).quantidade_estoque, 50)
+        self.assertEqual(db.session.get(Produto, pomada.id).quantidade_estoque, 30)
+        self.assertEqual(MovimentoEstoque.query.filter_by(tipo='entrada').count(), 2)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file